@@ -1,19 +1,26 @@
 # about/views.py
 
 # from django.shortcuts import render
+from django.utils.decorators import method_decorator
 from django.views.generic.base import TemplateView
 
+from core.page_cache import cached_page
+
 # Описать класс AboutAuthorView для страницы about/author
 
 # Описать класс AboutTechView для страницы about/tech
 
 
+# Страницы без данных из базы кэшируются целиком, шапка с меню
+# пользователя заполняется отдельно (core.page_cache)
+@method_decorator(cached_page(), name='dispatch')
 class AboutAuthorView(TemplateView):
     # В переменной template_name обязательно указывается имя шаблона,
     # на основе которого будет создана возвращаемая страница
     template_name = 'about/author.html'
 
 
+@method_decorator(cached_page(), name='dispatch')
 class AboutTechView(TemplateView):
     # В переменной template_name обязательно указывается имя шаблона,
     # на основе которого будет создана возвращаемая страница
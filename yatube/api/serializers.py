@@ -0,0 +1,141 @@
+# api/serializers.py
+"""Сериализация строк queryset.values() в JSON-объекты API.
+
+Экземпляры моделей не создаются: ресурс описывает, из каких колонок
+собирается каждое поле, вложенные объекты (автор, группа) читаются
+тем же запросом через JOIN (author__username и т.п.). Перед запросом
+из ?fields= и ?embed= собирается список колонок и "план" - кортежи
+(поле, колонка, преобразование), по которому строки превращаются
+в словари без лишних проверок.
+"""
+from posts.models import Comment, Follow, Group, Post
+
+
+class FieldError(ValueError):
+    pass
+
+
+def _image_url(name):
+    if not name:
+        return None
+    return Post._meta.get_field('image').storage.url(name)
+
+
+USER = {
+    'id': 'id',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+}
+GROUP = {
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+}
+
+
+class Resource:
+    model = None
+    # поле API -> колонка (или (колонка, преобразование))
+    fields = {}
+    # поле API -> (префикс колонок, поля вложенного объекта)
+    embeds = {}
+    # Колонки, нужные паджинатору
+    key_columns = ('id',)
+
+    def plan(self, fields=None, embed=()):
+        """Колонки для values() и план сборки объекта."""
+        names = list(fields) if fields else list(self.fields)
+        unknown = set(names) - set(self.fields)
+        if unknown:
+            raise FieldError(
+                f"Неизвестные поля: {', '.join(sorted(unknown))}"
+            )
+        unknown = set(embed) - set(self.embeds)
+        if unknown:
+            raise FieldError(
+                f"Нельзя встроить: {', '.join(sorted(unknown))}"
+            )
+        columns = list(self.key_columns)
+        steps = []
+        for name in names:
+            if name in embed:
+                prefix, nested = self.embeds[name]
+                nested_steps = []
+                for sub, column in nested.items():
+                    column = f'{prefix}__{column}'
+                    columns.append(column)
+                    nested_steps.append((sub, column))
+                # Наличие вложенного объекта - по его первичному ключу
+                steps.append((name, f'{prefix}__id', nested_steps))
+                continue
+            column = self.fields[name]
+            convert = None
+            if isinstance(column, tuple):
+                column, convert = column
+            columns.append(column)
+            steps.append((name, column, convert))
+        return list(dict.fromkeys(columns)), steps
+
+    @staticmethod
+    def row(steps, row):
+        obj = {}
+        for name, column, extra in steps:
+            value = row[column]
+            if isinstance(extra, list):
+                value = None if value is None else {
+                    sub: row[sub_column] for sub, sub_column in extra
+                }
+            elif extra is not None:
+                value = extra(value)
+            obj[name] = value
+        return obj
+
+
+class PostResource(Resource):
+    model = Post
+    fields = {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'author': 'author_id',
+        'group': 'group_id',
+        'image': ('image', _image_url),
+        'comments_count': 'comments_count',
+    }
+    embeds = {'author': ('author', USER), 'group': ('group', GROUP)}
+    key_columns = ('pub_date', 'id')
+
+
+class GroupResource(Resource):
+    model = Group
+    fields = {
+        'id': 'id',
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+        'posts_count': 'posts_count',
+    }
+
+
+class CommentResource(Resource):
+    model = Comment
+    fields = {
+        'id': 'id',
+        'post': 'post_id',
+        'author': 'author_id',
+        'text': 'text',
+        'created': 'created',
+    }
+    embeds = {'author': ('author', USER)}
+    key_columns = ('created', 'id')
+
+
+class FollowResource(Resource):
+    model = Follow
+    fields = {
+        'id': 'id',
+        'user': 'user_id',
+        'author': 'author_id',
+    }
+    embeds = {'author': ('author', USER)}
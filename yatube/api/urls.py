@@ -0,0 +1,23 @@
+# api/urls.py
+from django.urls import include, path
+
+from . import views
+
+app_name = 'api'
+
+v1 = ([
+    path('posts/', views.post_list, name='post_list'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comment_list,
+        name='comment_list'
+    ),
+    path('groups/', views.group_list, name='group_list'),
+    path('groups/<slug:slug>/', views.group_detail, name='group_detail'),
+    path('follows/', views.follow_list, name='follow_list'),
+], 'v1')
+
+urlpatterns = [
+    path('v1/', include(v1)),
+]
@@ -0,0 +1,132 @@
+# api/views.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from core.paginator import KeysetPaginator
+from posts.models import Comment, Follow, Group, Post
+from .serializers import (
+    CommentResource, FieldError, FollowResource, GroupResource, PostResource
+)
+
+User = get_user_model()
+
+
+def _error(status, detail):
+    return JsonResponse({'detail': detail}, status=status)
+
+
+def _names(request, parameter):
+    value = request.GET.get(parameter, '')
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def _plan(request, resource):
+    return resource.plan(_names(request, 'fields'), _names(request, 'embed'))
+
+
+def _link(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return f'{request.path}?{query.urlencode()}'
+
+
+def _limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        raise FieldError('limit должен быть числом')
+    return max(1, min(limit, settings.API_MAX_PAGE_SIZE))
+
+
+def _list(request, resource, queryset, ordering):
+    """Страница по курсору: {"results": [...], "next", "previous"}."""
+    try:
+        columns, steps = _plan(request, resource)
+        limit = _limit(request)
+    except FieldError as exc:
+        return _error(400, str(exc))
+    paginator = KeysetPaginator(
+        queryset.order_by(*ordering).values(*columns), limit
+    )
+    cursor = request.GET.get('cursor')
+    page = paginator.cursor_page(cursor) if cursor else paginator.first_page()
+    return JsonResponse({
+        'results': [resource.row(steps, row) for row in page.object_list],
+        'next': _link(request, page.next_cursor),
+        'previous': _link(request, page.previous_cursor),
+    })
+
+
+def _detail(request, resource, queryset):
+    try:
+        columns, steps = _plan(request, resource)
+    except FieldError as exc:
+        return _error(400, str(exc))
+    row = queryset.values(*columns).first()
+    if row is None:
+        return _error(404, 'Не найдено')
+    return JsonResponse(resource.row(steps, row))
+
+
+def _pk(queryset):
+    return queryset.values_list('pk', flat=True).first()
+
+
+@require_safe
+def post_list(request):
+    """Посты, новые сначала; ?group=<slug>, ?author=<username>."""
+    posts = Post.objects.all()
+    slug = request.GET.get('group')
+    if slug:
+        group_id = _pk(Group.objects.filter(slug=slug))
+        if group_id is None:
+            return _error(404, 'Группа не найдена')
+        posts = posts.filter(group_id=group_id)
+    username = request.GET.get('author')
+    if username:
+        author_id = _pk(User.objects.filter(username=username))
+        if author_id is None:
+            return _error(404, 'Автор не найден')
+        posts = posts.filter(author_id=author_id)
+    return _list(request, PostResource(), posts, ('-pub_date', '-id'))
+
+
+@require_safe
+def post_detail(request, post_id):
+    return _detail(request, PostResource(), Post.objects.filter(pk=post_id))
+
+
+@require_safe
+def comment_list(request, post_id):
+    """Комментарии поста, старые сначала."""
+    if _pk(Post.objects.filter(pk=post_id)) is None:
+        return _error(404, 'Пост не найден')
+    return _list(
+        request, CommentResource(), Comment.objects.filter(post_id=post_id),
+        ('created', 'id'),
+    )
+
+
+@require_safe
+def group_list(request):
+    return _list(request, GroupResource(), Group.objects.all(), ('id',))
+
+
+@require_safe
+def group_detail(request, slug):
+    return _detail(request, GroupResource(), Group.objects.filter(slug=slug))
+
+
+@require_safe
+def follow_list(request):
+    """Подписки текущего пользователя."""
+    if not request.user.is_authenticated:
+        return _error(401, 'Нужна авторизация')
+    return _list(
+        request, FollowResource(), Follow.objects.filter(user=request.user),
+        ('id',),
+    )
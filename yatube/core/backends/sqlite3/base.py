@@ -0,0 +1,58 @@
+# core/backends/sqlite3/base.py
+"""SQLite с настройками для работы под нагрузкой.
+
+Стандартный бэкенд Django плюс PRAGMA при каждом новом соединении.
+Значения берутся из DATABASES[...]['OPTIONS'] (остальные опции, как
+обычно, уходят в sqlite3.connect):
+
+    'journal_mode': 'WAL'      - читатели не ждут писателей
+    'synchronous': 'NORMAL'    - в режиме WAL безопасно и быстрее FULL
+    'mmap_size': 256 МБ        - чтение страниц через mmap
+    'cache_size': -64000       - кэш страниц (отрицательное - в КБ)
+    'busy_timeout': 5000       - сколько мс ждать блокировку
+    'transaction_mode': 'IMMEDIATE' - atomic() сразу берет блокировку
+        на запись: иначе повышение блокировки с чтения на запись
+        падает с "database is locked", не дожидаясь busy_timeout
+
+Соединения переиспользуются между запросами через CONN_MAX_AGE.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+PRAGMAS = ('journal_mode', 'synchronous', 'mmap_size', 'cache_size',
+           'busy_timeout')
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+def apply_pragmas(connection, pragmas):
+    """Выполняет PRAGMA на соединении sqlite3 (и в бенчмарке тоже)."""
+    for name in PRAGMAS:
+        value = pragmas.get(name)
+        if value is not None:
+            connection.execute(f'PRAGMA {name} = {value}')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {
+            name: params.pop(name) for name in PRAGMAS if name in params
+        }
+        mode = params.pop('transaction_mode', None)
+        if mode is not None and mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'transaction_mode должен быть одним из {TRANSACTION_MODES}'
+            )
+        self.transaction_mode = mode and mode.upper()
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        apply_pragmas(connection, self.pragmas)
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
@@ -1,9 +1,27 @@
 # differents.py
 from django.conf import settings
-from django.core.paginator import Paginator
+from django.utils.functional import SimpleLazyObject
 
+from .paginator import KeysetPaginator
 
-def page_cuter(request, post_list):
-    paginator = Paginator(post_list, settings.ITEMS_ON_PAGE)
+
+def page_cuter(request, post_list, count=None, lazy=False):
+    """Страница ленты по курсору ?cursor=...
+
+    Старые ссылки вида ?page=N продолжают работать через OFFSET;
+    count, если известен заранее, избавляет их от COUNT(*).
+    При lazy=True запрос выполняется только при обращении к странице,
+    т.е. не выполняется, если фрагмент шаблона взят из кэша.
+    """
+    if lazy:
+        return SimpleLazyObject(lambda: page_cuter(request, post_list, count))
+    paginator = KeysetPaginator(
+        post_list, settings.ITEMS_ON_PAGE, count=count
+    )
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.cursor_page(cursor)
     page = request.GET.get('page')
-    return paginator.get_page(page)
+    if page:
+        return paginator.legacy_page(page)
+    return paginator.first_page()
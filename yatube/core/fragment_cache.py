@@ -0,0 +1,151 @@
+# core/fragment_cache.py
+"""Кэш фрагментов шаблонов с версиями.
+
+Ключ фрагмента включает версию "области" (вся лента, группа, автор...).
+При записи версия области меняется, и старые фрагменты просто
+перестают читаться - поэтому их можно хранить часами.
+Версии и метрики лежат в том же кэше, что и фрагменты, так что схема
+работает и с общим файловым или табличным бэкендом для всех воркеров.
+Попадания и промахи копятся в процессе и уходят в общий кэш не чаще
+раза в FRAGMENT_CACHE_STATS_INTERVAL секунд - попадание не стоит
+лишней записи в кэш.
+"""
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+from core import instrumentation, routers
+
+VERSION_KEY = 'fragments:version:{}'
+STATS_KEY = 'fragments:stats:{}'
+HIT = 'hits'
+MISS = 'misses'
+
+
+def get_cache():
+    return caches[settings.FRAGMENT_CACHE]
+
+
+def _new_version():
+    # Случайная метка, а не счетчик: incr в файловом и табличном
+    # бэкендах не атомарен, а метке гонки не страшны.
+    # После точки - время смены версии, см. settled()
+    return f'{uuid.uuid4().hex[:12]}.{int(time.time())}'
+
+
+def scope(name, pk=None):
+    """Имя области: 'feed', 'group:5', 'author:7'..."""
+    return name if pk is None else f'{name}:{pk}'
+
+
+def get_version(scope):
+    cache = get_cache()
+    key = VERSION_KEY.format(scope)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def settled(version):
+    """Можно ли положить в кэш фрагмент, отрисованный под этой версией.
+
+    Реплики отстают от основной базы: сразу после сброса с них еще
+    читаются старые данные, и под новой версией закэшировались бы они.
+    Поэтому первые REPLICA_STICKY_SECONDS фрагменты, прочитанные
+    с реплики, не кэшируются.
+    """
+    if not routers.reads_from_replica():
+        return True
+    changed = changed_at(version)
+    return (
+        changed is None
+        or time.time() - changed >= settings.REPLICA_STICKY_SECONDS
+    )
+
+
+def changed_at(version):
+    """Время смены версии (unix time) или None для версий без него."""
+    changed = version.partition('.')[2]
+    return int(changed) if changed.isdigit() else None
+
+
+def _set_versions(scopes):
+    version = _new_version()
+    get_cache().set_many(
+        {VERSION_KEY.format(scope): version for scope in scopes}, None
+    )
+
+
+def bump(*scopes):
+    """Сбрасывает фрагменты областей, сменив их версии.
+
+    Версии меняются сразу и еще раз после коммита: иначе читатель,
+    успевший до коммита закэшировать старые данные под новой версией,
+    держал бы их до следующей записи.
+    """
+    _set_versions(scopes)
+    transaction.on_commit(lambda: _set_versions(scopes))
+
+
+_pending = {HIT: 0, MISS: 0}
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def record(outcome):
+    global _flushed_at
+    instrumentation.count_cache(hit=outcome == HIT)
+    with _pending_lock:
+        _pending[outcome] += 1
+        now = time.monotonic()
+        if now - _flushed_at < settings.FRAGMENT_CACHE_STATS_INTERVAL:
+            return
+        _flushed_at = now
+    flush_stats()
+
+
+def flush_stats():
+    """Переносит накопленные в процессе счетчики в общий кэш."""
+    with _pending_lock:
+        counts = dict(_pending)
+        for outcome in _pending:
+            _pending[outcome] = 0
+    cache = get_cache()
+    for outcome, count in counts.items():
+        if not count:
+            continue
+        key = STATS_KEY.format(outcome)
+        if not cache.add(key, count, None):
+            try:
+                cache.incr(key, count)
+            except ValueError:
+                # Ключ успели вытеснить между add и incr
+                cache.set(key, count, None)
+
+
+def stats():
+    """Счетчики всех процессов; чужие отстают не больше чем
+    на FRAGMENT_CACHE_STATS_INTERVAL."""
+    flush_stats()
+    cache = get_cache()
+    hits = cache.get(STATS_KEY.format(HIT), 0)
+    misses = cache.get(STATS_KEY.format(MISS), 0)
+    total = hits + misses
+    return {
+        HIT: hits,
+        MISS: misses,
+        'ratio': hits / total if total else 0.0,
+    }
+
+
+def reset_stats():
+    with _pending_lock:
+        for outcome in _pending:
+            _pending[outcome] = 0
+    get_cache().delete_many([STATS_KEY.format(HIT), STATS_KEY.format(MISS)])
@@ -0,0 +1,161 @@
+# core/instrumentation.py
+"""Метрики запроса: SQL, время шаблонов, попадания в кэш фрагментов.
+
+Метрики текущего запроса хранятся в threading.local: их заполняют
+обертка запросов к базе (connection.execute_wrapper), шаблонный
+бэкенд DjangoTemplates ниже и core.fragment_cache.record.
+Middleware (core.middleware) выводит их в заголовок Server-Timing
+и в лог, а самые медленные запросы складывает в кольцевой буфер.
+"""
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.template.backends import django as django_backend
+from django.template.exceptions import TemplateDoesNotExist
+from django.utils import timezone
+
+logger = logging.getLogger('core.requests')
+
+_local = threading.local()
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._template_depth = 0
+
+    def execute(self, execute, sql, params, many, context):
+        """Обертка для connection.execute_wrapper."""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Метрики запроса, который обрабатывает этот поток, или None."""
+    return getattr(_local, 'metrics', None)
+
+
+def start():
+    _local.metrics = RequestMetrics()
+    return _local.metrics
+
+
+def stop():
+    _local.metrics = None
+
+
+def count_cache(hit):
+    metrics = current()
+    if metrics is None:
+        return
+    if hit:
+        metrics.cache_hits += 1
+    else:
+        metrics.cache_misses += 1
+
+
+class InstrumentedTemplate(django_backend.Template):
+    def render(self, context=None, request=None):
+        metrics = current()
+        if metrics is None:
+            return super().render(context, request)
+        # Вложенные render() уже входят во время внешнего
+        metrics._template_depth += 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            metrics._template_depth -= 1
+            if not metrics._template_depth:
+                metrics.template_time += time.perf_counter() - started
+
+
+class DjangoTemplates(django_backend.DjangoTemplates):
+    """Стандартный бэкенд шаблонов с замером времени рендеринга."""
+
+    def from_string(self, template_code):
+        return InstrumentedTemplate(
+            self.engine.from_string(template_code), self
+        )
+
+    def get_template(self, template_name):
+        try:
+            return InstrumentedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            django_backend.reraise(exc, self)
+
+
+class SlowRequests:
+    """Кольцевой буфер запросов медленнее INSTRUMENTATION_SLOW_MS."""
+
+    def __init__(self, size):
+        self._entries = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+
+    def slowest(self):
+        with self._lock:
+            entries = list(self._entries)
+        return sorted(entries, key=lambda entry: -entry['total_ms'])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+slow_requests = SlowRequests(settings.INSTRUMENTATION_BUFFER_SIZE)
+
+
+def summary(request, response, metrics):
+    return {
+        'time': timezone.now(),
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'total_ms': round(metrics.total() * 1000, 1),
+        'db_ms': round(metrics.db_time * 1000, 1),
+        'queries': metrics.queries,
+        'template_ms': round(metrics.template_time * 1000, 1),
+        'cache_hits': metrics.cache_hits,
+        'cache_misses': metrics.cache_misses,
+    }
+
+
+def server_timing(entry):
+    return ', '.join((
+        f'db;dur={entry["db_ms"]};desc="{entry["queries"]} queries"',
+        f'tpl;dur={entry["template_ms"]};desc="templates"',
+        f'cache;desc="hits {entry["cache_hits"]} / '
+        f'misses {entry["cache_misses"]}"',
+        f'total;dur={entry["total_ms"]}',
+    ))
+
+
+def log(entry):
+    # Строка в формате key=value (logfmt), те же поля - в extra
+    logger.info(
+        ' '.join(
+            f'{key}={value}' for key, value in entry.items() if key != 'time'
+        ),
+        extra={'request_metrics': entry},
+    )
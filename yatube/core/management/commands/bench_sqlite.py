@@ -0,0 +1,45 @@
+# core/management/commands/bench_sqlite.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import sqlite_bench
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность читателей и писателей SQLite '
+        'с настройками по умолчанию и с настройками проекта'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--duration', type=float, default=3.0,
+            help='Секунд на каждый прогон',
+        )
+        parser.add_argument('--rows', type=int, default=20000)
+
+    def handle(self, *args, **options):
+        configs = {
+            'по умолчанию': sqlite_bench.DEFAULTS,
+            'проект': sqlite_bench.tuned_config(
+                settings.DATABASES['default'].get('OPTIONS', {})
+            ),
+        }
+        self.stdout.write(
+            f"{'настройки':<14}{'чтений/с':>12}{'записей/с':>12}"
+            f"{'блокировок':>12}"
+        )
+        for name, config in configs.items():
+            result = sqlite_bench.run(
+                config,
+                readers=options['readers'],
+                writers=options['writers'],
+                duration=options['duration'],
+                rows=options['rows'],
+            )
+            self.stdout.write(
+                f"{name:<14}{result['reads']:>12.0f}"
+                f"{result['writes']:>12.0f}{result['errors']:>12}"
+            )
@@ -0,0 +1,23 @@
+# core/management/commands/cache_stats.py
+from django.core.management.base import BaseCommand
+
+from core import fragment_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша фрагментов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help='Обнулить счетчики',
+        )
+
+    def handle(self, *args, **options):
+        stats = fragment_cache.stats()
+        self.stdout.write(
+            f"Попаданий: {stats['hits']}, промахов: {stats['misses']}, "
+            f"доля попаданий: {stats['ratio']:.1%}"
+        )
+        if options['reset']:
+            fragment_cache.reset_stats()
+            self.stdout.write(self.style.SUCCESS('Счетчики обнулены'))
@@ -0,0 +1,37 @@
+# core/management/commands/replicate.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.replication import Replicator
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу SQLite на реплики - замена репликации '
+        'для локальной разработки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*', default=['replica'],
+            help='Алиасы реплик из DATABASES',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Повторять каждые N секунд (0 - один раз)',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            replicator = Replicator(options['aliases'])
+        except ValueError as exc:
+            raise CommandError(exc)
+        interval = options['interval']
+        replicator.sync(force=True)
+        aliases = ', '.join(options['aliases'])
+        self.stdout.write(f'Реплики обновлены: {aliases}')
+        while interval:
+            time.sleep(interval)
+            if replicator.sync():
+                self.stdout.write('Реплики обновлены')
@@ -0,0 +1,93 @@
+# core/middleware.py
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from core import instrumentation, page_cache, routers
+
+
+class InstrumentationMiddleware:
+    """Считает SQL-запросы, время базы и шаблонов, попадания в кэш.
+
+    Итог - в заголовке Server-Timing и в логе core.requests; запросы
+    медленнее INSTRUMENTATION_SLOW_MS попадают на страницу
+    core:slow_requests. Стоит первым в MIDDLEWARE, чтобы учитывать
+    работу остальных middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = instrumentation.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(metrics.execute)
+                    )
+                response = self.get_response(request)
+            entry = instrumentation.summary(request, response, metrics)
+        finally:
+            instrumentation.stop()
+        response['Server-Timing'] = instrumentation.server_timing(entry)
+        instrumentation.log(entry)
+        if entry['total_ms'] >= settings.INSTRUMENTATION_SLOW_MS:
+            instrumentation.slow_requests.add(entry)
+        return response
+
+
+class ReplicaStickinessMiddleware:
+    """Read-your-writes для реплик (core.routers).
+
+    Небезопасные методы и запросы с кукой REPLICA_PIN_COOKIE читают
+    с основной базы; после записи кука ставится на
+    REPLICA_STICKY_SECONDS.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.REPLICA_DATABASES:
+            return self.get_response(request)
+        routers.reset()
+        if (
+            request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+            or settings.REPLICA_PIN_COOKIE in request.COOKIES
+        ):
+            routers.pin()
+        try:
+            response = self.get_response(request)
+            if routers.wrote():
+                response.set_cookie(
+                    settings.REPLICA_PIN_COOKIE, '1',
+                    max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+        finally:
+            routers.reset()
+        return response
+
+
+class PageHolesMiddleware:
+    """Заполняет метки core.page_cache данными текущего пользователя."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            response.streaming
+            or not response.get('Content-Type', '').startswith('text/html')
+            or page_cache.HOLE_PREFIX not in response.content
+        ):
+            return response
+        response.content = page_cache.fill_holes(
+            request, response.content.decode(response.charset)
+        )
+        if response.has_header('Content-Length'):
+            response['Content-Length'] = len(response.content)
+        return response
@@ -0,0 +1,120 @@
+# core/page_cache.py
+"""Кэш страниц целиком, общий для всех пользователей.
+
+То, что зависит от пользователя (меню в шапке, кнопки подписки
+и редактирования, форма комментария, значки "вы подписаны"),
+выводится тегом {% page_hole шаблон имя=значение ... %} как метка-
+"дырка". Страница с метками попадает в кэш как есть, а
+PageHolesMiddleware перед отправкой заполняет каждую метку: рендерит
+маленький шаблон с аргументами метки и контекстом текущего запроса.
+Так одна закэшированная страница подходит и анонимам,
+и авторизованным пользователям.
+"""
+import hashlib
+import json
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+from core import fragment_cache
+
+HOLE = '<!--page-hole {}-->'
+HOLE_PREFIX = b'<!--page-hole '
+HOLE_RE = re.compile(r'<!--page-hole (\{.*?\})-->')
+KEY = 'page:{}'
+
+
+def hole(template_name, **args):
+    """Метка для шаблона template_name; аргументы - числа и строки."""
+    data = json.dumps({'template': template_name, 'args': args})
+    # В JSON не должно оказаться конца комментария
+    return mark_safe(HOLE.format(data.replace('>', '\\u003e')))
+
+
+def fill_holes(request, content):
+    templates = {}
+
+    def render(match):
+        data = json.loads(match.group(1))
+        name = data['template']
+        if name not in templates:
+            templates[name] = get_template(name)
+        return templates[name].render(data['args'], request)
+
+    return HOLE_RE.sub(render, content)
+
+
+def page_key(request, *parts):
+    raw = '|'.join((
+        str(settings.PAGE_CACHE_VERSION), request.get_full_path(), *parts,
+    ))
+    return KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+
+def get_page(key):
+    """Ответ из кэша (метки еще не заполнены) или None."""
+    cached = fragment_cache.get_cache().get(key)
+    fragment_cache.record(
+        fragment_cache.HIT if cached else fragment_cache.MISS
+    )
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def set_page(key, response, timeout):
+    """Кэширует ответ 200 без cookies.
+
+    Потоковый ответ попадает в кэш, когда отдан до конца.
+    """
+    if response.status_code != 200 or response.cookies:
+        return
+    if response.streaming:
+        response.streaming_content = _caching(
+            key, response.streaming_content, response['Content-Type'],
+            timeout,
+        )
+        return
+    fragment_cache.get_cache().set(
+        key, (response.content, response['Content-Type']), timeout
+    )
+
+
+def _caching(key, chunks, content_type, timeout):
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    fragment_cache.get_cache().set(
+        key, (b''.join(parts), content_type), timeout
+    )
+
+
+def cached_page(timeout=None):
+    """Декоратор для страниц, которые меняются только с кодом:
+    GET-ответ кэшируется по адресу на timeout секунд
+    (по умолчанию PAGE_CACHE_TIMEOUT)."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            key = page_key(request)
+            response = get_page(key)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if hasattr(response, 'render') and callable(response.render):
+                    response.render()
+                set_page(
+                    key, response,
+                    settings.PAGE_CACHE_TIMEOUT if timeout is None
+                    else timeout,
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,191 @@
+# core/paginator.py
+import base64
+import binascii
+import json
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+# Направления перехода по курсору
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class KeysetPaginator(Paginator):
+    """Курсорный паджинатор.
+
+    Страницы отбираются условием по ключу сортировки
+    (для Post это ('-pub_date', '-pk')) вместо LIMIT/OFFSET,
+    количество объектов (COUNT(*)) при этом не считается.
+    """
+
+    def __init__(self, object_list, per_page, count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        if count is not None:
+            # Готовый счетчик (например, денормализованный) вместо COUNT(*)
+            self.count = count
+        model = object_list.model
+        ordering = list(
+            object_list.query.order_by or model._meta.ordering
+        )
+        # pk в конце гарантирует однозначность ключа
+        if not {'pk', '-pk', 'id', '-id'} & set(ordering):
+            ordering.append('-pk')
+        self.ordering = ordering
+        self.fields = [
+            (name.lstrip('-'), name.startswith('-')) for name in ordering
+        ]
+        self.model = model
+
+    def _model_field(self, name):
+        if name == 'pk':
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def encode_cursor(self, obj, direction, number):
+        if isinstance(obj, dict):
+            # Строка queryset.values(): колонки ключа должны в ней быть
+            obj = SimpleNamespace(**{
+                self._model_field(name).attname: obj[
+                    self.model._meta.pk.attname if name == 'pk' else name
+                ]
+                for name, _ in self.fields
+            })
+        values = [
+            self._model_field(name).value_to_string(obj)
+            for name, _ in self.fields
+        ]
+        raw = json.dumps({'v': values, 'd': direction, 'n': number})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        """Возвращает (значения ключа, направление, номер страницы)
+        или None, если курсор испорчен."""
+        try:
+            padding = '=' * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            values = [
+                self._model_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, data['v'])
+            ]
+            direction = data['d']
+            number = int(data['n'])
+        except (
+            binascii.Error, ValueError, TypeError, KeyError, ValidationError
+        ):
+            return None
+        if (
+            len(values) != len(self.fields)
+            or direction not in (NEXT, PREVIOUS)
+            or number < 1
+        ):
+            return None
+        return values, direction, number
+
+    def _after(self, values, reverse=False):
+        """Условие "строго после ключа" в порядке сортировки
+        (или строго до него, если reverse)."""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def _build_page(self, object_list, number, cursor, has_next,
+                    has_previous):
+        page = Page(object_list, number, self)
+        page.cursor = cursor or ''
+        page.next_cursor = None
+        page.previous_cursor = None
+        if object_list and has_next:
+            page.next_cursor = self.encode_cursor(
+                object_list[-1], NEXT, number + 1
+            )
+        if object_list and has_previous:
+            page.previous_cursor = self.encode_cursor(
+                object_list[0], PREVIOUS, number - 1
+            )
+        return page
+
+    def first_page(self):
+        rows = list(
+            self.object_list.order_by(*self.ordering)[:self.per_page + 1]
+        )
+        return self._build_page(
+            rows[:self.per_page], 1, None,
+            has_next=len(rows) > self.per_page, has_previous=False,
+        )
+
+    def cursor_page(self, cursor):
+        """Страница, следующая за курсором (или предшествующая ему)."""
+        decoded = self.decode_cursor(cursor)
+        if decoded is None:
+            return self.first_page()
+        values, direction, number = decoded
+        limit = self.per_page + 1
+        if direction == NEXT:
+            rows = list(
+                self.object_list.filter(self._after(values))
+                .order_by(*self.ordering)[:limit]
+            )
+            return self._build_page(
+                rows[:self.per_page], number, cursor,
+                has_next=len(rows) > self.per_page, has_previous=True,
+            )
+        rows = list(
+            self.object_list.filter(self._after(values, reverse=True))
+            .order_by(*self._reversed_ordering())[:limit]
+        )
+        if len(rows) <= self.per_page:
+            # Дошли до начала ленты - отдаем полную первую страницу
+            return self.first_page()
+        rows = rows[:self.per_page][::-1]
+        return self._build_page(
+            rows, max(number, 2), cursor,
+            has_next=True, has_previous=True,
+        )
+
+    def legacy_page(self, number):
+        """Страница по старой ссылке ?page=N (через OFFSET)."""
+        page = self.get_page(number)
+        object_list = list(page.object_list)
+        return self._build_page(
+            object_list, page.number, None,
+            has_next=page.has_next(), has_previous=page.has_previous(),
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """Паджинатор для больших таблиц в админке.
+
+    Точный COUNT(*) считается только до ADMIN_EXACT_COUNT_LIMIT строк
+    (SELECT COUNT(*) FROM (... LIMIT n)). Если строк больше, для
+    таблицы без фильтров берется наибольший pk - одно чтение
+    по первичному ключу, с поправкой на удаленные строки он дает
+    оценку сверху; для выборки с фильтрами - сам предел.
+    """
+
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        exact = self.object_list[:limit + 1].count()
+        if exact <= limit:
+            return exact
+        if self.object_list.query.where:
+            return limit
+        last_pk = self.object_list.model._default_manager.using(
+            self.object_list.db
+        ).order_by('-pk').values_list('pk', flat=True).first()
+        return max(limit, last_pk or 0)
@@ -0,0 +1,38 @@
+# core/replication.py
+"""Замена репликации для локальной разработки (команда replicate).
+
+Реплика - отдельный файл SQLite, в который целиком копируется основная
+база через backup API. Копия делается, только если основная база
+изменилась (PRAGMA data_version), так что между копиями реплика
+отстает, как настоящая.
+"""
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Replicator:
+    def __init__(self, aliases, source=DEFAULT_DB_ALIAS):
+        for alias in (source, *aliases):
+            if connections[alias].vendor != 'sqlite':
+                raise ValueError(f'{alias}: поддерживается только SQLite')
+        self.source = source
+        self.aliases = list(aliases)
+        self._version = None
+
+    def _data_version(self):
+        source = connections[self.source]
+        source.ensure_connection()
+        # data_version меняется, когда базу меняют другие соединения
+        return source.connection.execute('PRAGMA data_version').fetchone()[0]
+
+    def sync(self, force=False):
+        """Копирует основную базу на реплики; возвращает, была ли копия."""
+        version = self._data_version()
+        if not force and version == self._version:
+            return False
+        source = connections[self.source]
+        for alias in self.aliases:
+            target = connections[alias]
+            target.ensure_connection()
+            source.connection.backup(target.connection)
+        self._version = version
+        return True
@@ -0,0 +1,86 @@
+# core/routers.py
+"""Чтение с реплик, запись - в основную базу.
+
+Запросы на чтение моделей из REPLICA_APPS уходят на случайную реплику
+из REPLICA_DATABASES. Поток "прикрепляется" к основной базе, как
+только в нем что-то записали, - дальше он читает свои записи.
+Между запросами прикрепление переносит ReplicaStickinessMiddleware:
+после записи браузер еще REPLICA_STICKY_SECONDS читает с основной
+базы, пока реплики догоняют ее.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+
+def pin():
+    """Читать с основной базы до reset()."""
+    _local.pinned = True
+
+
+def wrote():
+    """Писал ли поток в базу после reset()."""
+    return getattr(_local, 'wrote', False)
+
+
+def reset():
+    _local.pinned = False
+    _local.wrote = False
+
+
+@contextmanager
+def use_primary():
+    """Временно читать с основной базы."""
+    pinned = getattr(_local, 'pinned', False)
+    pin()
+    try:
+        yield
+    finally:
+        _local.pinned = pinned
+
+
+def reads_from_replica():
+    """Пойдет ли чтение в этом потоке на реплику."""
+    return bool(
+        settings.REPLICA_DATABASES
+        and not getattr(_local, 'pinned', False)
+        and not wrote()
+        # Внутри транзакции читаем то, что в ней же записали
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+    )
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        if not reads_from_replica():
+            return DEFAULT_DB_ALIAS
+        return random.choice(settings.REPLICA_DATABASES)
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get('instance')
+        if (
+            instance is not None
+            and instance._state.db not in (None, *_databases())
+        ):
+            # Объекты других баз (и migrate --database) - как без роутера
+            return None
+        _local.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # На репликах те же данные, что и в основной базе
+        databases = _databases()
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def _databases():
+    return {DEFAULT_DB_ALIAS, *settings.REPLICA_DATABASES}
@@ -0,0 +1,148 @@
+# core/sqlite_bench.py
+"""Конкурентный бенчмарк SQLite (команда bench_sqlite).
+
+Читатели выбирают страницы ленты по индексу, писатели в транзакции
+добавляют запись и обновляют счетчик - как create поста. Один и тот же
+сценарий прогоняется на отдельной временной базе с настройками SQLite
+по умолчанию и с PRAGMA из core.backends.sqlite3.
+"""
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from core.backends.sqlite3.base import apply_pragmas
+
+# Как у стандартного бэкенда Django: rollback journal, synchronous=FULL,
+# ожидание блокировки 5 с
+DEFAULTS = {'timeout': 5, 'pragmas': {}, 'transaction_mode': None}
+
+SCHEMA = (
+    'CREATE TABLE item (id INTEGER PRIMARY KEY, author INTEGER, '
+    'pub_date REAL, text TEXT)',
+    'CREATE INDEX item_author_date ON item (author, pub_date DESC, id DESC)',
+    'CREATE TABLE stats (author INTEGER PRIMARY KEY, items INTEGER)',
+)
+AUTHORS = 100
+
+
+def create_database(path, rows=20000):
+    connection = sqlite3.connect(path)
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+        connection.executemany(
+            'INSERT INTO item (author, pub_date, text) VALUES (?, ?, ?)',
+            (
+                (number % AUTHORS, number, 'текст поста ' * 10)
+                for number in range(rows)
+            ),
+        )
+        connection.executemany(
+            'INSERT INTO stats VALUES (?, ?)',
+            ((author, rows // AUTHORS) for author in range(AUTHORS)),
+        )
+    connection.close()
+
+
+def _connect(path, config):
+    # isolation_level=None - транзакциями управляем сами, как Django
+    connection = sqlite3.connect(
+        path, timeout=config['timeout'], isolation_level=None,
+        check_same_thread=False,
+    )
+    apply_pragmas(connection, config['pragmas'])
+    return connection
+
+
+def _reader(connection, rng):
+    connection.execute(
+        'SELECT id, text FROM item WHERE author = ? '
+        'ORDER BY pub_date DESC, id DESC LIMIT 10',
+        [rng.randrange(AUTHORS)],
+    ).fetchall()
+
+
+def _writer(connection, rng, begin):
+    author = rng.randrange(AUTHORS)
+    connection.execute(begin)
+    try:
+        connection.execute(
+            'INSERT INTO item (author, pub_date, text) VALUES (?, ?, ?)',
+            [author, time.time(), 'новый пост'],
+        )
+        connection.execute(
+            'UPDATE stats SET items = items + 1 WHERE author = ?', [author]
+        )
+        connection.execute('COMMIT')
+    except sqlite3.OperationalError:
+        connection.execute('ROLLBACK')
+        raise
+
+
+def run(config, readers=4, writers=2, duration=3.0, rows=20000):
+    """Возвращает {'reads': в секунду, 'writes': в секунду,
+    'errors': число "database is locked"}."""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'bench.sqlite3')
+    create_database(path, rows)
+    begin = 'BEGIN'
+    if config.get('transaction_mode'):
+        begin = f"BEGIN {config['transaction_mode']}"
+    counts = {'reads': 0, 'writes': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def worker(job, seed):
+        connection = _connect(path, config)
+        rng = random.Random(seed)
+        done = errors = 0
+        while not stop.is_set():
+            try:
+                if job == 'reads':
+                    _reader(connection, rng)
+                else:
+                    _writer(connection, rng, begin)
+                done += 1
+            except sqlite3.OperationalError:
+                errors += 1
+        connection.close()
+        with lock:
+            counts[job] += done
+            counts['errors'] += errors
+
+    threads = [
+        threading.Thread(target=worker, args=('reads', number))
+        for number in range(readers)
+    ] + [
+        threading.Thread(target=worker, args=('writes', 100 + number))
+        for number in range(writers)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+    return {
+        'reads': counts['reads'] / duration,
+        'writes': counts['writes'] / duration,
+        'errors': counts['errors'],
+    }
+
+
+def tuned_config(options):
+    """Настройки бенчмарка из OPTIONS базы с бэкендом core.backends.sqlite3."""
+    from core.backends.sqlite3.base import PRAGMAS
+    return {
+        'timeout': options.get('timeout', DEFAULTS['timeout']),
+        'pragmas': {
+            name: options[name] for name in PRAGMAS if name in options
+        },
+        'transaction_mode': options.get('transaction_mode'),
+    }
@@ -0,0 +1,65 @@
+from django import template
+from django.conf import settings
+from django.core.cache.utils import make_template_fragment_key
+
+from core import fragment_cache, page_cache
+
+register = template.Library()
+
+
+class VersionedCacheNode(template.Node):
+    def __init__(self, nodelist, fragment_name, scope, vary_on):
+        self.nodelist = nodelist
+        self.fragment_name = fragment_name
+        self.scope = scope
+        self.vary_on = vary_on
+
+    def render(self, context):
+        scope = self.scope.resolve(context)
+        version = fragment_cache.get_version(scope)
+        vary_on = [version] + [
+            var.resolve(context) for var in self.vary_on
+        ]
+        key = make_template_fragment_key(self.fragment_name, vary_on)
+        cache = fragment_cache.get_cache()
+        value = cache.get(key)
+        if value is not None:
+            fragment_cache.record(fragment_cache.HIT)
+            return value
+        fragment_cache.record(fragment_cache.MISS)
+        value = self.nodelist.render(context)
+        if fragment_cache.settled(version):
+            cache.set(key, value, settings.FRAGMENT_CACHE_TIMEOUT)
+        return value
+
+
+@register.tag('versioned_cache')
+def do_versioned_cache(parser, token):
+    """Кэширует фрагмент до смены версии области:
+
+    {% versioned_cache имя_фрагмента область [vary_on ...] %}
+        ...
+    {% endversioned_cache %}
+    """
+    nodelist = parser.parse(('endversioned_cache',))
+    parser.delete_first_token()
+    tokens = token.split_contents()
+    if len(tokens) < 3:
+        raise template.TemplateSyntaxError(
+            f"'{tokens[0]}' tag requires at least 2 arguments."
+        )
+    return VersionedCacheNode(
+        nodelist,
+        tokens[1],
+        parser.compile_filter(tokens[2]),
+        [parser.compile_filter(token) for token in tokens[3:]],
+    )
+
+
+@register.simple_tag
+def page_hole(template_name, **args):
+    """Часть страницы, которая зависит от пользователя (core.page_cache):
+
+    {% page_hole 'posts/includes/follow_button.html' author_id=author.pk %}
+    """
+    return page_cache.hole(template_name, **args)
@@ -0,0 +1,11 @@
+# core/urls.py
+from django.urls import path
+
+from . import views
+
+app_name = 'core'
+
+urlpatterns = [
+    # Самые медленные запросы (только для персонала)
+    path('requests/', views.slow_requests, name='slow_requests'),
+]
@@ -1,5 +1,8 @@
 # core/views.py
-from django.shortcuts import render
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import redirect, render
+
+from core import fragment_cache, instrumentation
 
 
 def page_not_found(request, exception):
@@ -18,3 +21,15 @@ def server_error(request):
 
 def permission_denied(request, exception):
     return render(request, 'core/403.html', status=403)
+
+
+@staff_member_required
+def slow_requests(request):
+    if request.method == 'POST':
+        instrumentation.slow_requests.clear()
+        return redirect('core:slow_requests')
+    context = {
+        'entries': instrumentation.slow_requests.slowest(),
+        'cache_stats': fragment_cache.stats(),
+    }
+    return render(request, 'core/slow_requests.html', context)
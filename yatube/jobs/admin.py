@@ -0,0 +1,15 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'name', 'key', 'state', 'attempts', 'run_at', 'created',
+    )
+    list_filter = ('state', 'name')
+    search_fields = ('=key',)
+    readonly_fields = ('last_error',)
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,38 @@
+# jobs/management/commands/run_workers.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jobs import worker
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры очереди фоновых задач (jobs)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=settings.JOBS_PROCESSES,
+        )
+        parser.add_argument(
+            '--threads', type=int, default=settings.JOBS_THREADS,
+            help='Потоков в каждом процессе',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=None,
+            help='Пауза при пустой очереди, секунд',
+        )
+        parser.add_argument(
+            '--burst', action='store_true',
+            help='Выполнить то, что есть в очереди, и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        processed = worker.run(
+            processes=options['processes'],
+            threads=options['threads'],
+            poll_interval=options['poll_interval'],
+            burst=options['burst'],
+        )
+        if processed is not None:
+            self.stdout.write(
+                self.style.SUCCESS(f'Выполнено задач: {processed}')
+            )
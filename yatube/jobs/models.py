@@ -0,0 +1,51 @@
+# jobs/models.py
+from django.db import models
+
+
+class Job(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    # Аргументы задачи в JSON
+    args = models.TextField('Аргументы', default='[]')
+    # Задача с тем же ключом, уже стоящая в очереди, второй раз
+    # не ставится
+    key = models.CharField(
+        'Ключ идемпотентности', max_length=200, null=True, blank=True
+    )
+    state = models.CharField(
+        'Состояние', max_length=10, choices=STATES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveIntegerField('Попыток не больше', default=5)
+    run_at = models.DateTimeField('Выполнить не раньше')
+    # Срок, до которого задачу держит воркер; после него задача
+    # упавшего воркера снова попадает в очередь
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Создана', auto_now_add=True)
+
+    class Meta:
+        ordering = ['run_at', 'id']
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = [
+            # Выбор следующей задачи: state = 'queued' AND run_at <= now
+            models.Index(fields=['state', 'run_at', 'id'], name='job_due'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['key'], condition=models.Q(state='queued'),
+                name='job_queued_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
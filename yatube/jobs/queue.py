@@ -0,0 +1,198 @@
+# jobs/queue.py
+"""Очередь фоновых задач в таблице Job.
+
+Задача - функция с декоратором @task в модуле tasks.py приложения.
+Представления и сигналы ставят ее в очередь после коммита
+(task.enqueue_on_commit), так что время записи не растет вместе
+с числом побочных действий. Воркеры (run_workers) забирают задачи
+по одной, упавшие повторяют с экспоненциальной задержкой. Задача
+может выполниться больше одного раза (воркер упал после работы,
+но до отметки) - поэтому задачи должны быть идемпотентными.
+"""
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+
+
+class Task:
+    def __init__(self, func, name, max_attempts):
+        self.func = func
+        self.name = name
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args):
+        return self.func(*args)
+
+    def enqueue(self, *args, key=None, delay=0):
+        return enqueue(self.name, *args, key=key, delay=delay)
+
+    def enqueue_on_commit(self, *args, key=None, delay=0):
+        if inline():
+            transaction.on_commit(lambda: run_inline(self, args))
+        else:
+            transaction.on_commit(
+                lambda: enqueue(self.name, *args, key=key, delay=delay)
+            )
+
+
+def task(func=None, *, name=None, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    Аргументы задачи сохраняются в JSON - передавайте id, а не объекты.
+    """
+    def register(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = Task(
+            func, task_name,
+            max_attempts or settings.JOBS_MAX_ATTEMPTS,
+        )
+        return registry[task_name]
+
+    return register(func) if func else register
+
+
+def inline():
+    """Выполнять задачи без очереди: после коммита, в процессе
+    вызывающего (JOBS_INLINE = True, разработка без воркеров)."""
+    return settings.JOBS_INLINE
+
+
+def run_inline(task, args):
+    """Выполняет задачу после коммита вместо воркера.
+
+    Данные вызывающего уже записаны, так что ошибка задачи только
+    логируется: иначе она оборвала бы остальные колбэки on_commit
+    и ответ на уже выполненный запрос.
+    """
+    try:
+        task(*args)
+    except Exception:
+        logger.exception('Задача %s завершилась ошибкой', task.name)
+
+
+def enqueue(name, *args, key=None, delay=0):
+    """Ставит задачу в очередь. Если задача с тем же key уже ждет
+    в очереди, новая не создается (уникальный частичный индекс)."""
+    if name not in registry:
+        raise KeyError(f'Неизвестная задача {name}')
+    Job.objects.bulk_create([Job(
+        name=name,
+        args=json.dumps(args),
+        key=key,
+        max_attempts=registry[name].max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )], ignore_conflicts=True)
+
+
+def backoff(attempts):
+    """Задержка перед повтором: JOBS_RETRY_DELAY * 2^(n-1) со случайной
+    добавкой до 10% (чтобы повторы не шли пачкой), не больше
+    JOBS_RETRY_MAX_DELAY."""
+    delay = min(
+        settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.JOBS_RETRY_MAX_DELAY,
+    )
+    return delay * (1 + random.random() / 10)
+
+
+def _queued_keys():
+    return Job.objects.filter(state=Job.QUEUED, key__isnull=False).values(
+        'key'
+    )
+
+
+def _requeue(job, **fields):
+    """Возвращает задачу в очередь. Если за это время задачу с тем же
+    ключом поставили снова, эта просто удаляется - работу сделает новая.
+    """
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                state=Job.QUEUED, locked_until=None, **fields
+            )
+    except IntegrityError:
+        Job.objects.filter(pk=job.pk).delete()
+
+
+def release_expired():
+    """Возвращает в очередь задачи воркеров, которые не уложились
+    в JOBS_LEASE_SECONDS (скорее всего, воркер упал)."""
+    expired = Job.objects.filter(
+        state=Job.RUNNING, locked_until__lt=timezone.now()
+    )
+    expired.filter(key__in=_queued_keys()).delete()
+    return expired.update(state=Job.QUEUED, locked_until=None)
+
+
+def claim():
+    """Забирает следующую готовую задачу или возвращает None.
+
+    UPDATE с условием state = 'queued' срабатывает только у одного
+    из воркеров, так что задачу получает ровно один.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.filter(
+            state=Job.QUEUED, run_at__lte=now
+        ).order_by('run_at', 'id').values_list('pk', flat=True)
+        for pk in due[:5]:
+            taken = Job.objects.filter(pk=pk, state=Job.QUEUED).update(
+                state=Job.RUNNING,
+                attempts=F('attempts') + 1,
+                locked_until=now + timedelta(
+                    seconds=settings.JOBS_LEASE_SECONDS
+                ),
+            )
+            if taken:
+                return Job.objects.get(pk=pk)
+    return None
+
+
+def execute(job):
+    """Выполняет задачу; успешная удаляется, упавшая повторяется
+    позже или, если попытки кончились, остается с состоянием failed."""
+    try:
+        registry[job.name](*json.loads(job.args))
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            delay = backoff(job.attempts)
+            logger.warning(
+                'Задача %s: попытка %s не удалась, повтор через %.0f с',
+                job, job.attempts, delay,
+            )
+            _requeue(
+                job, last_error=error,
+                run_at=timezone.now() + timedelta(seconds=delay),
+            )
+        else:
+            logger.error('Задача %s не выполнена:\n%s', job, error)
+            Job.objects.filter(pk=job.pk).update(
+                state=Job.FAILED, locked_until=None, last_error=error,
+            )
+        return False
+    Job.objects.filter(pk=job.pk).delete()
+    return True
+
+
+def run_next():
+    """Выполняет одну задачу; False, если очередь пуста."""
+    job = claim()
+    if job is None:
+        return False
+    execute(job)
+    return True
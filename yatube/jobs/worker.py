@@ -0,0 +1,117 @@
+# jobs/worker.py
+"""Воркеры очереди: процессы, в каждом - несколько потоков."""
+import logging
+import multiprocessing
+import signal
+import threading
+import time
+
+from django.conf import settings
+from django.db import OperationalError, connection, connections
+
+from . import queue
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Потоки одного процесса; каждый забирает задачи по одной.
+
+    С burst=True поток завершается, когда очередь опустела
+    (для cron и тестов), иначе ждет новых задач poll_interval секунд.
+    """
+
+    def __init__(self, threads=1, poll_interval=None, burst=False):
+        self.threads = threads
+        self.poll_interval = (
+            settings.JOBS_POLL_INTERVAL if poll_interval is None
+            else poll_interval
+        )
+        self.burst = burst
+        self.processed = 0
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def stop(self, *args):
+        self._stop.set()
+
+    def _loop(self):
+        released = 0.0
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - released > settings.JOBS_LEASE_SECONDS:
+                    queue.release_expired()
+                    released = time.monotonic()
+                try:
+                    done = queue.run_next()
+                except OperationalError as error:
+                    # Например, база заблокирована другим воркером -
+                    # очередь не пуста, пробуем еще раз после паузы
+                    logger.warning('Ошибка при выборе задачи: %s', error)
+                    self._stop.wait(self.poll_interval)
+                    continue
+                if done:
+                    with self._lock:
+                        self.processed += 1
+                elif self.burst:
+                    return
+                else:
+                    self._stop.wait(self.poll_interval)
+        finally:
+            # У каждого потока свое соединение с базой
+            connection.close()
+
+    def run(self):
+        workers = [
+            threading.Thread(
+                target=self._loop, name=f'jobs-worker-{number}', daemon=True
+            )
+            for number in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return self.processed
+
+
+def _process_main(threads, poll_interval, burst):
+    worker = Worker(threads, poll_interval, burst)
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.run()
+
+
+def run(processes=1, threads=1, poll_interval=None, burst=False):
+    """Запускает воркеры; при processes > 1 - в дочерних процессах.
+
+    Возвращает число выполненных задач (для нескольких процессов
+    не считается и равно None).
+    """
+    if processes <= 1:
+        worker = Worker(threads, poll_interval, burst)
+        signal.signal(signal.SIGTERM, worker.stop)
+        signal.signal(signal.SIGINT, worker.stop)
+        return worker.run()
+    # Соединения родителя не должны достаться дочерним процессам
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    children = [
+        context.Process(
+            target=_process_main, args=(threads, poll_interval, burst),
+            name=f'jobs-process-{number}',
+        )
+        for number in range(processes)
+    ]
+    for child in children:
+        child.start()
+
+    def stop(*args):
+        for child in children:
+            child.terminate()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for child in children:
+        child.join()
+    return None
@@ -1,9 +1,29 @@
+from django.conf import settings
 from django.contrib import admin
+from django.db.models import Q
 
-from .models import Group, Post, Comment, Follow
+from core.paginator import EstimatedCountPaginator
+from . import search
+from .models import Group, Post, Comment, Follow, User
 
 
-class PostAdmin(admin.ModelAdmin):
+class LargeTableAdmin(admin.ModelAdmin):
+    """Списки больших таблиц: связанные объекты одним JOIN, выбор
+    автора, группы и поста через автодополнение вместо выпадающих
+    списков на все строки таблицы, оценка числа строк вместо COUNT(*)
+    и поиск только по индексам."""
+
+    paginator = EstimatedCountPaginator
+    # Иначе список считает еще и COUNT(*) по всей таблице
+    show_full_result_count = False
+    empty_value_display = '-пусто-'
+
+    def _users(self, term):
+        # Точное совпадение - поиск по уникальному индексу username
+        return User.objects.filter(username=term).values('pk')
+
+
+class PostAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'text',
@@ -11,10 +31,26 @@ class PostAdmin(admin.ModelAdmin):
         'author',
         'group',
     )
-    list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
+    # Поиск идет по полнотекстовому индексу (get_search_results),
+    # search_fields нужны для строки поиска и автодополнения
     search_fields = ('text',)
+    # Фильтр по датам не делает запросов, а фильтрует диапазоном
+    # по индексу - как и date_hierarchy
     list_filter = ('pub_date',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'pub_date'
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q(
+            pk__in=search.search(term, limit=settings.ADMIN_SEARCH_LIMIT)
+        ) | Q(author__in=self._users(term))
+        if term.isdigit():
+            condition |= Q(pk=term)
+        return queryset.filter(condition), False
 
 
 class GroupAdmin(admin.ModelAdmin):
@@ -29,7 +65,7 @@ class GroupAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'post',
@@ -37,19 +73,39 @@ class CommentAdmin(admin.ModelAdmin):
         'text',
         'created',
     )
-    search_fields = ('post', 'author', 'text', 'created',)
+    list_select_related = ('post', 'author')
+    autocomplete_fields = ('post', 'author')
+    search_fields = ('=post__pk', '=author__username')
     list_filter = ('created',)
-    empty_value_display = '-пусто-'
+    date_hierarchy = 'created'
+
+    def get_search_results(self, request, queryset, search_term):
+        # Номер поста или имя автора - оба ищутся по индексу
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        condition = Q(author__in=self._users(term))
+        if term.isdigit():
+            condition |= Q(post_id=term)
+        return queryset.filter(condition), False
 
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(LargeTableAdmin):
     list_display = (
         'pk',
         'user',
         'author',
     )
-    list_filter = ('user', 'author',)
-    empty_value_display = '-пусто-'
+    list_select_related = ('user', 'author')
+    autocomplete_fields = ('user', 'author')
+    search_fields = ('=user__username', '=author__username')
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        users = self._users(term)
+        return queryset.filter(Q(user__in=users) | Q(author__in=users)), False
 
 
 # При регистрации модели Post источником конфигурации для неё назначаем
@@ -0,0 +1,213 @@
+# posts/benchmarks.py
+"""Замеры страниц постов (команда bench_views).
+
+Каждый сценарий - адрес из posts/urls.py и, если нужно, пользователь.
+Запросы идут через тестовый клиент Django (тогда считаются и SQL-
+запросы) или по HTTP к запущенному серверу. Результаты можно сохранить
+как базовые и сравнивать с ними следующие прогоны.
+"""
+import json
+import math
+import statistics
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core import fragment_cache
+from .models import Follow, Group, Post, User, UserStats
+
+
+@dataclass
+class Scenario:
+    name: str
+    url: str
+    username: str = None
+
+
+@dataclass
+class Result:
+    name: str
+    url: str
+    requests: int
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    rps: float
+    queries: float = None
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def default_scenarios():
+    """Страницы лент на самых "тяжелых" объектах базы и те же данные
+    через JSON API (сценарии api_*)."""
+    api_posts = reverse('api:v1:post_list') + '?embed=author,group'
+    scenarios = [
+        Scenario('index', reverse('posts:index')),
+        Scenario('index_page_100', reverse('posts:index') + '?page=100'),
+        Scenario('api_posts', api_posts),
+    ]
+    group = Group.objects.order_by('-posts_count').first()
+    if group:
+        scenarios.append(Scenario(
+            'group_posts',
+            reverse('posts:group_posts', kwargs={'slug': group.slug}),
+        ))
+        scenarios.append(Scenario(
+            'api_group_posts', f'{api_posts}&group={group.slug}'
+        ))
+    author = UserStats.objects.order_by('-posts_count').select_related(
+        'user'
+    ).first()
+    if author:
+        scenarios.append(Scenario(
+            'profile',
+            reverse('posts:profile', kwargs={'username': author.user}),
+        ))
+    post = Post.objects.order_by('-comments_count').only('pk').first()
+    if post:
+        scenarios.append(Scenario(
+            'post_detail',
+            reverse('posts:post_detail', kwargs={'post_id': post.pk}),
+        ))
+        scenarios.append(Scenario(
+            'api_post_comments',
+            reverse('api:v1:comment_list', kwargs={'post_id': post.pk})
+            + '?embed=author',
+        ))
+    reader = (
+        Follow.objects.values('user__username')
+        .annotate(following=Count('author')).order_by('-following').first()
+    )
+    if reader:
+        scenarios.append(Scenario(
+            'follow_index', reverse('posts:follow_index'),
+            username=reader['user__username'],
+        ))
+    scenarios.append(Scenario('search', reverse('posts:search') + '?q=пост'))
+    return scenarios
+
+
+def _client(username):
+    # Хост из ALLOWED_HOSTS - команда работает вне тестового окружения
+    client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+    if username:
+        client.force_login(User.objects.get(username=username))
+    return client
+
+
+def _cold():
+    fragment_cache.get_cache().clear()
+
+
+def run_client(scenario, requests, warmup=3, cold=False):
+    """Последовательные запросы через тестовый клиент с подсчетом SQL."""
+    client = _client(scenario.username)
+    for _ in range(warmup):
+        client.get(scenario.url)
+    timings = []
+    queries = []
+    for _ in range(requests):
+        if cold:
+            _cold()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = client.get(scenario.url)
+            timings.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(
+                f'{scenario.url}: ответ {response.status_code}'
+            )
+        queries.append(len(context.captured_queries))
+    return _result(scenario, timings, sum(timings), statistics.mean(queries))
+
+
+def run_http(scenario, requests, base_url, concurrency=1, warmup=3):
+    """Запросы к запущенному серверу; SQL здесь не виден."""
+    headers = {}
+    if scenario.username:
+        client = _client(scenario.username)
+        cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+        headers['Cookie'] = f'{cookie.key}={cookie.value}'
+    url = base_url.rstrip('/') + scenario.url
+
+    def fetch(_):
+        request = urllib.request.Request(url, headers=headers)
+        started = time.perf_counter()
+        with urllib.request.urlopen(request) as response:
+            response.read()
+        return time.perf_counter() - started
+
+    for number in range(warmup):
+        fetch(number)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        timings = list(pool.map(fetch, range(requests)))
+    return _result(scenario, timings, time.perf_counter() - started)
+
+
+def _result(scenario, timings, elapsed, queries=None):
+    return Result(
+        name=scenario.name,
+        url=scenario.url,
+        requests=len(timings),
+        p50_ms=percentile(timings, 50) * 1000,
+        p99_ms=percentile(timings, 99) * 1000,
+        mean_ms=statistics.mean(timings) * 1000,
+        rps=len(timings) / elapsed if elapsed else 0.0,
+        queries=queries,
+    )
+
+
+def save_baseline(results, path):
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(
+            [asdict(result) for result in results], file,
+            ensure_ascii=False, indent=2,
+        )
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as file:
+        return {row['name']: Result(**row) for row in json.load(file)}
+
+
+def compare(results, baseline, tolerance=0.2):
+    """Регрессии относительно базовых результатов.
+
+    Время считается регрессией, если p50 или p99 выросли больше чем
+    на tolerance (доля), число запросов - при любом росте.
+    """
+    regressions = []
+    for result in results:
+        base = baseline.get(result.name)
+        if base is None:
+            continue
+        for field in ('p50_ms', 'p99_ms'):
+            old, new = getattr(base, field), getattr(result, field)
+            if old and new > old * (1 + tolerance):
+                regressions.append(
+                    f'{result.name}: {field} {old:.1f} -> {new:.1f}'
+                )
+        if (
+            base.queries is not None and result.queries is not None
+            and result.queries > base.queries
+        ):
+            regressions.append(
+                f'{result.name}: запросов {base.queries:g} -> '
+                f'{result.queries:g}'
+            )
+    return regressions
@@ -0,0 +1,104 @@
+# posts/conditional.py
+"""Условные GET и кэш страниц для лент и страницы поста.
+
+ETag и Last-Modified считаются по версиям областей кэша фрагментов
+(core.fragment_cache): версия меняется при каждой записи, которая
+видна на странице, и хранит время смены. Это одно чтение кэша на
+область, так что ответ 304 обходится без запросов ленты и шаблона.
+В ETag входят пользователь, его подписки и счетчик непрочитанных
+уведомлений - от них зависят части страницы в метках core.page_cache.
+Сама страница с метками кэшируется целиком по тем же версиям и общая
+для всех пользователей.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from core import fragment_cache, page_cache
+from . import following, notifications
+
+
+class PageValidators:
+    """Валидаторы страницы, которая показывает данные областей scopes.
+
+    per_user=False - страница одинакова для всех (ленты RSS и т.п.).
+    """
+
+    def __init__(self, request, *scopes, per_user=True):
+        self.request = request
+        self.per_user = per_user
+        self.etag = self.last_modified = self.versions = None
+        if request.method not in ('GET', 'HEAD'):
+            return
+        versions = [fragment_cache.get_version(scope) for scope in scopes]
+        if not all(fragment_cache.settled(version) for version in versions):
+            # Страница может быть прочитана с отстающей реплики
+            return
+        self.versions = versions
+        raw = [str(settings.PAGE_CACHE_VERSION), *versions]
+        if per_user:
+            user = request.user
+            raw += [
+                str(user.pk or ''),
+                following.fragment_key(following.following_ids(user)),
+                # Значок уведомлений в шапке
+                str(notifications.unread_count(user)),
+            ]
+        raw = '|'.join(raw)
+        # Слабый ETag: токен CSRF в формах меняется от рендера к рендеру
+        self.etag = 'W/"{}"'.format(hashlib.md5(raw.encode()).hexdigest())
+        changed = [fragment_cache.changed_at(version) for version in versions]
+        if None not in changed:
+            self.last_modified = max(changed)
+
+    def response(self):
+        """Ответ 304 (или 412), если страница у клиента не устарела."""
+        if self.etag is None:
+            return None
+        response = get_conditional_response(
+            self.request, etag=self.etag, last_modified=self.last_modified,
+        )
+        return response and self.apply(response)
+
+    def apply(self, response):
+        if self.etag is None or response.status_code not in (200, 304):
+            return response
+        response['ETag'] = self.etag
+        if self.last_modified is not None:
+            response['Last-Modified'] = http_date(self.last_modified)
+        # Браузер и прокси хранят страницу, но каждый раз сверяются
+        patch_cache_control(
+            response, no_cache=True,
+            private=(
+                self.per_user and self.request.user.is_authenticated
+            ),
+        )
+        return response
+
+
+class CachedPage(PageValidators):
+    """Условный GET плюс кэш страницы целиком."""
+
+    def __init__(self, request, *scopes, per_user=True):
+        super().__init__(request, *scopes, per_user=per_user)
+        self.key = None
+        if self.versions is not None:
+            self.key = page_cache.page_key(request, *self.versions)
+
+    def response(self):
+        """Ответ 304 или страница из кэша (метки заполнит middleware)."""
+        response = super().response()
+        if response is None and self.key:
+            response = page_cache.get_page(self.key)
+            if response is not None:
+                response = super().apply(response)
+        return response
+
+    def apply(self, response):
+        if self.key:
+            page_cache.set_page(
+                self.key, response, settings.FRAGMENT_CACHE_TIMEOUT
+            )
+        return super().apply(response)
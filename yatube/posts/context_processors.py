@@ -0,0 +1,14 @@
+# posts/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from . import following
+
+
+def following_ids(request):
+    """Добавляет following_ids; множество загружается, только если
+    шаблон к нему обратился."""
+    return {
+        'following_ids': SimpleLazyObject(
+            lambda: following.following_ids(request.user)
+        ),
+    }
@@ -0,0 +1,182 @@
+# posts/counters.py
+import json
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import (
+    Comment, Follow, Group, GroupAuthorStats, Post, User, UserStats
+)
+
+
+def _shift(queryset, **deltas):
+    """Атомарно сдвигает счетчики (UPDATE ... SET f = f + d).
+
+    Счетчик не уходит в минус: при уменьшении строка с уже нулевым
+    значением не обновляется (такое расхождение найдет reconcile).
+    """
+    for field, delta in deltas.items():
+        if delta < 0:
+            queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def shift_user(user_id, **deltas):
+    updated = _shift(UserStats.objects.filter(user_id=user_id), **deltas)
+    # Строку счетчиков создаем только при увеличении: при уменьшении
+    # пользователь может как раз удаляться каскадом
+    if not updated and all(delta > 0 for delta in deltas.values()):
+        UserStats.objects.get_or_create(user_id=user_id)
+        _shift(UserStats.objects.filter(user_id=user_id), **deltas)
+
+
+def shift_group(group_id, delta):
+    if group_id is not None:
+        _shift(Group.objects.filter(pk=group_id), posts_count=delta)
+
+
+def shift_group_author(group_id, author_id, delta):
+    """Посты группы и посты автора в ней; после сдвига нужен
+    refresh_group."""
+    if group_id is None:
+        return
+    shift_group(group_id, delta)
+    stats = GroupAuthorStats.objects.filter(
+        group_id=group_id, author_id=author_id
+    )
+    if not _shift(stats, posts_count=delta) and delta > 0:
+        GroupAuthorStats.objects.get_or_create(
+            group_id=group_id, author_id=author_id
+        )
+        _shift(stats, posts_count=delta)
+
+
+def refresh_group(group_id):
+    """Пересчитывает дату последнего поста и самых активных авторов
+    группы - два запроса по индексам, без агрегации по постам."""
+    if group_id is None:
+        return
+    top = GroupAuthorStats.objects.filter(
+        group_id=group_id, posts_count__gt=0
+    ).order_by('-posts_count', 'author_id').values_list(
+        'author_id', 'posts_count'
+    )[:settings.GROUP_TOP_AUTHORS]
+    Group.objects.filter(pk=group_id).update(
+        top_authors=json.dumps([list(row) for row in top]),
+        last_post_date=Post.objects.filter(group_id=group_id).order_by(
+            '-pub_date', '-id'
+        ).values_list('pub_date', flat=True).first(),
+    )
+
+
+def rebuild_group_stats():
+    """Заново считает посты авторов по группам одним INSERT ... SELECT
+    (после загрузок без сигналов) и обновляет все группы.
+    Возвращает число строк GroupAuthorStats."""
+    quote = connection.ops.quote_name
+    stats, post = (
+        quote(model._meta.db_table) for model in (GroupAuthorStats, Post)
+    )
+    with transaction.atomic():
+        GroupAuthorStats.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {stats} (group_id, author_id, posts_count) '
+                f'SELECT group_id, author_id, COUNT(*) FROM {post} '
+                f'WHERE group_id IS NOT NULL GROUP BY group_id, author_id'
+            )
+            inserted = cursor.rowcount
+        for group_id in Group.objects.values_list('pk', flat=True):
+            refresh_group(group_id)
+    return inserted
+
+
+def shift_post(post_id, delta):
+    _shift(Post.objects.filter(pk=post_id), comments_count=delta)
+
+
+def _count(model, field):
+    """Подзапрос с реальным количеством строк model для внешней записи."""
+    return Coalesce(Subquery(
+        model.objects.filter(**{field: OuterRef('pk')})
+        .order_by().values(field).annotate(n=Count('pk')).values('n'),
+        output_field=IntegerField(),
+    ), 0)
+
+
+def _drift(queryset, counters):
+    """Записи, у которых сохраненные счетчики разошлись с реальными.
+
+    counters - словарь {поле: (выражение сохраненного значения,
+    выражение реального значения)}.
+    """
+    annotations = {}
+    mismatch = Q()
+    for field, (stored, actual) in counters.items():
+        annotations[f'stored_{field}'] = stored
+        annotations[f'actual_{field}'] = actual
+        mismatch |= ~Q(**{f'stored_{field}': F(f'actual_{field}')})
+    return queryset.annotate(**annotations).filter(mismatch)
+
+
+def _checks():
+    """Что сверять: (модель со счетчиками, queryset,
+    {поле: (сохраненное значение, реальное значение)})."""
+    return (
+        (Group, Group.objects.all(), {
+            'posts_count': (F('posts_count'), _count(Post, 'group')),
+        }),
+        (Post, Post.objects.order_by(), {
+            'comments_count': (
+                F('comments_count'), _count(Comment, 'post')
+            ),
+        }),
+        (UserStats, User.objects.all(), {
+            'posts_count': (
+                Coalesce(F('stats__posts_count'), 0),
+                _count(Post, 'author'),
+            ),
+            'followers_count': (
+                Coalesce(F('stats__followers_count'), 0),
+                _count(Follow, 'author'),
+            ),
+            'following_count': (
+                Coalesce(F('stats__following_count'), 0),
+                _count(Follow, 'user'),
+            ),
+        }),
+    )
+
+
+def reconcile(fix=False):
+    """Ищет расхождения счетчиков; при fix=True исправляет их.
+
+    Возвращает список (модель, pk, поле, сохранено, реально).
+    """
+    drift = []
+    for model, queryset, counters in _checks():
+        # Список, а не iterator(): ниже меняем эти же таблицы
+        for row in list(_drift(queryset, counters)):
+            actual = {
+                field: getattr(row, f'actual_{field}') for field in counters
+            }
+            for field, actual_value in actual.items():
+                stored_value = getattr(row, f'stored_{field}')
+                if stored_value != actual_value:
+                    drift.append((
+                        model.__name__, row.pk, field,
+                        stored_value, actual_value,
+                    ))
+            if not fix:
+                continue
+            if model is UserStats:
+                UserStats.objects.update_or_create(
+                    user_id=row.pk, defaults=actual
+                )
+            else:
+                model.objects.filter(pk=row.pk).update(**actual)
+    return drift
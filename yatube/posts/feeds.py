@@ -0,0 +1,164 @@
+# posts/feeds.py
+"""RSS, Atom и JSON Feed для общей ленты, групп и авторов.
+
+Документ отдается по частям (StreamingHttpResponse): шапка, затем по
+элементу на каждый пост из queryset.iterator(), - целиком в памяти
+лента не собирается. XML пишут генераторы django.utils.feedgenerator,
+между элементами их буфер выгружается в ответ.
+"""
+import io
+import json
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse
+from django.utils import feedgenerator
+from django.utils.xmlutils import SimplerXMLGenerator
+
+
+def _drain(buffer):
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+class StreamingFeedMixin:
+    """Потоковая запись для генераторов feedgenerator."""
+
+    def latest_post_date(self):
+        # Элементы еще не прочитаны - время обновления передает вид
+        return self.feed.get('updated') or super().latest_post_date()
+
+    def item(self, **fields):
+        """Элемент в том виде, в каком его готовит add_item()."""
+        self.add_item(**fields)
+        return self.items.pop()
+
+    def stream(self, items):
+        buffer = io.StringIO()
+        handler = SimplerXMLGenerator(buffer, 'utf-8')
+        handler.startDocument()
+        self.open_document(handler)
+        yield _drain(buffer)
+        for item in items:
+            handler.startElement(self.item_tag, self.item_attributes(item))
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_tag)
+            yield _drain(buffer)
+        self.close_document(handler)
+        yield _drain(buffer)
+
+
+class RssFeed(StreamingFeedMixin, feedgenerator.Rss201rev2Feed):
+    item_tag = 'item'
+
+    def open_document(self, handler):
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close_document(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class AtomFeed(StreamingFeedMixin, feedgenerator.Atom1Feed):
+    item_tag = 'entry'
+
+    def open_document(self, handler):
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def close_document(self, handler):
+        handler.endElement('feed')
+
+
+class JsonFeed(StreamingFeedMixin, feedgenerator.SyndicationFeed):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1)."""
+
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def stream(self, items):
+        head = json.dumps({
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+        }, ensure_ascii=False)
+        # Открываем массив items внутри объекта и пишем его по элементу
+        yield head[:-1] + ', "items": ['
+        separator = ''
+        for item in items:
+            entry = {
+                'id': item['unique_id'],
+                'url': item['link'],
+                'title': item['title'],
+                'content_text': item['description'],
+                'date_published': item['pubdate'].isoformat(),
+                'authors': [{
+                    'name': item['author_name'],
+                    'url': item['author_link'],
+                }],
+            }
+            if item['categories']:
+                entry['tags'] = item['categories']
+            yield separator + json.dumps(entry, ensure_ascii=False)
+            separator = ', '
+        yield ']}'
+
+
+FORMATS = {'rss': RssFeed, 'atom': AtomFeed, 'json': JsonFeed}
+
+
+def feed_posts(queryset):
+    """Последние FEED_ITEMS постов; читаются курсором, без кэша
+    результатов queryset."""
+    return queryset.select_related('author', 'group').only(
+        'id', 'text', 'pub_date', 'author_id', 'author__username',
+        'author__first_name', 'author__last_name',
+        'group_id', 'group__title',
+    )[:settings.FEED_ITEMS].iterator()
+
+
+def post_items(request, feed, posts):
+    for post in posts:
+        link = request.build_absolute_uri(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        yield feed.item(
+            title=truncatechars(post.text, 50),
+            link=link,
+            description=post.text,
+            author_name=post.author.get_full_name() or post.author.username,
+            author_link=request.build_absolute_uri(
+                reverse('posts:profile', kwargs={'username': post.author})
+            ),
+            pubdate=post.pub_date,
+            unique_id=link,
+            unique_id_is_permalink=True,
+            categories=[post.group.title] if post.group_id else (),
+        )
+
+
+def stream(request, fmt, queryset, title, link, description, updated=None):
+    """Части документа ленты и его Content-Type.
+
+    updated - время последнего изменения ленты (unix time), если
+    известно.
+    """
+    if updated is not None:
+        updated = datetime.fromtimestamp(updated, timezone.utc)
+    feed = FORMATS[fmt](
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=description,
+        feed_url=request.build_absolute_uri(),
+        language=settings.LANGUAGE_CODE,
+        updated=updated,
+    )
+    items = post_items(request, feed, feed_posts(queryset))
+    return feed.stream(items), feed.content_type
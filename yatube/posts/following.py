@@ -0,0 +1,56 @@
+# posts/following.py
+"""Авторы, на которых подписан пользователь.
+
+Множество id загружается одним запросом и лежит в кэше до подписки
+или отписки (сбрасывается сигналами), а в пределах запроса - на самом
+объекте пользователя. Шаблоны получают его из context processor
+posts.context_processors.following и проверяют автора за O(1):
+{% if author_id in following_ids %}.
+"""
+import hashlib
+
+from django.conf import settings
+from django.db import transaction
+
+from core import fragment_cache
+from .models import Follow
+
+KEY = 'following:{}'
+
+
+def following_ids(user):
+    """frozenset id авторов, на которых подписан user."""
+    if not user.is_authenticated:
+        return frozenset()
+    ids = getattr(user, '_following_ids', None)
+    if ids is not None:
+        return ids
+    cache = fragment_cache.get_cache()
+    key = KEY.format(user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(
+            Follow.objects.filter(user=user).values_list(
+                'author_id', flat=True
+            )
+        )
+        cache.set(key, ids, settings.FOLLOWING_CACHE_TIMEOUT)
+    user._following_ids = ids
+    return ids
+
+
+def fragment_key(ids):
+    """Короткий отпечаток множества для ETag страниц: у пользователей
+    с одинаковыми подписками (в том числе анонимов и не подписанных
+    ни на кого) он общий."""
+    if not ids:
+        return ''
+    raw = ','.join(map(str, sorted(ids)))
+    return hashlib.md5(raw.encode()).hexdigest()[:12]
+
+
+def invalidate(user_id):
+    # Сразу и после коммита - как fragment_cache.bump
+    key = KEY.format(user_id)
+    fragment_cache.get_cache().delete(key)
+    transaction.on_commit(lambda: fragment_cache.get_cache().delete(key))
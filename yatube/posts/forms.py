@@ -1,7 +1,10 @@
 # forms.py
+from functools import partial
+
 from django import forms
 
 from .models import Post, Comment
+from .uploads import header_to_python
 
 
 class PostForm(forms.ModelForm):
@@ -11,6 +14,13 @@ class PostForm(forms.ModelForm):
         # Укажем, какие поля будут в форме
         fields = ('text', 'group', 'image')
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Поле остается ImageField, но картинка проверяется
+        # по заголовку, без чтения файла целиком
+        image = self.fields['image']
+        image.to_python = partial(header_to_python, image)
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,177 @@
+# posts/images.py
+"""Варианты картинок постов для <picture> и srcset.
+
+Картинка кадрируется по центру в пропорции POST_IMAGE_ASPECT (как
+миниатюры лент) и сохраняется в нескольких ширинах и форматах.
+Метаданные (EXIF, в том числе координаты) в варианты не попадают.
+"""
+import io
+import logging
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from core import fragment_cache
+from . import scopes
+from .models import ImageVariant, Post
+
+logger = logging.getLogger(__name__)
+
+MIME_TYPES = {
+    'AVIF': 'image/avif',
+    'WEBP': 'image/webp',
+    'JPEG': 'image/jpeg',
+    'PNG': 'image/png',
+}
+EXTENSIONS = {'AVIF': 'avif', 'WEBP': 'webp', 'JPEG': 'jpg', 'PNG': 'png'}
+SAVE_OPTIONS = {
+    'AVIF': {'quality': 60},
+    'WEBP': {'quality': 80, 'method': 4},
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+}
+
+
+def available_formats():
+    """Форматы из настроек, которые умеет сохранять Pillow."""
+    Image.init()
+    return [fmt for fmt in settings.POST_IMAGE_FORMATS if fmt in Image.SAVE]
+
+
+def target_widths(source_width):
+    """Ширины вариантов: не шире исходника, но хотя бы одна."""
+    widths = sorted(settings.POST_IMAGE_WIDTHS)
+    fitting = [width for width in widths if width <= source_width]
+    return fitting or widths[:1]
+
+
+def _prepare(image, fmt):
+    if fmt == 'JPEG' or image.mode not in ('RGB', 'RGBA'):
+        has_alpha = image.mode in ('RGBA', 'LA') or (
+            image.mode == 'P' and 'transparency' in image.info
+        )
+        return image.convert('RGBA' if has_alpha and fmt != 'JPEG' else 'RGB')
+    return image
+
+
+def _encode(image, fmt):
+    buffer = io.BytesIO()
+    # Метаданные (exif, icc, xmp) отбрасываем - PNG и WEBP
+    # иначе берут их из image.info
+    image.info = {
+        key: value for key, value in image.info.items()
+        if key == 'transparency'
+    }
+    image.save(buffer, fmt, **SAVE_OPTIONS.get(fmt, {}))
+    return buffer.getvalue()
+
+
+def build_variants(post_id):
+    """Пересоздает варианты картинки поста и запоминает ее размеры.
+
+    Затем сбрасывает страницы с постом: разметка <picture> меняется,
+    а отрисованные раньше страницы лежат в кэше.
+    """
+    post = Post.objects.filter(pk=post_id).only(
+        'pk', 'image', 'author_id', 'group_id'
+    ).first()
+    if post is None:
+        return []
+    variants = _build_variants(post)
+    fragment_cache.bump(*scopes.post_scopes(post, post.group_id))
+    return variants
+
+
+def _build_variants(post):
+    post_id = post.pk
+    delete_variants(post)
+    image = _open(post)
+    if image is None:
+        Post.objects.filter(pk=post_id).update(
+            image_width=None, image_height=None
+        )
+        return []
+    # Учитываем поворот из EXIF до того, как его отбросить
+    image = ImageOps.exif_transpose(image)
+    Post.objects.filter(pk=post_id).update(
+        image_width=image.width, image_height=image.height
+    )
+    aspect_width, aspect_height = settings.POST_IMAGE_ASPECT
+    stem = os.path.splitext(os.path.basename(post.image.name))[0]
+    variants = []
+    for width in target_widths(image.width):
+        height = round(width * aspect_height / aspect_width)
+        resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+        for fmt in available_formats():
+            variant = ImageVariant(
+                post=post, format=fmt, width=width, height=height
+            )
+            variant.file.save(
+                f'{post.pk}/{stem}-{width}.{EXTENSIONS[fmt]}',
+                ContentFile(_encode(_prepare(resized, fmt), fmt)),
+                save=False,
+            )
+            variants.append(variant)
+    return ImageVariant.objects.bulk_create(variants)
+
+
+def _open(post):
+    """Картинка поста или None, если ее нет или ее не прочитать.
+
+    Пропавший или битый файл не появится при повторе задачи - такой
+    пост показывается без <picture>, как пост без картинки.
+    """
+    if not post.image:
+        return None
+    try:
+        with post.image.open('rb') as source:
+            image = Image.open(source)
+            image.load()
+    except (OSError, SuspiciousFileOperation):
+        logger.warning(
+            'Не прочитать картинку %s поста %s', post.image.name, post.pk
+        )
+        return None
+    return image
+
+
+def delete_variants(post):
+    for variant in post.image_variants.all():
+        variant.file.delete(save=False)
+    post.image_variants.all().delete()
+
+
+def picture_sources(post):
+    """Данные для <picture>: source по форматам и запасной <img>.
+
+    Варианты берутся из post.image_variants.all() - в лентах они
+    подгружаются одним prefetch-запросом на страницу.
+    """
+    by_format = {}
+    for variant in post.image_variants.all():
+        by_format.setdefault(variant.format, []).append(variant)
+    if not by_format:
+        return None
+    formats = [fmt for fmt in settings.POST_IMAGE_FORMATS if fmt in by_format]
+    fallback_format = formats.pop()
+
+    def srcset(variants):
+        return ', '.join(
+            f'{variant.file.url} {variant.width}w' for variant in variants
+        )
+
+    fallback = by_format[fallback_format]
+    largest = fallback[-1]
+    return {
+        'sources': [
+            {'type': MIME_TYPES[fmt], 'srcset': srcset(by_format[fmt])}
+            for fmt in formats
+        ],
+        'src': largest.file.url,
+        'srcset': srcset(fallback),
+        'width': largest.width,
+        'height': largest.height,
+    }
@@ -0,0 +1,86 @@
+# posts/management/commands/bench_views.py
+import logging
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет страницы постов: p50/p99, запросы к базе, '
+        'пропускная способность; сравнивает с базовыми результатами'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'names', nargs='*', help='Сценарии; по умолчанию - все',
+        )
+        parser.add_argument('--requests', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кэш фрагментов перед каждым запросом',
+        )
+        parser.add_argument(
+            '--base-url',
+            help='Адрес запущенного сервера (иначе - тестовый клиент)',
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=1,
+            help='Параллельных запросов при --base-url',
+        )
+        parser.add_argument('--save-baseline', metavar='PATH')
+        parser.add_argument('--compare', metavar='PATH')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.2,
+            help='Допустимый рост времени при --compare (доля)',
+        )
+
+    def handle(self, *args, **options):
+        # Строки метрик каждого запроса только мешают таблице
+        logging.getLogger('core.requests').setLevel(logging.WARNING)
+        scenarios = benchmarks.default_scenarios()
+        if options['names']:
+            scenarios = [
+                scenario for scenario in scenarios
+                if scenario.name in options['names']
+            ]
+        results = []
+        self.stdout.write(
+            f"{'сценарий':<16}{'p50, мс':>10}{'p99, мс':>10}"
+            f"{'запр/с':>10}{'SQL':>8}"
+        )
+        for scenario in scenarios:
+            if options['base_url']:
+                result = benchmarks.run_http(
+                    scenario, options['requests'], options['base_url'],
+                    concurrency=options['concurrency'],
+                    warmup=options['warmup'],
+                )
+            else:
+                result = benchmarks.run_client(
+                    scenario, options['requests'],
+                    warmup=options['warmup'], cold=options['cold'],
+                )
+            results.append(result)
+            queries = '-' if result.queries is None else f'{result.queries:g}'
+            self.stdout.write(
+                f'{result.name:<16}{result.p50_ms:>10.1f}'
+                f'{result.p99_ms:>10.1f}{result.rps:>10.1f}{queries:>8}'
+            )
+        if options['save_baseline']:
+            benchmarks.save_baseline(results, options['save_baseline'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Базовые результаты: {options['save_baseline']}"
+            ))
+        if options['compare']:
+            regressions = benchmarks.compare(
+                results, benchmarks.load_baseline(options['compare']),
+                tolerance=options['tolerance'],
+            )
+            if regressions:
+                raise CommandError(
+                    'Регрессии:\n' + '\n'.join(regressions)
+                )
+            self.stdout.write(self.style.SUCCESS('Регрессий нет'))
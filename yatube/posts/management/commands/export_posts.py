@@ -0,0 +1,67 @@
+# posts/management/commands/export_posts.py
+import sys
+
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты в JSONL или CSV потоком, с контрольной точкой '
+        'для продолжения прерванной выгрузки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdout')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default=None,
+            help='По умолчанию - по расширению файла, иначе jsonl',
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Файл с последним выгруженным pk; с ним выгрузка '
+                 'дописывает файл с места остановки',
+        )
+        parser.add_argument('--group', default=None, help='slug группы')
+        parser.add_argument('--author', default=None, help='username автора')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        checkpoint = transfer.Checkpoint(options['checkpoint'])
+        state = checkpoint.load()
+        after_pk = state.get('last_pk', 0)
+        queryset = Post.objects.all()
+        if options['group']:
+            queryset = queryset.filter(group__slug=options['group'])
+        if options['author']:
+            queryset = queryset.filter(author__username=options['author'])
+        progress = transfer.Progress('Выгружено', self.stderr.write)
+        done = state.get('rows', 0)
+
+        def on_chunk(last_pk, written):
+            checkpoint.save(last_pk=last_pk, rows=done + written)
+            progress.update(written, f', всего {done + written}')
+
+        if path == '-':
+            file = sys.stdout
+        else:
+            # Продолжение дописывает файл, иначе он создается заново
+            file = open(path, 'a' if state else 'w', encoding='utf-8',
+                        newline='')
+        try:
+            written = transfer.export_posts(
+                file, fmt, queryset, after_pk=after_pk,
+                chunk_size=options['chunk_size'], header=not state,
+                on_chunk=on_chunk,
+            )
+        finally:
+            if file is not sys.stdout:
+                file.close()
+        checkpoint.clear()
+        self.stderr.write(self.style.SUCCESS(
+            f'Выгружено постов: {done + written}'
+        ))
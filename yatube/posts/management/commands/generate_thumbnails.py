@@ -0,0 +1,22 @@
+# posts/management/commands/generate_thumbnails.py
+from django.core.management.base import BaseCommand
+
+from posts import scopes, thumbnails
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создает недостающие миниатюры картинок постов'
+
+    def handle(self, *args, **options):
+        names = (
+            Post.objects.exclude(image='')
+            .values_list('image', flat=True).distinct().iterator()
+        )
+        done = 0
+        for name in names:
+            thumbnails.generate(name)
+            # Страницы с заглушкой вместо миниатюры устарели
+            scopes.bump_posts(Post.objects.filter(image=name))
+            done += 1
+        self.stdout.write(self.style.SUCCESS(f'Обработано картинок: {done}'))
@@ -0,0 +1,80 @@
+# posts/management/commands/import_posts.py
+import sys
+
+from django.core.management.base import BaseCommand
+
+from core import routers
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSONL или CSV пачками bulk_create, '
+        'с контрольной точкой для продолжения прерванной загрузки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdin')
+        parser.add_argument(
+            '--format', choices=transfer.FORMATS, default=None,
+            help='По умолчанию - по расширению файла, иначе jsonl',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Постов в одном bulk_create',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=10000,
+            help='Строк файла в одной транзакции',
+        )
+        parser.add_argument(
+            '--checkpoint', default=None,
+            help='Файл с числом загруженных строк; с ним повторный '
+                 'запуск пропускает уже загруженное',
+        )
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы; иначе такие '
+                 'строки пропускаются',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or transfer.guess_format(path)
+        checkpoint = transfer.Checkpoint(options['checkpoint'])
+        skip = checkpoint.load().get('position', 0)
+        progress = transfer.Progress('Загружено', self.stdout.write)
+
+        # Словари авторов и групп должны видеть только что созданные
+        # записи, поэтому все чтения - с основной базы
+        with routers.use_primary():
+            importer = transfer.Importer(
+                batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'],
+                create_missing=options['create_missing'],
+            )
+
+            def on_chunk(position):
+                checkpoint.save(position=position)
+                progress.update(
+                    importer.created,
+                    f', пропущено {importer.skipped}, строка {position}',
+                )
+
+            if path == '-':
+                file = sys.stdin
+            else:
+                file = open(path, encoding='utf-8', newline='')
+            try:
+                importer.run(
+                    transfer.read_rows(file, fmt), skip=skip,
+                    on_chunk=on_chunk,
+                )
+            finally:
+                if file is not sys.stdin:
+                    file.close()
+        checkpoint.clear()
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено постов: {importer.created}, '
+            f'пропущено строк: {importer.skipped}'
+        ))
@@ -0,0 +1,21 @@
+# posts/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает поисковый индекс постов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Постов в одной транзакции',
+        )
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {indexed} '
+            f'(индекс: {search.get_backend().name})'
+        ))
@@ -0,0 +1,25 @@
+# posts/management/commands/rebuild_timelines.py
+from django.core.management.base import BaseCommand
+
+from posts import timelines
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает ленты подписок (TimelineEntry) пачками'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи; по умолчанию - все, у кого есть лента',
+        )
+
+    def handle(self, *args, **options):
+        if options['usernames']:
+            users = User.objects.filter(username__in=options['usernames'])
+            inserted = timelines.rebuild(users.iterator())
+        else:
+            inserted = timelines.rebuild_all()
+        self.stdout.write(
+            self.style.SUCCESS(f'Записей в лентах: {inserted}')
+        )
@@ -0,0 +1,37 @@
+# posts/management/commands/reconcile_counters.py
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Сверяет денормализованные счетчики с реальными данными'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fix', action='store_true',
+            help='Исправить найденные расхождения '
+                 'и пересчитать статистику групп',
+        )
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(fix=options['fix'])
+        for model, pk, field, stored, actual in drift:
+            self.stdout.write(
+                f'{model} pk={pk} {field}: сохранено {stored}, '
+                f'реально {actual}'
+            )
+        if not drift:
+            self.stdout.write(self.style.SUCCESS('Расхождений нет'))
+        elif options['fix']:
+            self.stdout.write(
+                self.style.SUCCESS(f'Исправлено расхождений: {len(drift)}')
+            )
+        if options['fix']:
+            # Посты авторов по группам проще пересчитать целиком
+            rows = counters.rebuild_group_stats()
+            self.stdout.write(f'Статистика групп по авторам: {rows}')
+        else:
+            self.stdout.write(
+                self.style.WARNING(f'Найдено расхождений: {len(drift)}')
+            )
@@ -0,0 +1,51 @@
+# posts/management/commands/seed_bench.py
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.seed import Seeder
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу пользователями, постами, комментариями '
+        'и подписками для нагрузочных замеров (bench_views)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--posts', type=int, default=200000)
+        parser.add_argument('--comments', type=int, default=500000)
+        parser.add_argument(
+            '--follows', type=int, default=30,
+            help='Подписок на пользователя в среднем',
+        )
+        parser.add_argument(
+            '--days', type=int, default=365,
+            help='За сколько дней распределить посты',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--seed', type=int, default=None,
+            help='Зерно генератора для воспроизводимых данных',
+        )
+        parser.add_argument(
+            '--no-index', action='store_true',
+            help='Не пересобирать поисковый индекс',
+        )
+
+    def handle(self, *args, **options):
+        seeder = Seeder(
+            users=options['users'],
+            groups=options['groups'],
+            posts=options['posts'],
+            comments=options['comments'],
+            follows=options['follows'],
+            days=options['days'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+            log=self.stdout.write,
+        )
+        with transaction.atomic():
+            seeder.run(index=not options['no_index'])
+        self.stdout.write(self.style.SUCCESS('Данные для замеров созданы'))
@@ -0,0 +1,23 @@
+# posts/management/commands/send_digests.py
+from django.core.management.base import BaseCommand
+
+from posts import notifications
+
+
+class Command(BaseCommand):
+    help = (
+        'Рассылает письма с непрочитанными уведомлениями '
+        '(запускать раз в день, например из cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Пользователей в одной пачке',
+        )
+
+    def handle(self, *args, **options):
+        sent = notifications.send_digests(
+            batch_size=options['batch_size'], log=self.stdout.write,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Всего писем: {sent}'))
@@ -0,0 +1,83 @@
+# Generated by Django 2.2.16 on 2026-10-18 04:45
+
+import json
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    GroupAuthorStats.objects.bulk_create(
+        GroupAuthorStats(
+            group_id=row['group'], author_id=row['author'],
+            posts_count=row['n'],
+        )
+        for row in Post.objects.filter(group__isnull=False).order_by()
+        .values('group', 'author').annotate(n=Count('pk')).iterator()
+    )
+    for group_id in Group.objects.values_list('pk', flat=True):
+        top = GroupAuthorStats.objects.filter(group_id=group_id).order_by(
+            '-posts_count', 'author_id'
+        ).values_list('author_id', 'posts_count')[:settings.GROUP_TOP_AUTHORS]
+        Group.objects.filter(pk=group_id).update(
+            top_authors=json.dumps([list(row) for row in top]),
+            last_post_date=Post.objects.filter(group_id=group_id).order_by(
+                '-pub_date'
+            ).values_list('pub_date', flat=True).first(),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0019_notification'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='last_post_date',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Последний пост'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='top_authors',
+            field=models.TextField(default='[]', editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['-posts_count', '-id'], name='group_posts_count'),
+        ),
+        migrations.AddField(
+            model_name='groupauthorstats',
+            name='author',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='groupauthorstats',
+            name='group',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.Group'),
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(fields=['group', '-posts_count', 'author'], name='group_author_posts'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthorstats',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_author'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 05:20
+
+from django.conf import settings
+from django.db import migrations
+
+
+def fill_timelines(apps, schema_editor):
+    # Ленты подписок читаются только из TimelineEntry: раскладываем
+    # посты, написанные до 0013, одним INSERT ... SELECT (как
+    # timelines.rebuild_all). Записи, уже разложенные сигналами,
+    # пропускаются
+    ops = schema_editor.connection.ops
+    entry, follow, post, stats = (
+        ops.quote_name(apps.get_model('posts', name)._meta.db_table)
+        for name in ('TimelineEntry', 'Follow', 'Post', 'UserStats')
+    )
+    schema_editor.execute(
+        f'{ops.insert_statement(ignore_conflicts=True)} '
+        f'{entry} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date '
+        f'FROM {follow} f JOIN {post} p ON p.author_id = f.author_id '
+        f'LEFT JOIN {stats} s ON s.user_id = f.author_id '
+        f'WHERE COALESCE(s.followers_count, 0) <= %s '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}',
+        [settings.TIMELINE_CELEBRITY_FOLLOWERS],
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0020_groupauthorstats'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_timelines, migrations.RunPython.noop),
+    ]
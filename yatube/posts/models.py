@@ -1,21 +1,76 @@
 # models.py
 
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, router, transaction
 
 User = get_user_model()
 
 
+class AtomicSaveMixin:
+    """save() вместе с обработчиками post_save (счетчики, ленты)
+    выполняется в одной транзакции."""
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(
+            type(self), instance=self
+        )
+        with transaction.atomic(using=using):
+            super().save(*args, **kwargs)
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(unique=True)
     description = models.TextField()
+    # Денормализованный счетчик, обновляется сигналами
+    posts_count = models.PositiveIntegerField(
+        verbose_name='Постов в группе',
+        default=0,
+        editable=False,
+    )
+    # Для каталога групп, тоже обновляются сигналами
+    # (counters.refresh_group)
+    last_post_date = models.DateTimeField(
+        verbose_name='Последний пост',
+        null=True,
+        editable=False,
+    )
+    # JSON [[id автора, постов], ...] - самые активные авторы группы
+    top_authors = models.TextField(default='[]', editable=False)
+
+    class Meta:
+        indexes = [
+            # Каталог групп (/groups/): сначала самые большие
+            models.Index(
+                fields=['-posts_count', '-id'], name='group_posts_count'
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
 
-class Post(models.Model):
+# Колонки поста, которые нужны шаблонам лент
+FEED_FIELDS = (
+    'id', 'text', 'pub_date', 'image', 'comments_count',
+    'author_id', 'author__username',
+    'author__first_name', 'author__last_name',
+    'group_id', 'group__slug', 'group__title',
+)
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа одним JOIN, только нужные
+        шаблонам колонки. Число комментариев берется из счетчика
+        comments_count, отдельная агрегация не нужна; варианты картинок
+        подгружаются одним запросом на страницу."""
+        return self.select_related('author', 'group').prefetch_related(
+            'image_variants'
+        ).only(*FEED_FIELDS)
+
+
+class Post(AtomicSaveMixin, models.Model):
     text = models.TextField(
         verbose_name='Text',
         help_text='Текст нового поста'
@@ -47,6 +102,21 @@ class Post(models.Model):
     )
     # Аргумент upload_to указывает директорию,
     # в которую будут загружаться пользовательские файлы.
+    # Размеры исходной картинки, заполняются при подготовке вариантов
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False
+    )
+    # Денормализованный счетчик, обновляется сигналами
+    comments_count = models.PositiveIntegerField(
+        verbose_name='Комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         # ordering = ['-pub_date']
@@ -54,13 +124,24 @@ class Post(models.Model):
         ordering = ['-pub_date', '-pk']
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
+        # Индексы под сортировку лент: страница читается по индексу,
+        # без полного прохода по таблице и сортировки во временном B-tree
+        indexes = [
+            models.Index(fields=['-pub_date', '-id'], name='post_date'),
+            models.Index(
+                fields=['author', '-pub_date', '-id'], name='post_author_date'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'], name='post_group_date'
+            ),
+        ]
 
     def __str__(self):
         # выводим начало текста поста
         return self.text[:15]
 
 
-class Comment(models.Model):
+class Comment(AtomicSaveMixin, models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
@@ -82,8 +163,18 @@ class Comment(models.Model):
         auto_now_add=True
     )
 
+    class Meta:
+        indexes = [
+            # Комментарии поста по порядку (posts.views.comments_page)
+            models.Index(
+                fields=['post', 'created', 'id'], name='comment_post_created'
+            ),
+            # Границы дат для date_hierarchy в админке
+            models.Index(fields=['created'], name='comment_created'),
+        ]
 
-class Follow(models.Model):
+
+class Follow(AtomicSaveMixin, models.Model):
     user = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -99,3 +190,141 @@ class Follow(models.Model):
         constraints = [models.UniqueConstraint(
             fields=['user', 'author'], name='unique_follow'
         ), ]
+
+
+class UserStats(models.Model):
+    """Денормализованные счетчики пользователя, обновляются сигналами."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    followers_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
+    # Непрочитанные уведомления - для шапки без COUNT(*). Прочитаны все
+    # уведомления с id <= notifications_seen_id, в дайджест уже попали
+    # уведомления с id <= digest_last_id
+    unread_notifications = models.PositiveIntegerField(default=0)
+    notifications_seen_id = models.PositiveIntegerField(default=0)
+    digest_last_id = models.PositiveIntegerField(default=0)
+
+    @classmethod
+    def of(cls, user):
+        """Счетчики пользователя (нули, если записи еще нет).
+
+        Чтобы не было лишнего запроса, user стоит получать
+        с select_related('stats').
+        """
+        return getattr(user, 'stats', None) or cls(user=user)
+
+
+class GroupAuthorStats(models.Model):
+    """Число постов автора в группе - по нему выбираются самые
+    активные авторы группы без GROUP BY по ее постам."""
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='author_stats',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_stats',
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['group', 'author'], name='unique_group_author'
+        ), ]
+        indexes = [models.Index(
+            fields=['group', '-posts_count', 'author'],
+            name='group_author_posts',
+        ), ]
+
+
+class ImageVariant(models.Model):
+    """Уменьшенная копия картинки поста в одном формате и ширине."""
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_variants',
+    )
+    format = models.CharField(max_length=10)
+    width = models.PositiveIntegerField()
+    height = models.PositiveIntegerField()
+    file = models.FileField(upload_to='posts/variants/')
+
+    class Meta:
+        ordering = ['format', 'width']
+
+
+class TimelineEntry(models.Model):
+    """Запись персональной ленты подписок (fan-out-on-write)."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    # Копия Post.pub_date, чтобы лента читалась по индексу без сортировки
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        # post_id, а не post: иначе Django сортирует по полям Post
+        ordering = ['-pub_date', '-post_id', '-id']
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'post'], name='unique_timeline_entry'
+        ), ]
+        # id в конце - ключ курсора KeysetPaginator читается
+        # целиком из индекса
+        indexes = [models.Index(
+            fields=['user', '-pub_date', '-post', '-id'],
+            name='timeline_user_date',
+        ), ]
+
+
+class Notification(models.Model):
+    """Уведомление подписчику о новом посте автора."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Индекс по user_id в SQLite заканчивается rowid: список
+        # пользователя читается по нему без сортировки
+        ordering = ['-id']
+        constraints = [models.UniqueConstraint(
+            fields=['user', 'post'], name='unique_notification'
+        ), ]
+
+
+class SearchTerm(models.Model):
+    """Обратный индекс для поиска без FTS5: основа слова -> пост."""
+    term = models.CharField(max_length=64)
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_terms',
+    )
+    # Сколько раз основа встречается в тексте поста
+    count = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(
+            fields=['term', 'post'], name='unique_search_term'
+        ), ]
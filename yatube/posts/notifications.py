@@ -0,0 +1,217 @@
+# posts/notifications.py
+"""Уведомления подписчикам о новых постах.
+
+Рассылка идет в фоне (задача notify_followers) пачками по
+NOTIFICATION_BATCH_SIZE подписчиков: на пачку один INSERT ... SELECT
+из Follow и один UPDATE счетчиков непрочитанного. Пачки идут по id
+подписки, каждая - в своей транзакции и своей задаче, так что автор
+со 100 тысячами подписчиков не держит ни запрос, ни один воркер.
+Шапка читает готовый счетчик UserStats.unread_notifications через
+кэш (сбрасывается рассылкой и прочтением, иначе живет
+NOTIFICATION_CACHE_TIMEOUT), раз в день send_digests рассылает письма
+с непрочитанным.
+"""
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import get_connection, send_mass_mail
+from django.db import connection, transaction
+from django.db.models import Count, F, IntegerField, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from core import fragment_cache
+from .models import Follow, Notification, Post, UserStats
+
+KEY = 'notifications:{}'
+
+
+def invalidate(user_ids):
+    # Сразу и после коммита - как following.invalidate
+    keys = [KEY.format(user_id) for user_id in user_ids]
+    fragment_cache.get_cache().delete_many(keys)
+    transaction.on_commit(
+        lambda: fragment_cache.get_cache().delete_many(keys)
+    )
+
+
+def _insert_sql():
+    quote = connection.ops.quote_name
+    notification, follow = (
+        quote(model._meta.db_table) for model in (Notification, Follow)
+    )
+    # Уведомление, уже созданное повтором задачи, пропускается
+    return (
+        f'{connection.ops.insert_statement(ignore_conflicts=True)} '
+        f'{notification} (user_id, post_id, created) '
+        f'SELECT f.user_id, %s, %s FROM {follow} f '
+        f'WHERE f.author_id = %s AND f.id > %s AND f.id <= %s '
+        f'{connection.ops.ignore_conflicts_suffix_sql(ignore_conflicts=True)}'
+    )
+
+
+def notify_chunk(post_id, after_follow_id=0):
+    """Уведомляет следующую пачку подписчиков автора поста.
+
+    Вызывать в транзакции. Возвращает id последней подписки пачки
+    или None, если подписчики кончились.
+    """
+    author_id = Post.objects.filter(pk=post_id).values_list(
+        'author_id', flat=True
+    ).first()
+    if author_id is None:
+        return None
+    batch_size = settings.NOTIFICATION_BATCH_SIZE
+    follows = list(
+        Follow.objects.filter(author_id=author_id, pk__gt=after_follow_id)
+        .order_by('pk').values_list('pk', 'user_id')[:batch_size]
+    )
+    if not follows:
+        return None
+    last_follow_id = follows[-1][0]
+    last_id = Notification.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first() or 0
+    with connection.cursor() as cursor:
+        cursor.execute(_insert_sql(), [
+            post_id, timezone.now(), author_id, after_follow_id,
+            last_follow_id,
+        ])
+    # Счетчик растет только у тех, кому уведомление вставлено сейчас
+    UserStats.objects.filter(user_id__in=Notification.objects.filter(
+        post_id=post_id, pk__gt=last_id
+    ).values('user_id')).update(
+        unread_notifications=F('unread_notifications') + 1
+    )
+    invalidate(user_id for _, user_id in follows)
+    if len(follows) < batch_size:
+        return None
+    return last_follow_id
+
+
+def forget_post(post_id):
+    """Перед удалением поста: его непрочитанные уведомления
+    не должны остаться в счетчиках (кэш шапки догонит по таймауту)."""
+    UserStats.objects.filter(
+        unread_notifications__gt=0,
+        user_id__in=Notification.objects.filter(
+            post_id=post_id,
+            pk__gt=F('user__stats__notifications_seen_id'),
+        ).values('user_id'),
+    ).update(unread_notifications=F('unread_notifications') - 1)
+
+
+def unread_count(user):
+    """Непрочитанные уведомления: из кэша или одним запросом
+    по первичному ключу."""
+    if not user.is_authenticated:
+        return 0
+    cache = fragment_cache.get_cache()
+    key = KEY.format(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = UserStats.objects.filter(user_id=user.pk).values_list(
+            'unread_notifications', flat=True
+        ).first() or 0
+        cache.set(key, count, settings.NOTIFICATION_CACHE_TIMEOUT)
+    return count
+
+
+def mark_read(user):
+    """Отмечает прочитанными все уведомления пользователя.
+
+    Возвращает прежнюю границу прочитанного: уведомления с id больше
+    нее на этой странице показываются как новые.
+    """
+    seen_id = UserStats.objects.filter(user_id=user.pk).values_list(
+        'notifications_seen_id', flat=True
+    ).first() or 0
+    last_id = user.notifications.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    if last_id and last_id > seen_id:
+        # Уведомления, вставленные после чтения last_id, остаются
+        # непрочитанными - их досчитывает тот же UPDATE
+        UserStats.objects.filter(user_id=user.pk).update(
+            notifications_seen_id=last_id,
+            unread_notifications=Coalesce(Subquery(
+                Notification.objects.filter(user_id=user.pk, pk__gt=last_id)
+                .order_by().values('user_id').annotate(n=Count('pk'))
+                .values('n'),
+                output_field=IntegerField(),
+            ), 0),
+        )
+        invalidate([user.pk])
+    return seen_id
+
+
+def _digest(user, rows):
+    posts = settings.NOTIFICATION_DIGEST_POSTS
+    return (
+        'Новые посты авторов, на которых вы подписаны',
+        render_to_string('posts/email/digest.txt', {
+            'user': user,
+            'posts': rows[:posts],
+            'more': max(len(rows) - posts, 0),
+            'site_url': settings.SITE_URL,
+        }),
+        settings.DEFAULT_FROM_EMAIL,
+        [user['email']],
+    )
+
+
+def send_digests(batch_size=500, log=None):
+    """Письма с непрочитанными уведомлениями, которых еще не было
+    в прошлых дайджестах. Возвращает число отправленных писем.
+
+    Пользователи читаются пачками по batch_size, уведомления пачки -
+    одним запросом; после отправки пачки граница дайджеста
+    у ее пользователей сдвигается одним UPDATE.
+    """
+    last_id = Notification.objects.order_by('-pk').values_list(
+        'pk', flat=True
+    ).first()
+    if last_id is None:
+        return 0
+    users = UserStats.objects.filter(
+        unread_notifications__gt=0,
+        digest_last_id__lt=last_id,
+        user__is_active=True,
+    ).exclude(user__email='').order_by('user_id').values(
+        'user_id', email=F('user__email'), username=F('user__username'),
+    )
+    mail = get_connection()
+    sent = 0
+    after = 0
+    while True:
+        batch = {
+            user['user_id']: user
+            for user in users.filter(user_id__gt=after)[:batch_size]
+        }
+        if not batch:
+            return sent
+        rows = Notification.objects.filter(
+            user_id__in=batch,
+            pk__lte=last_id,
+            pk__gt=Greatest(
+                F('user__stats__notifications_seen_id'),
+                F('user__stats__digest_last_id'),
+            ),
+        ).order_by('user_id', '-pk').values(
+            'user_id', 'post_id', text=F('post__text'),
+            author=F('post__author__username'),
+        )
+        messages = [
+            _digest(batch[user_id], list(user_rows))
+            for user_id, user_rows in groupby(
+                rows.iterator(), key=lambda row: row['user_id']
+            )
+        ]
+        sent += send_mass_mail(messages, connection=mail)
+        UserStats.objects.filter(user_id__in=batch).update(
+            digest_last_id=last_id
+        )
+        after = max(batch)
+        if log:
+            log(f'Отправлено писем: {sent}')
@@ -0,0 +1,56 @@
+# posts/scopes.py
+"""Области кэша фрагментов (core.fragment_cache), в которых виден пост.
+
+Их сбрасывают сигналы записи поста и фоновые задачи, которые меняют
+разметку поста после коммита (миниатюры, варианты картинок).
+"""
+from core import fragment_cache
+from .models import GroupAuthorStats, Post
+
+
+def post_scopes(post, *group_ids, old_author_id=None):
+    """Области поста, групп group_ids и, если пост передан другому
+    автору, профиля прежнего автора."""
+    scopes = {
+        'feed',
+        # Каталог групп показывает число постов и дату последнего
+        'groups',
+        fragment_cache.scope('author', post.author_id),
+        fragment_cache.scope('post', post.pk),
+    }
+    scopes.update(
+        fragment_cache.scope('group', group_id)
+        for group_id in group_ids if group_id is not None
+    )
+    if old_author_id is not None:
+        scopes.add(fragment_cache.scope('author', old_author_id))
+    return scopes
+
+
+def bump_posts(queryset):
+    """Сбрасывает страницы, на которых видны посты queryset."""
+    scopes = set()
+    for post in queryset.only('pk', 'author_id', 'group_id').iterator():
+        scopes |= post_scopes(post, post.group_id)
+    if scopes:
+        fragment_cache.bump(*scopes)
+
+
+def bump_post(post_id):
+    bump_posts(Post.objects.filter(pk=post_id))
+
+
+def group_scopes(group_id):
+    """Области, где видны название и ссылка группы: ее страница,
+    каталог, общая лента и профили ее авторов (из GroupAuthorStats,
+    без прохода по постам). Страницы постов группы зависят от ее
+    области сами (post_detail)."""
+    authors = GroupAuthorStats.objects.filter(
+        group_id=group_id
+    ).values_list('author_id', flat=True)
+    return {
+        'feed',
+        'groups',
+        fragment_cache.scope('group', group_id),
+        *(fragment_cache.scope('author', pk) for pk in authors.iterator()),
+    }
@@ -0,0 +1,173 @@
+# posts/search.py
+"""Полнотекстовый поиск по постам.
+
+Основной вариант - таблица FTS5 в SQLite с ранжированием bm25.
+Если FTS5 недоступен (другая СУБД или SQLite без модуля), работает
+обратный индекс в обычной таблице SearchTerm с ранжированием TF-IDF.
+В оба индекса пишутся основы слов (posts.stemmer), поэтому "посты"
+находит "пост" и "постами"; каждое слово запроса ищется как префикс.
+"""
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import Post, SearchTerm
+from .stemmer import stem
+
+FTS_TABLE = 'posts_post_fts'
+WORD = re.compile(r'[^\W_]+')
+# Больше основ из запроса не берем - длинные запросы дороги
+MAX_QUERY_TERMS = 8
+
+
+def terms(text):
+    """Основы слов текста в порядке появления."""
+    return [stem(word) for word in WORD.findall(text)]
+
+
+class Fts5Backend:
+    name = 'fts5'
+
+    def index(self, posts):
+        # executemany - два запроса на всю пачку постов
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [[post.pk] for post in posts],
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE} (rowid, body) VALUES (%s, %s)',
+                [[post.pk, ' '.join(terms(post.text))] for post in posts],
+            )
+
+    def remove(self, post_id):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+
+    def search(self, query_terms, limit):
+        # Каждая основа - префиксный запрос "основа"*, все они через AND
+        match = ' '.join(
+            '"{}"*'.format(term.replace('"', '""')) for term in query_terms
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s',
+                [match, limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+
+class PythonBackend:
+    name = 'python'
+
+    def index(self, posts):
+        SearchTerm.objects.filter(
+            post__in=[post.pk for post in posts]
+        ).delete()
+        SearchTerm.objects.bulk_create(
+            SearchTerm(term=term[:64], post=post, count=count)
+            for post in posts
+            for term, count in Counter(terms(post.text)).items()
+        )
+
+    def remove(self, post_id):
+        SearchTerm.objects.filter(post_id=post_id).delete()
+
+    def clear(self):
+        SearchTerm.objects.all().delete()
+
+    def search(self, query_terms, limit):
+        total = Post.objects.count() or 1
+        scores = None
+        for term in query_terms:
+            # Диапазон вместо LIKE - префикс берется по индексу
+            rows = SearchTerm.objects.filter(
+                term__gte=term, term__lt=term + '\uffff'
+            ).values_list('post_id', 'count')
+            term_scores = defaultdict(int)
+            for post_id, count in rows:
+                term_scores[post_id] += count
+            idf = math.log(1 + total / (len(term_scores) or 1))
+            if scores is None:
+                scores = {
+                    post_id: count * idf
+                    for post_id, count in term_scores.items()
+                }
+            else:
+                scores = {
+                    post_id: score + term_scores[post_id] * idf
+                    for post_id, score in scores.items()
+                    if post_id in term_scores
+                }
+            if not scores:
+                return []
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+        return [post_id for post_id, _ in ranked[:limit]]
+
+
+_fts5_available = {}
+
+
+def fts5_available():
+    """Есть ли таблица FTS5 (проверяется один раз на базу)."""
+    alias = connection.alias
+    if alias not in _fts5_available:
+        _fts5_available[alias] = (
+            connection.vendor == 'sqlite'
+            and FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts5_available[alias]
+
+
+def get_backend():
+    name = settings.SEARCH_BACKEND
+    if name == 'auto':
+        name = 'fts5' if fts5_available() else 'python'
+    return Fts5Backend() if name == 'fts5' else PythonBackend()
+
+
+def search(query, limit=None):
+    """id постов по убыванию релевантности."""
+    query_terms = list(dict.fromkeys(terms(query)))[:MAX_QUERY_TERMS]
+    if not query_terms:
+        return []
+    return get_backend().search(
+        query_terms, limit or settings.SEARCH_RESULTS_LIMIT
+    )
+
+
+def index_post(post):
+    get_backend().index([post])
+
+
+def remove_post(post_id):
+    get_backend().remove(post_id)
+
+
+def rebuild(batch_size=1000):
+    """Пересобирает индекс целиком, пачками; возвращает число постов."""
+    backend = get_backend()
+    backend.clear()
+    indexed = 0
+    last_pk = 0
+    while True:
+        batch = list(
+            Post.objects.only('pk', 'text')
+            .filter(pk__gt=last_pk).order_by('pk')[:batch_size]
+        )
+        if not batch:
+            return indexed
+        with transaction.atomic():
+            backend.index(batch)
+        indexed += len(batch)
+        last_pk = batch[-1].pk
@@ -0,0 +1,230 @@
+# posts/seed.py
+"""Большой набор данных для нагрузочных замеров (команда seed_bench).
+
+Все пишется через bulk_create, сигналы не срабатывают - счетчики,
+ленты подписок и поисковый индекс пересобираются в конце.
+Распределения приближены к живой соцсети: активность авторов,
+популярность групп и постов подчиняются закону Ципфа, свежих постов
+больше, чем старых.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate, islice
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from . import counters, search, timelines
+from .models import Comment, Follow, Group, Post, User
+
+PREFIX = 'bench_'
+# Пароль у всех пользователей одинаковый, хэш считается один раз
+PASSWORD = 'bench'
+WORDS = (
+    'пост лента группа автор подписка комментарий фото город море лес '
+    'кофе книга музыка фильм работа отпуск погода утро вечер праздник '
+    'друзья семья кошка собака проект код django python база запрос '
+    'кэш страница сервер скорость время новость история мысль идея'
+).split()
+
+
+def zipf_weights(count, exponent=1.1):
+    """Накопленные веса Ципфа: первый элемент самый популярный."""
+    return list(accumulate(1 / (rank + 1) ** exponent
+                           for rank in range(count)))
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def explicit_dates(*fields):
+    """Отключает auto_now_add, чтобы bulk_create сохранил свои даты."""
+    saved = [field.auto_now_add for field in fields]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, value in zip(fields, saved):
+            field.auto_now_add = value
+
+
+def _text(rng, mean_words):
+    length = max(1, int(rng.lognormvariate(0, 0.8) * mean_words))
+    return ' '.join(rng.choices(WORDS, k=length)).capitalize()
+
+
+class Seeder:
+    def __init__(self, users, groups, posts, comments, follows,
+                 days=365, batch_size=5000, seed=None, log=None):
+        self.counts = {
+            'users': users, 'groups': groups, 'posts': posts,
+            'comments': comments, 'follows': follows,
+        }
+        self.days = days
+        self.batch_size = batch_size
+        self.rng = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.now = timezone.now()
+
+    def _insert(self, model, objects, label):
+        created = 0
+        for batch in _batches(objects, self.batch_size):
+            # Размер одного INSERT Django подбирает под лимиты СУБД
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+        self.log(f'{label}: {created}')
+        return created
+
+    def _new_ids(self, queryset, last_pk):
+        return list(
+            queryset.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)
+        )
+
+    def _last_pk(self, model):
+        return model.objects.order_by('-pk').values_list(
+            'pk', flat=True
+        ).first() or 0
+
+    def create_users(self):
+        start = User.objects.filter(username__startswith=PREFIX).count()
+        last_pk = self._last_pk(User)
+        password = make_password(PASSWORD)
+        self._insert(User, (
+            User(
+                username=f'{PREFIX}{start + number}',
+                first_name=f'Автор{start + number}',
+                password=password,
+            )
+            for number in range(self.counts['users'])
+        ), 'Пользователей')
+        ids = self._new_ids(User.objects.all(), last_pk)
+        # Популярность не зависит от порядка создания
+        self.rng.shuffle(ids)
+        return ids
+
+    def create_groups(self):
+        start = Group.objects.filter(slug__startswith='bench-').count()
+        last_pk = self._last_pk(Group)
+        self._insert(Group, (
+            Group(
+                title=f'Группа {start + number}',
+                slug=f'bench-{start + number}',
+                description=_text(self.rng, 20),
+            )
+            for number in range(self.counts['groups'])
+        ), 'Групп')
+        ids = self._new_ids(Group.objects.all(), last_pk)
+        self.rng.shuffle(ids)
+        return ids
+
+    def _date(self):
+        # Квадрат равномерной величины - свежих постов больше
+        age = self.rng.random() ** 2 * self.days
+        return self.now - timedelta(days=age)
+
+    def create_posts(self, user_ids, group_ids):
+        if not user_ids:
+            return []
+        last_pk = self._last_pk(Post)
+        authors = zipf_weights(len(user_ids))
+        groups = zipf_weights(len(group_ids))
+        rng = self.rng
+
+        def posts():
+            for _ in range(self.counts['posts']):
+                group_id = None
+                if group_ids and rng.random() < 0.6:
+                    group_id = rng.choices(group_ids, cum_weights=groups)[0]
+                yield Post(
+                    author_id=rng.choices(user_ids, cum_weights=authors)[0],
+                    group_id=group_id,
+                    text=_text(rng, 40),
+                    pub_date=self._date(),
+                )
+
+        with explicit_dates(Post._meta.get_field('pub_date')):
+            self._insert(Post, posts(), 'Постов')
+        return list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', 'pub_date')
+        )
+
+    def create_comments(self, user_ids, posts):
+        if not posts or not user_ids:
+            return
+        # Популярные посты комментируют чаще
+        order = list(posts)
+        self.rng.shuffle(order)
+        weights = zipf_weights(len(order))
+        users = zipf_weights(len(user_ids))
+        rng = self.rng
+
+        def comments():
+            for _ in range(self.counts['comments']):
+                post_id, pub_date = rng.choices(order, cum_weights=weights)[0]
+                created = min(
+                    pub_date + timedelta(hours=rng.expovariate(1 / 12)),
+                    self.now,
+                )
+                yield Comment(
+                    post_id=post_id,
+                    author_id=rng.choices(user_ids, cum_weights=users)[0],
+                    text=_text(rng, 12),
+                    created=created,
+                )
+
+        with explicit_dates(Comment._meta.get_field('created')):
+            self._insert(Comment, comments(), 'Комментариев')
+
+    def create_follows(self, user_ids):
+        """Каждый подписывается в среднем на follows авторов,
+        чаще на популярных (preferential attachment)."""
+        if len(user_ids) < 2:
+            return
+        weights = zipf_weights(len(user_ids))
+        mean = self.counts['follows']
+        rng = self.rng
+
+        def follows():
+            for user_id in user_ids:
+                wanted = min(
+                    int(rng.expovariate(1 / mean)) if mean else 0,
+                    len(user_ids) - 1,
+                )
+                authors = set(
+                    rng.choices(user_ids, cum_weights=weights, k=wanted)
+                )
+                authors.discard(user_id)
+                for author_id in authors:
+                    yield Follow(user_id=user_id, author_id=author_id)
+
+        self._insert(Follow, follows(), 'Подписок')
+
+    def rebuild_derived(self, index=True):
+        drift = counters.reconcile(fix=True)
+        self.log(f'Исправлено счетчиков: {len(drift)}')
+        self.log(
+            f'Статистика групп по авторам: {counters.rebuild_group_stats()}'
+        )
+        self.log(f'Записей в лентах: {timelines.rebuild_all()}')
+        if index:
+            self.log(f'Проиндексировано постов: {search.rebuild()}')
+
+    def run(self, index=True):
+        user_ids = self.create_users()
+        group_ids = self.create_groups()
+        posts = self.create_posts(user_ids, group_ids)
+        self.create_comments(user_ids, posts)
+        self.create_follows(user_ids)
+        self.rebuild_derived(index=index)
+        return user_ids
@@ -0,0 +1,225 @@
+# posts/signals.py
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core import fragment_cache
+from . import (
+    counters, following, images, notifications, scopes, search, tasks,
+    timelines,
+)
+from .models import Comment, Follow, Group, Post
+
+# Счетчики
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw=False, **kwargs):
+    # Автор, группа и картинка до редактирования - чтобы перенести
+    # счетчики и не пересоздавать картинки без нужды. Автора меняют
+    # в админке
+    instance._old_author_id = instance._old_group_id = None
+    instance._old_image = None
+    if instance.pk and not raw:
+        (
+            instance._old_author_id, instance._old_group_id,
+            instance._old_image,
+        ) = (
+            Post.objects.filter(pk=instance.pk)
+            .values_list('author_id', 'group_id', 'image').first()
+            or (None, None, None)
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        counters.shift_user(instance.author_id, posts_count=1)
+        counters.shift_group_author(instance.group_id, instance.author_id, 1)
+        counters.refresh_group(instance.group_id)
+        return
+    old = (instance._old_group_id, instance._old_author_id)
+    new = (instance.group_id, instance.author_id)
+    if instance._old_author_id is None or old == new:
+        return
+    if instance._old_author_id != instance.author_id:
+        counters.shift_user(instance._old_author_id, posts_count=-1)
+        counters.shift_user(instance.author_id, posts_count=1)
+    for (group_id, author_id), delta in ((old, -1), (new, 1)):
+        counters.shift_group_author(group_id, author_id, delta)
+    for group_id in {instance._old_group_id, instance.group_id}:
+        counters.refresh_group(group_id)
+
+
+@receiver(post_delete, sender=Post)
+def uncount_post(sender, instance, **kwargs):
+    counters.shift_user(instance.author_id, posts_count=-1)
+    counters.shift_group_author(instance.group_id, instance.author_id, -1)
+    counters.refresh_group(instance.group_id)
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.shift_post(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.shift_post(instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.shift_user(instance.user_id, following_count=1)
+        counters.shift_user(instance.author_id, followers_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def uncount_follow(sender, instance, **kwargs):
+    counters.shift_user(instance.user_id, following_count=-1)
+    counters.shift_user(instance.author_id, followers_count=-1)
+
+# Ленты подписок (после счетчиков: им нужно число подписчиков)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        tasks.fan_out_post.enqueue_on_commit(
+            instance.pk, key=f'fan_out:{instance.pk}'
+        )
+
+
+@receiver(post_save, sender=Post)
+def move_post_between_timelines(sender, instance, created, raw=False,
+                                **kwargs):
+    # Пост передан другому автору: из лент подписчиков прежнего
+    # он уходит сразу, подписчикам нового раскладывается в фоне
+    old_author_id = getattr(instance, '_old_author_id', None)
+    if created or raw or old_author_id in (None, instance.author_id):
+        return
+    timelines.remove_post(instance.pk)
+    tasks.fan_out_post.enqueue_on_commit(
+        instance.pk, key=f'fan_out:{instance.pk}'
+    )
+
+
+@receiver(post_save, sender=Follow)
+def fill_timeline_on_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        tasks.fill_timeline.enqueue_on_commit(
+            instance.user_id, instance.author_id,
+            key=f'timeline:{instance.user_id}:{instance.author_id}',
+        )
+
+
+@receiver(post_delete, sender=Follow)
+def clean_timeline_on_unfollow(sender, instance, **kwargs):
+    timelines.remove_author(instance.user_id, instance.author_id)
+    if timelines.stopped_being_celebrity(instance.author_id):
+        tasks.backfill_timelines.enqueue_on_commit(
+            instance.author_id, key=f'backfill:{instance.author_id}'
+        )
+
+# Уведомления подписчикам
+
+
+@receiver(post_save, sender=Post)
+def notify_followers(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        tasks.notify_followers.enqueue_on_commit(
+            instance.pk, key=f'notify:{instance.pk}'
+        )
+
+
+@receiver(pre_delete, sender=Post)
+def forget_post_notifications(sender, instance, **kwargs):
+    notifications.forget_post(instance.pk)
+
+# Кэш подписок пользователя
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_following(sender, instance, raw=False, **kwargs):
+    if not raw:
+        following.invalidate(instance.user_id)
+
+# Кэш фрагментов: смена версий областей, которые показывают пост
+
+
+@receiver(post_save, sender=Post)
+def invalidate_post_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.bump(*scopes.post_scopes(
+            instance, instance.group_id,
+            getattr(instance, '_old_group_id', None),
+            old_author_id=getattr(instance, '_old_author_id', None),
+        ))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post_fragments(sender, instance, **kwargs):
+    fragment_cache.bump(*scopes.post_scopes(instance, instance.group_id))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_fragments(sender, instance, raw=False, **kwargs):
+    if not raw:
+        fragment_cache.bump(fragment_cache.scope('post', instance.post_id))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def invalidate_group_fragments(sender, instance, raw=False, **kwargs):
+    # Название и ссылка группы есть на страницах ее постов, авторов
+    # и в общей ленте. До удаления - пока статистика авторов группы
+    # еще не удалена каскадом
+    if not raw:
+        fragment_cache.bump(*scopes.group_scopes(instance.pk))
+
+# Поисковый индекс
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'text' not in update_fields):
+        return
+    tasks.index_post.enqueue_on_commit(
+        instance.pk, key=f'index:{instance.pk}'
+    )
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.remove_post(instance.pk)
+
+# Миниатюры и варианты картинок
+
+
+@receiver(post_save, sender=Post)
+def queue_post_images(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    image_name = instance.image.name or ''
+    if image_name == (instance._old_image or ''):
+        return
+    if image_name:
+        tasks.generate_thumbnails.enqueue_on_commit(
+            image_name, instance.pk, key=f'thumbnails:{image_name}'
+        )
+    tasks.build_image_variants.enqueue_on_commit(
+        instance.pk, key=f'variants:{instance.pk}'
+    )
+
+
+@receiver(pre_delete, sender=Post)
+def delete_post_image_variants(sender, instance, **kwargs):
+    if instance.image:
+        images.delete_variants(instance)
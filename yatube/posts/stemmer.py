@@ -0,0 +1,68 @@
+# posts/stemmer.py
+"""Стеммер Портера для русского языка (алгоритм Snowball)."""
+import re
+
+VOWELS = 'аеиоуыэюя'
+
+PERFECTIVE_GERUND = re.compile(
+    r'((ив|ивши|ившись|ыв|ывши|ывшись)|((?<=[ая])(в|вши|вшись)))$'
+)
+REFLEXIVE = re.compile(r'(с[яь])$')
+ADJECTIVE = re.compile(
+    r'(ее|ие|ые|ое|ими|ыми|ей|ий|ый|ой|ем|им|ым|ом|его|ого|ему|ому|их|ых|'
+    r'ую|юю|ая|яя|ою|ею)$'
+)
+PARTICIPLE = re.compile(r'((ивш|ывш|ующ)|((?<=[ая])(ем|нн|вш|ющ|щ)))$')
+VERB = re.compile(
+    r'((ила|ыла|ена|ейте|уйте|ите|или|ыли|ей|уй|ил|ыл|им|ым|ен|ило|ыло|'
+    r'ено|ят|ует|уют|ит|ыт|ены|ить|ыть|ишь|ую|ю)|'
+    r'((?<=[ая])(ла|на|ете|йте|ли|й|л|ем|н|ло|но|ет|ют|ны|ть|ешь|нно)))$'
+)
+NOUN = re.compile(
+    r'(а|ев|ов|ие|ье|е|иями|ями|ами|еи|ии|и|ией|ей|ой|ий|й|иям|ям|ием|ем|'
+    r'ам|ом|о|у|ах|иях|ях|ы|ь|ию|ью|ю|ия|ья|я)$'
+)
+RV = re.compile(rf'^(.*?[{VOWELS}])(.*)$')
+# Суффикс -ост(ь) отрезается, только если он лежит в области R2
+DERIVATIONAL = re.compile(
+    rf'[^{VOWELS}]+[{VOWELS}]+[^{VOWELS}]+[{VOWELS}]+.*ость?$'
+)
+DERIVATIONAL_SUFFIX = re.compile(r'ость?$')
+SUPERLATIVE = re.compile(r'(ейше|ейш)$')
+I_ENDING = re.compile(r'и$')
+SOFT_SIGN = re.compile(r'ь$')
+DOUBLE_N = re.compile(r'нн$')
+
+
+def _cut(pattern, rv):
+    return pattern.sub('', rv, 1)
+
+
+def stem(word):
+    """Основа слова; слова не на кириллице только приводятся
+    к нижнему регистру."""
+    word = word.lower().replace('ё', 'е')
+    match = RV.match(word)
+    if not match:
+        return word
+    start, rv = match.groups()
+    cut = _cut(PERFECTIVE_GERUND, rv)
+    if cut != rv:
+        rv = cut
+    else:
+        rv = _cut(REFLEXIVE, rv)
+        cut = _cut(ADJECTIVE, rv)
+        if cut != rv:
+            rv = _cut(PARTICIPLE, cut)
+        else:
+            cut = _cut(VERB, rv)
+            rv = cut if cut != rv else _cut(NOUN, rv)
+    rv = _cut(I_ENDING, rv)
+    if DERIVATIONAL.search(rv):
+        rv = _cut(DERIVATIONAL_SUFFIX, rv)
+    cut = _cut(SOFT_SIGN, rv)
+    if cut != rv:
+        rv = cut
+    else:
+        rv = DOUBLE_N.sub('н', _cut(SUPERLATIVE, rv), 1)
+    return start + rv
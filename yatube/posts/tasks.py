@@ -0,0 +1,74 @@
+# posts/tasks.py
+"""Фоновые задачи постов (очередь jobs).
+
+Задачи получают id и перечитывают объекты: к моменту выполнения пост
+могли изменить или удалить, а задача могла уже выполниться раньше.
+"""
+from django.db import transaction
+
+from jobs.queue import inline, task
+from . import images, notifications, scopes, search, thumbnails, timelines
+from .models import Follow, Post
+
+
+@task
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).select_related('author').first()
+    if post is not None:
+        timelines.fan_out_post(post)
+
+
+@task
+def fill_timeline(user_id, author_id):
+    follow = Follow.objects.filter(
+        user_id=user_id, author_id=author_id
+    ).select_related('user', 'author').first()
+    # Пока задача ждала, пользователь мог отписаться
+    if follow is not None:
+        timelines.add_author(follow.user, follow.author)
+
+
+@task
+def backfill_timelines(author_id):
+    # Пока задача ждала, автор мог снова стать "звездой"
+    if not timelines.is_celebrity(author_id):
+        timelines.backfill_author(author_id)
+
+
+@task
+def notify_followers(post_id, after_follow_id=0):
+    while after_follow_id is not None:
+        with transaction.atomic():
+            after_follow_id = notifications.notify_chunk(
+                post_id, after_follow_id
+            )
+            if after_follow_id is not None and not inline():
+                # Следующая пачка - новая задача в той же транзакции:
+                # после сбоя повторится только недоделанная пачка
+                notify_followers.enqueue(
+                    post_id, after_follow_id,
+                    key=f'notify:{post_id}:{after_follow_id}',
+                )
+                return
+
+
+@task
+def index_post(post_id):
+    post = Post.objects.filter(pk=post_id).only('pk', 'text').first()
+    if post is not None:
+        search.index_post(post)
+
+
+@task
+def build_image_variants(post_id):
+    images.build_variants(post_id)
+
+
+@task
+def generate_thumbnails(name, post_id=None):
+    thumbnails.generate(name)
+    # Страницы, отрисованные с заглушкой, иначе остались бы в кэше
+    if post_id is None:
+        scopes.bump_posts(Post.objects.filter(image=name))
+    else:
+        scopes.bump_post(post_id)
@@ -0,0 +1,14 @@
+from django import template
+
+from posts.forms import CommentForm
+
+register = template.Library()
+
+
+@register.simple_tag
+def comment_form():
+    """Пустая форма комментария для метки кэша страниц:
+
+    {% comment_form as form %}
+    """
+    return CommentForm()
@@ -0,0 +1,26 @@
+from django import template
+
+from posts import images, thumbnails
+
+register = template.Library()
+
+
+@register.simple_tag
+def ready_thumbnail(image, geometry, **options):
+    """Готовая миниатюра или None, если ее еще не создали в фоне.
+
+    {% ready_thumbnail post.image "960x339" crop="center" as im %}
+    """
+    if not image:
+        return None
+    return thumbnails.backend.get_ready_thumbnail(image, geometry, **options)
+
+
+@register.inclusion_tag('posts/includes/picture.html')
+def post_picture(post):
+    """Картинка поста: <picture> с вариантами по форматам и ширинам,
+    пока их нет - готовая миниатюра или заглушка."""
+    return {
+        'post': post,
+        'picture': images.picture_sources(post) if post.image else None,
+    }
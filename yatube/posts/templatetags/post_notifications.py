@@ -0,0 +1,14 @@
+from django import template
+
+from posts import notifications
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def unread_notifications(context):
+    """Число непрочитанных уведомлений пользователя (готовый счетчик).
+
+    {% unread_notifications as unread %}
+    """
+    return notifications.unread_count(context['user'])
@@ -0,0 +1,142 @@
+# posts/tests/test_admin.py
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Comment, Follow, Group, Post
+from .utils import JobsMixin, QueryCountMixin
+
+User = get_user_model()
+
+CHANGELISTS = (
+    'admin:posts_post_changelist',
+    'admin:posts_comment_changelist',
+    'admin:posts_follow_changelist',
+)
+
+
+class AdminTests(JobsMixin, QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='root', email='root@example.com', password='root',
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        cls.add_rows(5)
+
+    @classmethod
+    def add_rows(cls, count):
+        start = User.objects.count()
+        # Поисковый индекс заполняет фоновая задача
+        with cls.run_jobs():
+            for number in range(start, start + count):
+                author = User.objects.create_user(username=f'author{number}')
+                post = Post.objects.create(
+                    author=author, group=cls.group,
+                    text=f'Админка пост {number}',
+                )
+                Comment.objects.create(post=post, author=author, text='Текст')
+                Follow.objects.create(user=cls.admin, author=author)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def _queries(self, url):
+        with self.assertMaxQueries(10) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """Число запросов списка не зависит от числа строк на странице."""
+        for name in CHANGELISTS:
+            with self.subTest(name=name):
+                url = reverse(name)
+                before = self._queries(url)
+                self.add_rows(5)
+                self.assertEqual(self._queries(url), before)
+
+    def test_date_hierarchy_drilldown(self):
+        """Переход по датам строится по первой и последней дате,
+        без SELECT DISTINCT по всей таблице."""
+        today = timezone.localdate()
+        for name, field in (
+            ('admin:posts_post_changelist', 'pub_date'),
+            ('admin:posts_comment_changelist', 'created'),
+        ):
+            with self.subTest(name=name):
+                with self.assertMaxQueries(10) as context:
+                    response = self.client.get(reverse(name), {
+                        f'{field}__year': today.year,
+                        f'{field}__month': today.month,
+                    })
+                self.assertContains(
+                    response, f'{field}__day={today.day}'
+                )
+                self.assertFalse(any(
+                    'django_date_trunc' in query['sql']
+                    for query in context.captured_queries
+                ))
+
+    def test_autocomplete_widgets(self):
+        """Автор, группа и пост выбираются автодополнением."""
+        post = Post.objects.first()
+        pages = (
+            ('admin:posts_post_change', post.pk, ('author', 'group')),
+            ('admin:posts_comment_change', post.comments.get().pk,
+             ('post', 'author')),
+            ('admin:posts_follow_add', None, ('user', 'author')),
+        )
+        for name, pk, fields in pages:
+            with self.subTest(name=name):
+                args = [pk] if pk else []
+                form = self.client.get(
+                    reverse(name, args=args)
+                ).context['adminform'].form
+                for field in fields:
+                    # Виджет обернут в RelatedFieldWidgetWrapper
+                    self.assertIsInstance(
+                        form.fields[field].widget.widget, AutocompleteSelect
+                    )
+
+    def test_search_uses_indexes(self):
+        """Посты ищутся по полнотекстовому индексу и по имени автора,
+        комментарии и подписки - по номеру поста и имени."""
+        post = Post.objects.order_by('pk').first()
+        url = reverse('admin:posts_post_changelist')
+        for term, expected in (
+            ('админка', Post.objects.count()),
+            (post.author.username, 1),
+            (str(post.pk), 1),
+        ):
+            with self.subTest(term=term):
+                response = self.client.get(url, {'q': term})
+                self.assertEqual(response.context['cl'].result_count, expected)
+        response = self.client.get(
+            reverse('admin:posts_comment_changelist'), {'q': str(post.pk)}
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+        response = self.client.get(
+            reverse('admin:posts_follow_changelist'),
+            {'q': post.author.username},
+        )
+        self.assertEqual(response.context['cl'].result_count, 1)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_estimated_count(self):
+        """Сверх предела число строк оценивается по наибольшему pk."""
+        response = self.client.get(reverse('admin:posts_post_changelist'))
+        self.assertEqual(
+            response.context['cl'].result_count,
+            Post.objects.order_by('-pk').first().pk,
+        )
+        response = self.client.get(
+            reverse('admin:posts_post_changelist'), {'q': 'админка'}
+        )
+        self.assertEqual(response.context['cl'].result_count, 3)
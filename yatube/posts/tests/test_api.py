@@ -0,0 +1,165 @@
+# posts/tests/test_api.py
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .utils import QueryCountMixin
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ApiTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='writer', first_name='Лев', last_name='Толстой'
+        )
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+                text=f'Пост {number}',
+            )
+            for number in range(5)
+        ]
+        cls.post = cls.posts[-1]
+        for number in range(3):
+            Comment.objects.create(
+                post=cls.post, author=cls.reader, text=f'Комментарий {number}'
+            )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get(self, name, client=None, **params):
+        kwargs = params.pop('kwargs', {})
+        return (client or self.guest_client).get(
+            reverse(f'api:v1:{name}', kwargs=kwargs), params
+        )
+
+    def test_post_list(self):
+        response = self.get('post_list')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(
+            [post['text'] for post in data['results']],
+            [f'Пост {number}' for number in range(4, -1, -1)],
+        )
+        first = data['results'][0]
+        self.assertEqual(set(first), {
+            'id', 'text', 'pub_date', 'author', 'group', 'image',
+            'comments_count',
+        })
+        self.assertEqual(first['author'], self.author.pk)
+        self.assertEqual(first['comments_count'], 3)
+        self.assertIsNone(data['next'])
+
+    def test_cursor_pagination(self):
+        texts = []
+        response = self.get('post_list', limit=2)
+        while True:
+            data = response.json()
+            texts += [post['text'] for post in data['results']]
+            if not data['next']:
+                break
+            response = self.guest_client.get(data['next'])
+        self.assertEqual(
+            texts, [f'Пост {number}' for number in range(4, -1, -1)]
+        )
+        self.assertIsNotNone(data['previous'])
+        previous = self.guest_client.get(data['previous']).json()
+        self.assertEqual(
+            [post['text'] for post in previous['results']],
+            ['Пост 2', 'Пост 1'],
+        )
+
+    def test_sparse_fields(self):
+        data = self.get('post_list', fields='id,text').json()
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        response = self.get('post_list', fields='id,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['detail'])
+
+    def test_embed_without_extra_queries(self):
+        """Автор и группа встраиваются тем же запросом."""
+        with self.assertMaxQueries(1):
+            data = self.get(
+                'post_list', embed='author,group', limit=100
+            ).json()
+        post = data['results'][0]
+        self.assertEqual(post['author'], {
+            'id': self.author.pk, 'username': 'writer',
+            'first_name': 'Лев', 'last_name': 'Толстой',
+        })
+        self.assertIsNone(post['group'])
+        self.assertEqual(data['results'][1]['group'], {
+            'id': self.group.pk, 'slug': 'Test_slug',
+            'title': 'Тестовая группа',
+        })
+        self.assertEqual(
+            self.get('post_list', embed='comments').status_code, 400
+        )
+
+    def test_filters(self):
+        data = self.get('post_list', group='Test_slug').json()
+        self.assertEqual(len(data['results']), 2)
+        data = self.get('post_list', author='reader').json()
+        self.assertEqual(data['results'], [])
+        self.assertEqual(
+            self.get('post_list', group='missing').status_code, 404
+        )
+
+    def test_details(self):
+        data = self.get(
+            'post_detail', kwargs={'post_id': self.post.pk}, embed='author'
+        ).json()
+        self.assertEqual(data['text'], self.post.text)
+        self.assertEqual(data['author']['username'], 'writer')
+        data = self.get(
+            'group_detail', kwargs={'slug': 'Test_slug'}
+        ).json()
+        self.assertEqual(data['posts_count'], 2)
+        response = self.get('post_detail', kwargs={'post_id': 999})
+        self.assertEqual(response.status_code, 404)
+
+    def test_comments(self):
+        data = self.get(
+            'comment_list', kwargs={'post_id': self.post.pk},
+            embed='author', fields='text,author',
+        ).json()
+        self.assertEqual(data['results'], [
+            {'text': f'Комментарий {number}',
+             'author': {'id': self.reader.pk, 'username': 'reader',
+                        'first_name': '', 'last_name': ''}}
+            for number in range(3)
+        ])
+
+    def test_groups(self):
+        data = self.get('group_list').json()
+        self.assertEqual([group['slug'] for group in data['results']],
+                         ['Test_slug'])
+
+    def test_follows_require_login(self):
+        self.assertEqual(self.get('follow_list').status_code, 401)
+        data = self.get(
+            'follow_list', client=self.reader_client, embed='author'
+        ).json()
+        self.assertEqual(
+            [follow['author']['username'] for follow in data['results']],
+            ['writer'],
+        )
+
+    def test_read_only(self):
+        response = self.guest_client.post(reverse('api:v1:post_list'))
+        self.assertEqual(response.status_code, 405)
@@ -0,0 +1,72 @@
+# posts/tests/test_bench.py
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .. import benchmarks, counters
+from ..models import Comment, Follow, Group, Post, TimelineEntry, User
+from ..seed import PREFIX
+
+
+class SeedBenchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'seed_bench', users=30, groups=3, posts=200, comments=300,
+            follows=5, seed=1, stdout=StringIO(),
+        )
+
+    def test_seeded_data(self):
+        """Данные созданы, даты разнесены, счетчики сходятся."""
+        self.assertEqual(
+            User.objects.filter(username__startswith=PREFIX).count(), 30
+        )
+        self.assertEqual(Group.objects.count(), 3)
+        self.assertEqual(Post.objects.count(), 200)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(TimelineEntry.objects.exists())
+        self.assertGreater(
+            Post.objects.values('pub_date__date').distinct().count(), 30
+        )
+        self.assertEqual(counters.reconcile(), [])
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(benchmarks.percentile(values, 50), 50)
+        self.assertEqual(benchmarks.percentile(values, 99), 99)
+        self.assertEqual(benchmarks.percentile([7], 99), 7)
+
+    def test_bench_views_baseline(self):
+        """Замер сохраняет базовые результаты и сравнивает с ними."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            output = StringIO()
+            call_command(
+                'bench_views', requests=2, warmup=0, cold=True,
+                save_baseline=path, stdout=output,
+            )
+            with open(path, encoding='utf-8') as file:
+                baseline = {row['name']: row for row in json.load(file)}
+            self.assertEqual(
+                set(baseline),
+                {scenario.name for scenario in benchmarks.default_scenarios()},
+            )
+            self.assertIn('follow_index', baseline)
+            self.assertGreater(baseline['index']['queries'], 0)
+
+            # Лишний запрос к базе - регрессия при любом допуске
+            baseline['index']['queries'] -= 1
+            with open(path, 'w', encoding='utf-8') as file:
+                json.dump(list(baseline.values()), file)
+            with self.assertRaisesMessage(CommandError, 'index: запросов'):
+                call_command(
+                    'bench_views', 'index', requests=2, warmup=0, cold=True,
+                    compare=path, tolerance=100, stdout=StringIO(),
+                )
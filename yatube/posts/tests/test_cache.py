@@ -0,0 +1,87 @@
+# posts/tests/test_cache.py
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import fragment_cache
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class FragmentCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Первый пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_pages_invalidated_on_post_write(self):
+        """Группа и профиль сбрасываются при создании и удалении поста."""
+        urls = (
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug}),
+            reverse('posts:profile', kwargs={'username': self.author}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                post = Post.objects.create(
+                    author=self.author, group=self.group, text='Новый пост'
+                )
+                self.assertContains(self.guest_client.get(url), 'Новый пост')
+                post.delete()
+                self.assertNotContains(
+                    self.guest_client.get(url), 'Новый пост'
+                )
+
+    def test_comments_invalidated_on_comment(self):
+        """Список комментариев сбрасывается при новом комментарии."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.guest_client.get(url)
+        Comment.objects.create(
+            post=self.post, author=self.author, text='Новый комментарий'
+        )
+        self.assertContains(self.guest_client.get(url), 'Новый комментарий')
+
+    def test_hit_miss_stats(self):
+        """Попадания и промахи считаются."""
+        fragment_cache.reset_stats()
+        self.guest_client.get(reverse('posts:index'))
+        self.guest_client.get(reverse('posts:index'))
+        stats = fragment_cache.stats()
+        # Страница и фрагмент ленты, затем страница целиком
+        self.assertEqual(stats['misses'], 2)
+        self.assertEqual(stats['hits'], 1)
+
+    @override_settings(FRAGMENT_CACHE_STATS_INTERVAL=60 * 60)
+    def test_hit_miss_stats_not_written_per_request(self):
+        """Счетчики копятся в процессе: попадание не пишет в кэш."""
+        self.guest_client.get(reverse('posts:index'))
+        fragment_cache.reset_stats()
+        backend = fragment_cache.get_cache()
+        with mock.patch.object(backend, 'incr') as incr:
+            with mock.patch.object(backend, 'add') as add:
+                self.guest_client.get(reverse('posts:index'))
+        incr.assert_not_called()
+        add.assert_not_called()
+        self.assertEqual(fragment_cache.stats()['hits'], 1)
+
+    def test_cached_index_skips_feed_query(self):
+        """Из кеша главная отдается без запроса ленты."""
+        self.guest_client.get(reverse('posts:index'))
+        with self.assertNumQueries(0):
+            self.guest_client.get(reverse('posts:index'))
@@ -0,0 +1,65 @@
+# posts/tests/test_comments.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Post
+from .utils import QueryCountMixin
+
+User = get_user_model()
+
+
+@override_settings(COMMENTS_PER_PAGE=5)
+class CommentPaginationTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(author=cls.author, text='Пост')
+        cls.commenters = [
+            User.objects.create_user(username=f'reader_{i}')
+            for i in range(12)
+        ]
+        for number, user in enumerate(cls.commenters):
+            Comment.objects.create(
+                post=cls.post, author=user, text=f'Комментарий {number}'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def _texts(self, response):
+        return [comment.text for comment in response.context['comments']]
+
+    def test_first_page_and_fragments(self):
+        """Страница поста показывает первую порцию, фрагменты - остальные."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        )
+        texts = self._texts(response)
+        self.assertEqual(texts, [f'Комментарий {i}' for i in range(5)])
+        seen = list(texts)
+        next_cursor = response.context['comments'].next_cursor
+        fragment_url = reverse(
+            'posts:post_comments', kwargs={'post_id': self.post.pk}
+        )
+        while next_cursor:
+            self.assertContains(response, f'?cursor={next_cursor}')
+            response = self.guest_client.get(
+                fragment_url, {'cursor': next_cursor}
+            )
+            self.assertNotContains(response, '<html')
+            seen += self._texts(response)
+            next_cursor = response.context['comments'].next_cursor
+        self.assertEqual(seen, [f'Комментарий {i}' for i in range(12)])
+
+    def test_query_count_independent_of_comments(self):
+        """Авторы комментариев подтягиваются одним запросом."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        # пост с автором и группой, комментарии с авторами
+        with self.assertMaxQueries(2):
+            self.guest_client.get(url)
+        with self.assertMaxQueries(1):
+            self.guest_client.get(url)
@@ -0,0 +1,116 @@
+# posts/tests/test_conditional.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.urls = {
+            'index': reverse('posts:index'),
+            'group': reverse(
+                'posts:group_posts', kwargs={'slug': self.group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile', kwargs={'username': self.author}
+            ),
+            'post': reverse(
+                'posts:post_detail', kwargs={'post_id': self.post.pk}
+            ),
+        }
+
+    def test_not_modified(self):
+        """Повторный запрос с If-None-Match получает 304 без ленты."""
+        for name, url in self.urls.items():
+            with self.subTest(page=name):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('Last-Modified', response)
+                self.assertIn('no-cache', response['Cache-Control'])
+                # Остается только поиск объекта страницы по адресу
+                with self.assertNumQueries(0 if name == 'index' else 1):
+                    repeated = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(repeated.status_code, 304)
+                self.assertEqual(repeated['ETag'], response['ETag'])
+                self.assertEqual(repeated.content, b'')
+
+    def test_if_modified_since(self):
+        response = self.guest_client.get(self.urls['index'])
+        repeated = self.guest_client.get(
+            self.urls['index'],
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(repeated.status_code, 304)
+
+    def test_new_post_changes_pages(self):
+        etags = {
+            name: self.guest_client.get(url)['ETag']
+            for name, url in self.urls.items()
+        }
+        Post.objects.create(
+            author=self.author, group=self.group, text='Новый пост'
+        )
+        for name in ('index', 'group', 'profile', 'post'):
+            with self.subTest(page=name):
+                response = self.guest_client.get(
+                    self.urls[name], HTTP_IF_NONE_MATCH=etags[name]
+                )
+                self.assertEqual(response.status_code, 200)
+
+    def test_comment_changes_post_page(self):
+        response = self.guest_client.get(self.urls['post'])
+        Comment.objects.create(
+            post=self.post, author=self.reader, text='Комментарий'
+        )
+        response = self.guest_client.get(
+            self.urls['post'], HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_group_edit_changes_group_page(self):
+        response = self.guest_client.get(self.urls['group'])
+        self.group.description = 'Новое описание'
+        self.group.save()
+        response = self.guest_client.get(
+            self.urls['group'], HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertContains(response, 'Новое описание')
+
+    def test_etag_depends_on_user(self):
+        guest = self.guest_client.get(self.urls['profile'])
+        reader = self.reader_client.get(self.urls['profile'])
+        self.assertNotEqual(guest['ETag'], reader['ETag'])
+        self.assertIn('private', reader['Cache-Control'])
+        self.reader_client.get(
+            reverse('posts:profile_follow', kwargs={'username': self.author})
+        )
+        response = self.reader_client.get(
+            self.urls['profile'], HTTP_IF_NONE_MATCH=reader['ETag']
+        )
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,116 @@
+# posts/tests/test_counters.py
+import json
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from .. import counters
+from ..models import Comment, Follow, Group, Post, UserStats
+
+User = get_user_model()
+
+
+class CountersTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.group_1 = Group.objects.create(
+            title='Тестовая группа 1',
+            slug='Test_slug_1',
+            description='Тестовое описание 1',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='Test_slug_2',
+            description='Тестовое описание 2',
+        )
+
+    def _stats(self, user):
+        return UserStats.objects.get(user=user)
+
+    def test_post_counters(self):
+        """Создание, перенос в другую группу и удаление поста."""
+        post = Post.objects.create(
+            author=self.author, group=self.group_1, text='Пост'
+        )
+        self.group_1.refresh_from_db()
+        self.assertEqual(self.group_1.posts_count, 1)
+        self.assertEqual(self._stats(self.author).posts_count, 1)
+        post.group = self.group_2
+        post.save()
+        self.group_1.refresh_from_db()
+        self.group_2.refresh_from_db()
+        self.assertEqual(self.group_1.posts_count, 0)
+        self.assertEqual(self.group_2.posts_count, 1)
+        post.delete()
+        self.group_2.refresh_from_db()
+        self.assertEqual(self.group_2.posts_count, 0)
+        self.assertEqual(self._stats(self.author).posts_count, 0)
+
+    def test_post_author_changed(self):
+        """Пост передан другому автору (в админке) - счетчики и
+        статистика группы переходят к новому автору."""
+        post = Post.objects.create(
+            author=self.author, group=self.group_1, text='Пост'
+        )
+        post.author = self.user
+        post.group = self.group_2
+        post.save()
+        self.assertEqual(self._stats(self.author).posts_count, 0)
+        self.assertEqual(self._stats(self.user).posts_count, 1)
+        self.group_1.refresh_from_db()
+        self.group_2.refresh_from_db()
+        self.assertEqual(json.loads(self.group_1.top_authors), [])
+        self.assertEqual(
+            json.loads(self.group_2.top_authors), [[self.user.pk, 1]]
+        )
+        self.assertEqual(counters.reconcile(), [])
+
+    def test_comment_counter(self):
+        """Комментарии считаются в посте."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        comment = Comment.objects.create(
+            post=post, author=self.user, text='Комментарий'
+        )
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+        comment.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+    def test_follow_counters(self):
+        """Подписка меняет счетчики обеих сторон."""
+        follow = Follow.objects.create(user=self.user, author=self.author)
+        self.assertEqual(self._stats(self.user).following_count, 1)
+        self.assertEqual(self._stats(self.author).followers_count, 1)
+        follow.delete()
+        self.assertEqual(self._stats(self.user).following_count, 0)
+        self.assertEqual(self._stats(self.author).followers_count, 0)
+
+    def test_reconcile(self):
+        """reconcile находит и исправляет расхождения."""
+        Post.objects.bulk_create([
+            Post(author=self.author, group=self.group_1, text='Пост'),
+        ])
+        self.assertEqual(len(counters.reconcile()), 2)
+        out = StringIO()
+        call_command('reconcile_counters', '--fix', stdout=out)
+        self.assertIn('Исправлено расхождений: 2', out.getvalue())
+        self.assertEqual(counters.reconcile(), [])
+        self.group_1.refresh_from_db()
+        self.assertEqual(self.group_1.posts_count, 1)
+        self.assertEqual(self._stats(self.author).posts_count, 1)
+        # Статистика групп пересчитана целиком
+        self.assertIn('Статистика групп по авторам: 1', out.getvalue())
+        self.assertEqual(
+            json.loads(self.group_1.top_authors), [[self.author.pk, 1]]
+        )
+        # Посты авторов по группам пересчитаны целиком
+        self.assertIn('Статистика групп по авторам: 1', out.getvalue())
+        self.assertEqual(
+            json.loads(self.group_1.top_authors), [[self.author.pk, 1]]
+        )
@@ -0,0 +1,136 @@
+# posts/tests/test_feeds.py
+import json
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(
+            username='writer', first_name='Лев', last_name='Толстой'
+        )
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Пост <b>с</b> & знаками'
+        )
+        Post.objects.create(author=cls.other, text='Пост без группы')
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def get(self, name, fmt, **kwargs):
+        url = reverse(f'posts:{name}', kwargs={'fmt': fmt, **kwargs})
+        return self.guest_client.get(url)
+
+    def body(self, response):
+        if response.streaming:
+            return b''.join(response.streaming_content)
+        return response.content
+
+    def test_rss(self):
+        response = self.get('index_feed', 'rss')
+        self.assertTrue(response.streaming)
+        self.assertIn('application/rss+xml', response['Content-Type'])
+        channel = ElementTree.fromstring(self.body(response)).find('channel')
+        items = channel.findall('item')
+        self.assertEqual(len(items), 2)
+        texts = [item.find('description').text for item in items]
+        self.assertIn(self.post.text, texts)
+        link = 'http://testserver' + reverse(
+            'posts:post_detail', kwargs={'post_id': self.post.pk}
+        )
+        self.assertIn(link, [item.find('link').text for item in items])
+
+    def test_atom_group(self):
+        response = self.get('group_feed', 'atom', slug=self.group.slug)
+        root = ElementTree.fromstring(self.body(response))
+        entries = root.findall(f'{ATOM}entry')
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(
+            entries[0].find(f'{ATOM}author/{ATOM}name').text, 'Лев Толстой'
+        )
+        self.assertEqual(
+            entries[0].find(f'{ATOM}category').get('term'),
+            self.group.title,
+        )
+        self.assertEqual(
+            root.find(f'{ATOM}title').text, 'Yatube: Тестовая группа'
+        )
+
+    def test_json_profile(self):
+        response = self.get('profile_feed', 'json', username='other')
+        self.assertIn('application/feed+json', response['Content-Type'])
+        document = json.loads(self.body(response))
+        self.assertEqual(
+            document['version'], 'https://jsonfeed.org/version/1.1'
+        )
+        self.assertEqual(
+            [item['content_text'] for item in document['items']],
+            ['Пост без группы'],
+        )
+
+    def test_empty_json_feed(self):
+        empty = Group.objects.create(title='Пустая', slug='empty')
+        response = self.get('group_feed', 'json', slug=empty.slug)
+        self.assertEqual(json.loads(self.body(response))['items'], [])
+
+    def test_unknown_format(self):
+        self.assertEqual(self.get('index_feed', 'xml').status_code, 404)
+        response = self.get('group_feed', 'rss', slug='missing')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(FEED_ITEMS=1)
+    def test_items_limit(self):
+        document = json.loads(self.body(self.get('index_feed', 'json')))
+        self.assertEqual(len(document['items']), 1)
+
+    def test_cached_and_conditional(self):
+        """Лента кэшируется как HTML и поддерживает условный GET."""
+        first = self.get('index_feed', 'rss')
+        content = self.body(first)
+        with self.assertNumQueries(0):
+            cached = self.get('index_feed', 'rss')
+        self.assertFalse(cached.streaming)
+        self.assertEqual(cached.content, content)
+        response = self.guest_client.get(
+            reverse('posts:index_feed', kwargs={'fmt': 'rss'}),
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        self.assertEqual(response.status_code, 304)
+        Post.objects.create(author=self.author, text='Свежий пост')
+        response = self.guest_client.get(
+            reverse('posts:index_feed', kwargs={'fmt': 'rss'}),
+            HTTP_IF_NONE_MATCH=first['ETag'],
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Свежий пост'.encode(), self.body(response))
+
+    def test_pages_link_feeds(self):
+        response = self.guest_client.get(
+            reverse('posts:group_posts', kwargs={'slug': self.group.slug})
+        )
+        self.assertContains(
+            response,
+            reverse(
+                'posts:group_feed',
+                kwargs={'fmt': 'atom', 'slug': self.group.slug},
+            ),
+        )
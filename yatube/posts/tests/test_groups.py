@@ -0,0 +1,152 @@
+# posts/tests/test_groups.py
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Group, GroupAuthorStats, Post
+from .utils import QueryCountMixin
+
+User = get_user_model()
+
+
+class GroupStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [
+            User.objects.create_user(username=f'writer{number}')
+            for number in range(3)
+        ]
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        cls.other = Group.objects.create(
+            title='Другая', slug='other', description='Описание',
+        )
+
+    def _post(self, author, group=None):
+        return Post.objects.create(
+            author=author, group=group or self.group, text='Пост'
+        )
+
+    def _top(self, group):
+        group.refresh_from_db()
+        return json.loads(group.top_authors)
+
+    @override_settings(GROUP_TOP_AUTHORS=2)
+    def test_top_authors_follow_writes(self):
+        first, second, third = self.authors
+        for author in (first, second, second, third, third, third):
+            self._post(author)
+        self.assertEqual(
+            self._top(self.group), [[third.pk, 3], [second.pk, 2]]
+        )
+        # Перенос и удаление постов меняют порядок
+        moved = Post.objects.filter(author=third).first()
+        moved.group = self.other
+        moved.save()
+        Post.objects.filter(author=third, group=self.group).first().delete()
+        # При равенстве - по id автора
+        self.assertEqual(
+            self._top(self.group), [[second.pk, 2], [first.pk, 1]]
+        )
+        self.assertEqual(self._top(self.other), [[third.pk, 1]])
+        self.assertEqual(
+            GroupAuthorStats.objects.get(
+                group=self.group, author=third
+            ).posts_count,
+            1,
+        )
+
+    def test_last_post_date(self):
+        older = self._post(self.authors[0])
+        newer = self._post(self.authors[1])
+        Post.objects.filter(pk=older.pk).update(
+            pub_date=newer.pub_date - timedelta(days=1)
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.last_post_date, newer.pub_date)
+        newer.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(
+            self.group.last_post_date, newer.pub_date - timedelta(days=1)
+        )
+        Post.objects.get(pk=older.pk).delete()
+        self.group.refresh_from_db()
+        self.assertIsNone(self.group.last_post_date)
+
+
+@override_settings(ITEMS_ON_PAGE=2)
+class GroupIndexTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.authors = [
+            User.objects.create_user(username=f'writer{number}')
+            for number in range(3)
+        ]
+        cls.groups = [
+            Group.objects.create(
+                title=f'Группа {number}', slug=f'group{number}',
+                description='Описание',
+            )
+            for number in range(3)
+        ]
+        # В группе с номером n - n + 1 пост каждого автора
+        for number, group in enumerate(cls.groups):
+            for author in cls.authors:
+                for _ in range(number + 1):
+                    Post.objects.create(
+                        author=author, group=group, text='Пост'
+                    )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.url = reverse('posts:group_index')
+
+    def test_largest_groups_first_by_cursor(self):
+        response = self.client.get(self.url)
+        page = response.context['page_obj']
+        self.assertEqual(
+            [group.slug for group in page], ['group2', 'group1']
+        )
+        self.assertContains(response, 'Постов: 9')
+        self.assertContains(
+            response, reverse('posts:profile', args=['writer0'])
+        )
+        self.assertContains(
+            response, timezone.localtime().strftime('%Y')
+        )
+        response = self.client.get(self.url, {'cursor': page.next_cursor})
+        self.assertEqual(
+            [group.slug for group in response.context['page_obj']],
+            ['group0'],
+        )
+
+    def test_queries_do_not_grow_with_groups(self):
+        """Страница не агрегирует посты: группы и их авторы -
+        по одному запросу."""
+        with self.assertMaxQueries(3) as context:
+            self.client.get(self.url)
+        self.assertFalse(any(
+            'posts_post' in query['sql']
+            for query in context.captured_queries
+        ))
+
+    def test_cached_until_group_changes(self):
+        self.client.get(self.url)
+        with self.assertMaxQueries(0):
+            self.client.get(self.url)
+        Post.objects.create(
+            author=self.authors[0], group=self.groups[0], text='Новый'
+        )
+        response = self.client.get(self.url, {'cursor': self.client.get(
+            self.url
+        ).context['page_obj'].next_cursor})
+        self.assertContains(response, 'Постов: 4')
@@ -0,0 +1,117 @@
+# posts/tests/test_images.py
+import io
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from .. import images
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def jpeg_with_exif(size=(1200, 800)):
+    exif = Image.Exif()
+    # 0x010F - производитель камеры
+    exif[0x010F] = 'SecretCamera'
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (200, 10, 10)).save(
+        buffer, 'JPEG', exif=exif.tobytes()
+    )
+    return buffer.getvalue()
+
+
+# Задачи картинок уходят в очередь, а не выполняются сразу
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_WIDTHS=[480, 960, 1440],
+    POST_IMAGE_FORMATS=['AVIF', 'WEBP', 'PNG', 'JPEG'],
+    JOBS_INLINE=False,
+)
+class ImageVariantTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.post = Post.objects.create(
+            author=self.author,
+            text='Пост с фото',
+            image=SimpleUploadedFile(
+                name='photo.jpg',
+                content=jpeg_with_exif(),
+                content_type='image/jpeg',
+            ),
+        )
+
+    def test_build_variants(self):
+        """Варианты не шире исходника, без EXIF, размеры записаны."""
+        variants = images.build_variants(self.post.pk)
+        # AVIF и WEBP есть не в каждой сборке Pillow - они пропускаются
+        formats = images.available_formats()
+        self.assertEqual(formats[-2:], ['PNG', 'JPEG'])
+        self.assertEqual(
+            sorted((v.format, v.width, v.height) for v in variants),
+            sorted(
+                (fmt, width, height)
+                for fmt in formats
+                for width, height in ((480, 170), (960, 339))
+            ),
+        )
+        for variant in variants:
+            with variant.file.open('rb') as file:
+                image = Image.open(file)
+                self.assertEqual(image.format, variant.format)
+                self.assertNotIn(0x010F, image.getexif())
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.image_width, self.post.image_height), (1200, 800)
+        )
+
+    def test_picture_markup(self):
+        """Шаблон отдает <picture> с srcset, пока вариантов нет - заглушку."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        client = Client()
+        response = client.get(url)
+        self.assertContains(response, 'img/placeholder.svg')
+        images.build_variants(self.post.pk)
+        # Закэшированная страница с заглушкой сброшена сменой версий
+        response = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertContains(response, '<picture>')
+        self.assertContains(response, 'type="image/png"')
+        self.assertContains(response, '-480.png 480w')
+        self.assertContains(response, '-960.jpg 960w')
+
+    def test_variants_removed_with_image(self):
+        """Удаление картинки удаляет и варианты."""
+        images.build_variants(self.post.pk)
+        self.post.image = ''
+        self.post.save()
+        images.build_variants(self.post.pk)
+        self.assertFalse(self.post.image_variants.exists())
+
+    def test_missing_file_skipped(self):
+        """Пропавший файл - не ошибка задачи: вариантов просто нет."""
+        images.build_variants(self.post.pk)
+        self.post.image.storage.delete(self.post.image.name)
+        with self.assertLogs('posts.images', 'WARNING'):
+            self.assertEqual(images.build_variants(self.post.pk), [])
+        self.post.refresh_from_db()
+        self.assertIsNone(self.post.image_width)
+        self.assertFalse(self.post.image_variants.exists())
@@ -0,0 +1,67 @@
+# posts/tests/test_instrumentation.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import instrumentation
+from ..models import Post
+
+User = get_user_model()
+
+
+class InstrumentationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.staff = User.objects.create_user(username='admin', is_staff=True)
+        Post.objects.create(author=cls.author, text='Тестовый пост')
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.slow_requests.clear()
+        self.client = Client()
+
+    def _timing(self, response):
+        return dict(
+            item.split(';', 1) for item in
+            response['Server-Timing'].split(', ')
+        )
+
+    def test_server_timing_header(self):
+        """Заголовок Server-Timing и строка лога с метриками."""
+        with self.assertLogs('core.requests', 'INFO') as logs:
+            response = self.client.get(reverse('posts:index'))
+        timing = self._timing(response)
+        self.assertEqual(
+            set(timing), {'db', 'tpl', 'cache', 'total'}
+        )
+        # Промахи кэша страниц и фрагмента ленты
+        self.assertIn('hits 0 / misses 2', timing['cache'])
+        metrics = logs.records[0].request_metrics
+        self.assertGreater(metrics['queries'], 0)
+        self.assertGreater(metrics['template_ms'], 0)
+        self.assertIn(f'queries={metrics["queries"]}', logs.output[0])
+        self.assertIn('path=/', logs.output[0])
+
+        # Повторный запрос берет страницу из кэша целиком
+        response = self.client.get(reverse('posts:index'))
+        self.assertIn('hits 1 / misses 0', self._timing(response)['cache'])
+
+    @override_settings(INSTRUMENTATION_SLOW_MS=0)
+    def test_slow_requests_page(self):
+        """Медленные запросы видны только персоналу."""
+        self.client.get(reverse('posts:index'))
+        url = reverse('core:slow_requests')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 302)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(url)
+        self.assertContains(response, 'GET /')
+        self.assertIn(
+            '/', [entry['path'] for entry in response.context['entries']]
+        )
+        self.client.post(url)
+        self.assertEqual(len(instrumentation.slow_requests.slowest()), 1)
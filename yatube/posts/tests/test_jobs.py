@@ -0,0 +1,216 @@
+# posts/tests/test_jobs.py
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs import queue
+from jobs.models import Job
+from .. import search, tasks
+from ..models import Follow, Notification, Post, TimelineEntry
+from .utils import JobsMixin
+
+User = get_user_model()
+
+calls = []
+
+
+@queue.task(name='tests.flaky', max_attempts=2)
+def flaky(fail_times):
+    calls.append(fail_times)
+    if len(calls) <= fail_times:
+        raise RuntimeError('Сбой')
+
+
+@override_settings(JOBS_INLINE=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def _make_due(self):
+        Job.objects.update(run_at=timezone.now())
+
+    def test_idempotency_key(self):
+        """Задача с тем же ключом, пока ждет в очереди, не дублируется."""
+        flaky.enqueue(0, key='same')
+        flaky.enqueue(0, key='same')
+        flaky.enqueue(0)
+        self.assertEqual(Job.objects.count(), 2)
+        self.assertTrue(queue.run_next())
+        # Выполненная задача удалена - ключ снова свободен
+        flaky.enqueue(0, key='same')
+        self.assertEqual(Job.objects.filter(key='same').count(), 1)
+
+    def test_retry_with_backoff(self):
+        flaky.enqueue(1)
+        started = timezone.now()
+        self.assertTrue(queue.run_next())
+        job = Job.objects.get()
+        self.assertEqual(job.state, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn('RuntimeError', job.last_error)
+        self.assertGreater(job.run_at, started)
+        # Повтор еще не пора выполнять
+        self.assertFalse(queue.run_next())
+        self._make_due()
+        self.assertTrue(queue.run_next())
+        self.assertFalse(Job.objects.exists())
+        self.assertEqual(len(calls), 2)
+
+    def test_failed_after_max_attempts(self):
+        flaky.enqueue(5)
+        queue.run_next()
+        self._make_due()
+        queue.run_next()
+        job = Job.objects.get()
+        self.assertEqual(job.state, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    @override_settings(JOBS_RETRY_DELAY=10, JOBS_RETRY_MAX_DELAY=60)
+    def test_backoff_is_exponential_and_capped(self):
+        delays = [queue.backoff(attempt) for attempt in range(1, 6)]
+        for delay, expected in zip(delays, (10, 20, 40, 60, 60)):
+            self.assertGreaterEqual(delay, expected)
+            self.assertLessEqual(delay, expected * 1.1)
+
+    def test_expired_lease_requeued(self):
+        """Задача упавшего воркера снова попадает в очередь."""
+        flaky.enqueue(0)
+        job = queue.claim()
+        self.assertIsNone(queue.claim())
+        Job.objects.filter(pk=job.pk).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(queue.release_expired(), 1)
+        self.assertEqual(queue.claim().pk, job.pk)
+
+    def test_stale_follow_task_skipped(self):
+        """Отписка до выполнения задачи - лента не заполняется."""
+        reader = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='writer')
+        Post.objects.create(author=author, text='Пост')
+        tasks.fill_timeline(reader.pk, author.pk)
+        self.assertFalse(TimelineEntry.objects.exists())
+
+
+class ViewJobsTests(JobsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        with cls.run_jobs():
+            Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        calls.clear()
+        cache.clear()
+
+    def test_post_create_runs_through_queue(self):
+        """Создание поста ставит задачи после коммита, воркер их
+        выполняет - лента, поиск и уведомления готовы."""
+        client = Client()
+        client.force_login(self.author)
+        with self.run_jobs():
+            client.post(
+                reverse('posts:post_create'), {'text': 'Фоновый пост'}
+            )
+            # До коммита задач нет ни в очереди, ни в результатах
+            self.assertFalse(Job.objects.exists())
+            self.assertFalse(TimelineEntry.objects.exists())
+        post = Post.objects.get()
+        self.assertFalse(Job.objects.exists())
+        reader = Client()
+        reader.force_login(self.reader)
+        response = reader.get(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [post])
+        self.assertEqual(search.search('фоновый'), [post.pk])
+        self.assertTrue(
+            Notification.objects.filter(user=self.reader, post=post).exists()
+        )
+
+    def test_not_run_in_caller_transaction(self):
+        """И без очереди задача ждет коммита: транзакция теста
+        не коммитится - задача не выполняется."""
+        flaky.enqueue_on_commit(0)
+        self.assertEqual(calls, [])
+
+    def test_failed_job_fails_test(self):
+        with self.assertRaisesMessage(AssertionError, 'RuntimeError'):
+            with self.assertLogs('jobs.queue', 'WARNING'):
+                with self.run_jobs():
+                    flaky.enqueue_on_commit(1)
+        self.assertEqual(calls, [1])
+
+
+@override_settings(JOBS_INLINE=True)
+class InlineOnCommitTests(TransactionTestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_runs_after_commit(self):
+        with transaction.atomic():
+            flaky.enqueue_on_commit(0)
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, [0])
+        self.assertFalse(Job.objects.exists())
+
+    def test_not_run_on_rollback(self):
+        with self.assertRaises(ValueError):
+            with transaction.atomic():
+                flaky.enqueue_on_commit(0)
+                raise ValueError
+        self.assertEqual(calls, [])
+
+    def test_error_logged_after_commit(self):
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            with transaction.atomic():
+                flaky.enqueue_on_commit(1)
+        self.assertEqual(calls, [1])
+
+
+@override_settings(JOBS_INLINE=False)
+class WorkerTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='writer')
+        Follow.objects.create(user=self.reader, author=self.author)
+        call_command('run_workers', burst=True, stdout=StringIO())
+
+    def test_view_enqueues_after_commit(self):
+        """Создание поста только ставит задачи, их выполняют воркеры."""
+        client = Client()
+        client.force_login(self.author)
+        client.post(reverse('posts:post_create'), {'text': 'Фоновый пост'})
+        post = Post.objects.get()
+        self.assertEqual(
+            set(Job.objects.values_list('key', flat=True)),
+            {f'fan_out:{post.pk}', f'index:{post.pk}', f'notify:{post.pk}'},
+        )
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+        output = StringIO()
+        # Один поток: общая база тестов в памяти блокирует таблицы
+        # целиком, и задачи параллельных потоков уходили бы на повтор
+        call_command(
+            'run_workers', burst=True, threads=1, poll_interval=0.01,
+            stdout=output,
+        )
+        self.assertIn('Выполнено задач: 3', output.getvalue())
+        self.assertFalse(Job.objects.exists())
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post).exists()
+        )
+        self.assertEqual(search.search('фоновый'), [post.pk])
+        self.assertTrue(
+            Notification.objects.filter(user=self.reader, post=post).exists()
+        )
@@ -0,0 +1,167 @@
+# posts/tests/test_notifications.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from jobs import queue
+from jobs.models import Job
+from .. import notifications, tasks
+from ..models import Follow, Notification, Post, UserStats
+from .utils import JobsMixin, QueryCountMixin
+
+User = get_user_model()
+
+
+def unread(user):
+    return UserStats.objects.get(user=user).unread_notifications
+
+
+@override_settings(NOTIFICATION_BATCH_SIZE=2)
+class NotificationTests(JobsMixin, QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.readers = [
+            User.objects.create_user(
+                username=f'reader{number}',
+                email=f'reader{number}@example.com' if number else '',
+            )
+            for number in range(5)
+        ]
+        for reader in cls.readers:
+            Follow.objects.create(user=reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.readers[1])
+
+    def test_all_followers_notified(self):
+        with self.run_jobs():
+            post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertEqual(
+            set(post.notifications.values_list('user_id', flat=True)),
+            {reader.pk for reader in self.readers},
+        )
+        for reader in self.readers:
+            self.assertEqual(unread(reader), 1)
+        self.assertEqual(unread(self.author), 0)
+
+    @override_settings(JOBS_INLINE=False)
+    def test_fan_out_by_chunks(self):
+        """Пачка - одна задача; следующая ставится в той же транзакции,
+        повтор пачки не удваивает счетчики."""
+        post = Post.objects.create(author=self.author, text='Пост')
+        tasks.notify_followers(post.pk)
+        self.assertEqual(post.notifications.count(), 2)
+        job = Job.objects.get(name=tasks.notify_followers.name)
+        self.assertTrue(job.key.startswith(f'notify:{post.pk}:'))
+        # Повтор той же пачки
+        tasks.notify_followers(post.pk)
+        self.assertEqual(post.notifications.count(), 2)
+        self.assertEqual(unread(self.readers[0]), 1)
+        while queue.run_next():
+            pass
+        self.assertEqual(post.notifications.count(), 5)
+        for reader in self.readers:
+            self.assertEqual(unread(reader), 1)
+
+    def test_chunk_queries_do_not_grow_with_followers(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+        Notification.objects.all().delete()
+        with self.settings(NOTIFICATION_BATCH_SIZE=1000):
+            with self.assertMaxQueries(5):
+                notifications.notify_chunk(post.pk)
+        self.assertEqual(post.notifications.count(), 5)
+
+    def test_header_badge_and_mark_read(self):
+        with self.run_jobs():
+            Post.objects.create(author=self.author, text='Первый')
+            second = Post.objects.create(author=self.author, text='Второй')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<span class="badge bg-danger">2</span>')
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertEqual(
+            response.context['page_obj'][0].post, second
+        )
+        self.assertContains(response, 'новое', count=2)
+        self.assertEqual(unread(self.readers[1]), 0)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertNotContains(response, 'новое')
+        response = self.client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'badge bg-danger')
+
+    def test_header_counter_cached(self):
+        """Шапка берет счетчик из кэша, рассылка его сбрасывает."""
+        self.client.get(reverse('posts:index'))
+        with self.assertMaxQueries(10) as context:
+            self.client.get(reverse('posts:index'))
+        self.assertFalse(any(
+            'unread_notifications' in query['sql']
+            for query in context.captured_queries
+        ))
+        with self.run_jobs():
+            Post.objects.create(author=self.author, text='Пост')
+        response = self.client.get(reverse('posts:index'))
+        self.assertContains(response, '<span class="badge bg-danger">1</span>')
+
+    def test_etag_depends_on_unread(self):
+        """Новое уведомление и прочтение меняют ETag страницы, хотя
+        сама она (чужой профиль) не менялась."""
+        url = reverse(
+            'posts:profile', kwargs={'username': self.readers[2].username}
+        )
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+        with self.run_jobs():
+            Post.objects.create(author=self.author, text='Пост')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, '<span class="badge bg-danger">1</span>')
+        etag = response['ETag']
+        self.client.get(reverse('posts:notifications'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'badge bg-danger')
+
+    def test_deleted_post_leaves_counter(self):
+        with self.run_jobs():
+            post = Post.objects.create(author=self.author, text='Пост')
+        self.client.get(reverse('posts:notifications'))
+        with self.run_jobs():
+            extra = Post.objects.create(author=self.author, text='Еще пост')
+        extra.delete()
+        post.delete()
+        self.assertEqual(unread(self.readers[0]), 0)
+        self.assertEqual(unread(self.readers[1]), 0)
+
+    def test_daily_digest(self):
+        """Письмо получают подписчики с адресом и непрочитанным,
+        второй запуск не повторяет уже отправленное."""
+        with self.run_jobs():
+            Post.objects.create(author=self.author, text='Пост для дайджеста')
+        self.client.get(reverse('posts:notifications'))
+        call_command('send_digests', batch_size=2, stdout=StringIO())
+        self.assertEqual(
+            sorted(message.to[0] for message in mail.outbox),
+            [f'reader{number}@example.com' for number in (2, 3, 4)],
+        )
+        self.assertIn('Пост для дайджеста', mail.outbox[0].body)
+        self.assertIn(
+            reverse('posts:notifications'), mail.outbox[0].body
+        )
+        mail.outbox.clear()
+        call_command('send_digests', stdout=StringIO())
+        self.assertEqual(mail.outbox, [])
+        with self.run_jobs():
+            Post.objects.create(author=self.author, text='Следующий пост')
+        call_command('send_digests', stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertNotIn('Пост для дайджеста', mail.outbox[0].body)
@@ -0,0 +1,128 @@
+# posts/tests/test_page_cache.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core import page_cache
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост'
+        )
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+
+    def test_anonymous_page_cached(self):
+        """Повторный анонимный запрос - без базы и шаблона страницы."""
+        url = reverse('posts:index')
+        first = self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertTemplateNotUsed(response, 'posts/index.html')
+        self.assertEqual(response.content, first.content)
+        self.assertNotIn(page_cache.HOLE_PREFIX, response.content)
+
+    def test_logged_in_user_gets_own_parts(self):
+        """Страница из кэша, но шапка и значки - свои у каждого."""
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        response = self.reader_client.get(url)
+        self.assertTemplateNotUsed(response, 'posts/index.html')
+        self.assertContains(response, 'Пользователь: reader')
+        self.assertContains(response, 'Избранные авторы')
+        self.assertContains(response, 'вы подписаны')
+        response = self.guest_client.get(url)
+        self.assertNotContains(response, 'Пользователь:')
+        self.assertNotContains(response, 'вы подписаны')
+
+    def test_post_page_buttons(self):
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.guest_client.get(url)
+        edit_url = reverse('posts:post_edit', kwargs={'post_id': self.post.pk})
+        response = self.author_client.get(url)
+        self.assertTemplateNotUsed(response, 'posts/post_detail.html')
+        self.assertContains(response, edit_url)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+        response = self.reader_client.get(url)
+        self.assertNotContains(response, edit_url)
+        self.assertContains(response, 'Добавить комментарий')
+        response = self.guest_client.get(url)
+        self.assertNotContains(response, 'csrfmiddlewaretoken')
+
+    def test_profile_follow_button(self):
+        url = reverse('posts:profile', kwargs={'username': self.author})
+        self.assertNotContains(self.author_client.get(url), 'Подписаться')
+        self.assertContains(self.reader_client.get(url), 'Отписаться')
+        self.assertNotContains(self.guest_client.get(url), 'Отписаться')
+
+    def test_write_invalidates_page(self):
+        url = reverse('posts:index')
+        self.guest_client.get(url)
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertContains(self.guest_client.get(url), 'Новый пост')
+
+    def test_author_change_invalidates_old_profile(self):
+        """Пост, переданный другому автору, пропадает и с закэшированной
+        страницы прежнего."""
+        url = reverse('posts:profile', kwargs={'username': self.author})
+        self.assertContains(self.guest_client.get(url), 'Тестовый пост')
+        post = Post.objects.get(pk=self.post.pk)
+        post.author = self.reader
+        post.save()
+        self.assertNotContains(self.guest_client.get(url), 'Тестовый пост')
+
+    def test_group_change_invalidates_pages(self):
+        """Новые название и адрес группы видны на закэшированных
+        страницах ее постов, авторов и общей ленты."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', kwargs={'username': self.author}),
+            reverse('posts:post_detail', kwargs={'post_id': self.post.pk}),
+        )
+        for url in urls:
+            self.assertContains(
+                self.guest_client.get(url), '/group/Test_slug/'
+            )
+        self.group.slug = 'new_slug'
+        self.group.title = 'Новое название'
+        self.group.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertContains(response, '/group/new_slug/')
+                self.assertNotContains(response, '/group/Test_slug/')
+        self.assertContains(self.guest_client.get(urls[-1]), 'Новое название')
+
+    def test_about_pages_cached(self):
+        url = reverse('about:author')
+        self.guest_client.get(url)
+        response = self.reader_client.get(url)
+        self.assertTemplateNotUsed(response, 'about/author.html')
+        self.assertContains(response, 'Пользователь: reader')
+
+    def test_hole_markup(self):
+        marker = page_cache.hole('includes/header.html', name='-->x')
+        self.assertEqual(marker.count('-->'), 1)
+        self.assertTrue(marker.endswith('-->'))
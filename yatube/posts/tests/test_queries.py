@@ -0,0 +1,94 @@
+# posts/tests/test_queries.py
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Follow, Group, Post
+from .utils import QueryCountMixin
+
+User = get_user_model()
+
+
+class FeedQueriesTests(QueryCountMixin, TestCase):
+    """Число запросов ленты не зависит от числа постов на странице."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='Test_slug',
+            description='Тестовое описание',
+        )
+        cls.authors = [
+            User.objects.create_user(username=f'writer_{i}')
+            for i in range(12)
+        ]
+        for author in cls.authors:
+            Follow.objects.create(user=cls.user, author=author)
+            Post.objects.create(
+                author=author, group=cls.group, text='Тестовый пост'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_feed_views_query_count(self):
+        """Ленты выполняют ограниченное число запросов."""
+        # сессия и пользователь - 2 запроса у авторизованного клиента,
+        # подписки пользователя и число уведомлений в шапке - 2
+        # (пока их нет в кэше),
+        # лента - 1 запрос, варианты картинок страницы - еще 1;
+        # в ленте подписок еще проверка "звезд" среди авторов
+        pages = {
+            reverse('posts:index'): 6,
+            reverse(
+                'posts:group_posts', kwargs={'slug': self.group.slug}
+            ): 7,
+            reverse(
+                'posts:profile', kwargs={'username': self.authors[0]}
+            ): 7,
+            reverse('posts:follow_index'): 7,
+        }
+        for url, limit in pages.items():
+            with self.subTest(url=url):
+                cache.clear()
+                with self.assertMaxQueries(limit):
+                    response = self.authorized_client.get(url)
+                self.assertEqual(response.status_code, 200)
+
+    def test_following_set_cached(self):
+        """Подписки загружаются одним запросом и берутся из кэша."""
+        self.authorized_client.get(reverse('posts:index'))
+        url = reverse('posts:group_posts', kwargs={'slug': self.group.slug})
+        with self.assertMaxQueries(10) as context:
+            response = self.authorized_client.get(url)
+        self.assertFalse(any(
+            'posts_follow' in query['sql']
+            for query in context.captured_queries
+        ))
+        self.assertContains(response, 'вы подписаны', count=10)
+
+    def test_following_set_invalidated(self):
+        """Подписка и отписка сбрасывают кэш подписок."""
+        author = User.objects.create_user(username='newcomer')
+        profile = reverse('posts:profile', kwargs={'username': author})
+        self.assertContains(
+            self.authorized_client.get(profile), 'Подписаться'
+        )
+        self.authorized_client.get(
+            reverse('posts:profile_follow', kwargs={'username': author})
+        )
+        self.assertContains(
+            self.authorized_client.get(profile), 'Отписаться'
+        )
+        self.authorized_client.get(
+            reverse('posts:profile_unfollow', kwargs={'username': author})
+        )
+        self.assertContains(
+            self.authorized_client.get(profile), 'Подписаться'
+        )
@@ -0,0 +1,87 @@
+# posts/tests/test_query_plans.py
+import re
+from datetime import datetime
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.utils import timezone
+
+from core.paginator import KeysetPaginator
+from .. import timelines
+from ..models import Follow, Group, Post
+from ..views import comments_page
+
+User = get_user_model()
+
+# Полный проход по таблице ("SCAN posts_post" без индекса)
+# и сортировка во временном B-tree
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+TEMP_SORT = 'USE TEMP B-TREE'
+
+
+def query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN - SQLite')
+class QueryPlanTests(TestCase):
+    """Запросы лент и комментариев идут по индексам, без сортировки."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.group = Group.objects.create(
+            title='Тестовая группа', slug='test-slug', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Тестовый пост'
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def assertIndexedPlan(self, queryset):
+        plan = query_plan(queryset)
+        for line in plan:
+            self.assertFalse(
+                FULL_SCAN.match(line), f'Полный проход: {plan}'
+            )
+            self.assertNotIn(TEMP_SORT, line, f'Сортировка: {plan}')
+
+    def _pages(self, queryset):
+        """Первая страница и страница после курсора, как в page_cuter."""
+        paginator = KeysetPaginator(queryset, 10)
+        values = [timezone.make_aware(datetime(2026, 1, 1)), 100, 100]
+        values = values[:len(paginator.fields)]
+        limit = paginator.per_page + 1
+        return {
+            'first': queryset.order_by(*paginator.ordering)[:limit],
+            'next': queryset.filter(paginator._after(values))
+            .order_by(*paginator.ordering)[:limit],
+            'previous': queryset.filter(paginator._after(values, True))
+            .order_by(*paginator._reversed_ordering())[:limit],
+        }
+
+    def test_feeds(self):
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group_posts': self.group.posts.for_feed(),
+            'profile': self.author.posts.for_feed(),
+            'follow_index': timelines.timeline_entries(self.user),
+        }
+        for name, queryset in feeds.items():
+            for page, page_queryset in self._pages(queryset).items():
+                with self.subTest(view=name, page=page):
+                    self.assertIndexedPlan(page_queryset)
+
+    def test_comments(self):
+        request = RequestFactory().get('/')
+        queryset = comments_page(request, self.post).paginator.object_list
+        for page, page_queryset in self._pages(queryset).items():
+            with self.subTest(page=page):
+                self.assertIndexedPlan(page_queryset)
@@ -0,0 +1,78 @@
+# posts/tests/test_replicas.py
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core import fragment_cache, routers
+from core.replication import Replicator
+from ..models import Post
+
+User = get_user_model()
+
+
+@override_settings(REPLICA_DATABASES=['replica'])
+class ReplicaRoutingTests(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='writer')
+        self.replicator = Replicator(['replica'])
+        self.replicator.sync(force=True)
+        routers.reset()
+        self.addCleanup(routers.reset)
+
+    def page_texts(self, client):
+        response = client.get(reverse('posts:index'))
+        return [post.text for post in response.context['page_obj']]
+
+    def test_reads_go_to_replica(self):
+        """Чтение - с реплики, которая видит записи только после копии."""
+        Post.objects.using('default').create(author=self.author, text='Пост')
+        routers.reset()
+        self.assertEqual(Post.objects.all().db, 'replica')
+        self.assertFalse(Post.objects.exists())
+        self.replicator.sync(force=True)
+        self.assertTrue(Post.objects.exists())
+
+    def test_write_pins_thread(self):
+        Post.objects.create(author=self.author, text='Пост')
+        self.assertEqual(Post.objects.all().db, 'default')
+        self.assertTrue(Post.objects.exists())
+
+    def test_atomic_block_reads_primary(self):
+        with transaction.atomic():
+            self.assertEqual(Post.objects.all().db, 'default')
+        with routers.use_primary():
+            self.assertEqual(Post.objects.all().db, 'default')
+        self.assertEqual(Post.objects.all().db, 'replica')
+
+    def test_other_apps_read_primary(self):
+        self.assertEqual(User.objects.all().db, 'default')
+
+    def test_read_your_writes_after_post(self):
+        """Автор сразу видит свой пост, остальные - после репликации."""
+        author_client = Client()
+        author_client.force_login(self.author)
+        guest_client = Client()
+        response = author_client.post(
+            reverse('posts:post_create'), {'text': 'Свежий пост'}
+        )
+        cookie = response.cookies[settings.REPLICA_PIN_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+        self.assertIn('Свежий пост', self.page_texts(author_client))
+        self.assertNotIn('Свежий пост', self.page_texts(guest_client))
+        self.replicator.sync(force=True)
+        # Устаревшая страница с реплики не попала в кэш фрагментов
+        self.assertIn('Свежий пост', self.page_texts(guest_client))
+
+    def test_stale_fragments_not_cached(self):
+        version = fragment_cache.get_version('feed')
+        self.assertFalse(fragment_cache.settled(version))
+        with routers.use_primary():
+            self.assertTrue(fragment_cache.settled(version))
+        with override_settings(REPLICA_STICKY_SECONDS=0):
+            self.assertTrue(fragment_cache.settled(version))
@@ -0,0 +1,91 @@
+# posts/tests/test_search.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, SearchTerm
+from ..stemmer import stem
+from .utils import JobsMixin
+
+User = get_user_model()
+
+
+class StemmerTests(TestCase):
+    def test_stem(self):
+        """Словоформы сводятся к одной основе."""
+        for word in ('пост', 'посты', 'постами', 'поста'):
+            with self.subTest(word=word):
+                self.assertEqual(stem(word), 'пост')
+        self.assertEqual(stem('Python'), 'python')
+
+
+class SearchTests(JobsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+
+    def setUp(self):
+        # Посты в setUp: тесты их меняют и удаляют
+        with self.run_jobs():
+            self.cats = Post.objects.create(
+                author=self.author, text='Кошки любят спать. Кошки и кошка.'
+            )
+            self.dogs = Post.objects.create(
+                author=self.author, text='Собаки любят гулять, а кошки спать.'
+            )
+            self.code = Post.objects.create(
+                author=self.author, text='Программирование на Python'
+            )
+
+    def _check_backend(self):
+        self.assertEqual(
+            search.search('кошками'), [self.cats.pk, self.dogs.pk]
+        )
+        self.assertEqual(search.search('собака кошки'), [self.dogs.pk])
+        # Префикс незаконченного слова
+        self.assertEqual(search.search('програм'), [self.code.pk])
+        self.assertEqual(search.search('pyth'), [self.code.pk])
+        self.assertEqual(search.search('слон'), [])
+        self.assertEqual(search.search('!!!'), [])
+        self.dogs.text = 'Собаки любят гулять.'
+        with self.run_jobs():
+            self.dogs.save()
+        self.assertEqual(search.search('кошки'), [self.cats.pk])
+        self.cats.delete()
+        self.assertEqual(search.search('кошки'), [])
+
+    def test_fts5_backend(self):
+        """Поиск через FTS5: основы, префиксы, ранжирование."""
+        if not search.fts5_available():
+            self.skipTest('SQLite собран без FTS5')
+        self.assertEqual(search.get_backend().name, 'fts5')
+        self._check_backend()
+
+    @override_settings(SEARCH_BACKEND='python')
+    def test_python_backend(self):
+        """Запасной обратный индекс ищет так же."""
+        search.rebuild()
+        self.assertTrue(SearchTerm.objects.exists())
+        self._check_backend()
+
+    def test_rebuild_command(self):
+        """Команда пересобирает индекс."""
+        search.get_backend().clear()
+        self.assertEqual(search.search('кошки'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(
+            search.search('кошки'), [self.cats.pk, self.dogs.pk]
+        )
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты."""
+        response = Client().get(reverse('posts:search'), {'q': 'собаки'})
+        self.assertEqual(list(response.context['page_obj']), [self.dogs])
+        self.assertContains(response, 'Собаки любят гулять')
+        response = Client().get(reverse('posts:search'))
+        self.assertEqual(len(response.context['page_obj']), 0)
@@ -0,0 +1,94 @@
+# posts/tests/test_sqlite_backend.py
+import os
+import tempfile
+from io import StringIO
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from core import sqlite_bench
+from core.backends.sqlite3.base import DatabaseWrapper
+
+OPTIONS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 1024 * 1024,
+    'cache_size': -2000,
+    'busy_timeout': 1234,
+    'transaction_mode': 'immediate',
+}
+
+
+class SQLiteBackendTests(SimpleTestCase):
+    def wrapper(self, path, **options):
+        return DatabaseWrapper({
+            'NAME': path, 'OPTIONS': options, 'CONN_MAX_AGE': 0,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'TIME_ZONE': None, 'USER': '', 'PASSWORD': '', 'HOST': '',
+            'PORT': '', 'TEST': {},
+        }, alias='sqlite_backend_test')
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'db.sqlite3')
+
+    def test_pragmas_applied(self):
+        """PRAGMA из OPTIONS выполняются на новом соединении."""
+        wrapper = self.wrapper(self.path, **OPTIONS)
+        self.addCleanup(wrapper.close)
+        with wrapper.cursor() as cursor:
+            values = {}
+            for name in ('journal_mode', 'synchronous', 'mmap_size',
+                         'cache_size', 'busy_timeout'):
+                cursor.execute(f'PRAGMA {name}')
+                values[name] = cursor.fetchone()[0]
+        self.assertEqual(values, {
+            'journal_mode': 'wal',
+            'synchronous': 1,
+            'mmap_size': 1024 * 1024,
+            'cache_size': -2000,
+            'busy_timeout': 1234,
+        })
+        self.assertEqual(wrapper.transaction_mode, 'IMMEDIATE')
+
+    def test_immediate_transaction(self):
+        """atomic() начинается с BEGIN IMMEDIATE - блокировка сразу."""
+        wrapper = self.wrapper(self.path, **OPTIONS)
+        other = self.wrapper(self.path, busy_timeout=0)
+        self.addCleanup(wrapper.close)
+        self.addCleanup(other.close)
+        with wrapper.cursor() as cursor:
+            cursor.execute('CREATE TABLE item (id INTEGER PRIMARY KEY)')
+        wrapper.set_autocommit(
+            False, force_begin_transaction_with_broken_autocommit=True
+        )
+        try:
+            with other.cursor() as cursor:
+                with self.assertRaisesRegex(Exception, 'locked'):
+                    cursor.execute('INSERT INTO item VALUES (1)')
+        finally:
+            wrapper.rollback()
+            wrapper.set_autocommit(True)
+
+    def test_invalid_transaction_mode(self):
+        wrapper = self.wrapper(self.path, transaction_mode='LAZY')
+        with self.assertRaises(ImproperlyConfigured):
+            wrapper.get_connection_params()
+
+    def test_concurrency_benchmark(self):
+        """Короткий прогон бенчмарка возвращает пропускную способность."""
+        result = sqlite_bench.run(
+            sqlite_bench.tuned_config(OPTIONS),
+            readers=2, writers=1, duration=0.2, rows=200,
+        )
+        self.assertGreater(result['reads'], 0)
+        self.assertGreater(result['writes'], 0)
+        out = StringIO()
+        call_command(
+            'bench_sqlite', readers=1, writers=1, duration=0.1, rows=100,
+            stdout=out,
+        )
+        self.assertIn('по умолчанию', out.getvalue())
+        self.assertIn('проект', out.getvalue())
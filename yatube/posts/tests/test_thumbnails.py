@@ -0,0 +1,87 @@
+# posts/tests/test_thumbnails.py
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import tasks, thumbnails
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+# Задачи картинок уходят в очередь, а не выполняются сразу
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, JOBS_INLINE=False)
+class ThumbnailTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        small_gif = (
+            b'\x47\x49\x46\x38\x39\x61\x02\x00'
+            b'\x01\x00\x80\x00\x00\x00\x00\x00'
+            b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+            b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+            b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+            b'\x0A\x00\x3B'
+        )
+        cls.author = User.objects.create_user(username='writer')
+        cls.post = Post.objects.create(
+            author=cls.author,
+            text='Пост с картинкой',
+            image=SimpleUploadedFile(
+                name='small.gif', content=small_gif, content_type='image/gif'
+            ),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_placeholder_until_generated(self):
+        """Пока миниатюры нет, шаблон показывает заглушку."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = Client().get(url)
+        self.assertContains(response, 'img/placeholder.svg')
+        thumbnail = thumbnails.backend.get_ready_thumbnail(
+            self.post.image, '960x339', crop='center', upscale=True
+        )
+        self.assertIsNone(thumbnail)
+
+    def test_generated_thumbnail_used(self):
+        """После фоновой генерации шаблон берет готовую миниатюру."""
+        thumbnails.generate(self.post.image.name)
+        thumbnail = thumbnails.backend.get_ready_thumbnail(
+            self.post.image, '960x339', crop='center', upscale=True
+        )
+        self.assertIsNotNone(thumbnail)
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        response = Client().get(url)
+        self.assertContains(response, thumbnail.url)
+        self.assertNotContains(response, 'img/placeholder.svg')
+
+    def test_cached_page_refreshed_after_job(self):
+        """Задача миниатюр сбрасывает закэшированную страницу
+        с заглушкой и ее ETag."""
+        client = Client()
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        etag = client.get(url)['ETag']
+        self.assertContains(
+            client.get(reverse('posts:index')), 'img/placeholder.svg'
+        )
+        tasks.generate_thumbnails(self.post.image.name, self.post.pk)
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, 'img/placeholder.svg')
+        response = client.get(reverse('posts:index'))
+        self.assertNotContains(response, 'img/placeholder.svg')
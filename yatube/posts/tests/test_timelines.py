@@ -0,0 +1,119 @@
+# posts/tests/test_timelines.py
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Follow, Post, TimelineEntry
+from .utils import JobsMixin
+
+User = get_user_model()
+
+
+class TimelineTests(JobsMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='writer')
+        cls.old_post = Post.objects.create(
+            author=cls.author,
+            text='Пост до подписки',
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def _feed(self):
+        response = self.authorized_client.get(reverse('posts:follow_index'))
+        return list(response.context['page_obj'])
+
+    def test_follow_fills_timeline(self):
+        """Подписка раскладывает старые и новые посты автора в ленту."""
+        with self.run_jobs():
+            Follow.objects.create(user=self.user, author=self.author)
+            new_post = Post.objects.create(
+                author=self.author, text='Новый пост'
+            )
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=self.user).count(), 2
+        )
+        self.assertEqual(self._feed(), [new_post, self.old_post])
+
+    def test_unfollow_cleans_timeline(self):
+        """Отписка убирает посты автора из ленты."""
+        with self.run_jobs():
+            follow = Follow.objects.create(
+                user=self.user, author=self.author
+            )
+        follow.delete()
+        self.assertFalse(TimelineEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(self._feed(), [])
+
+    def test_post_author_changed(self):
+        """Пост другого автора уходит из ленты подписчика прежнего
+        и попадает в ленты подписчиков нового."""
+        other = User.objects.create_user(username='other')
+        with self.run_jobs():
+            Follow.objects.create(user=self.user, author=self.author)
+            Follow.objects.create(user=other, author=other)
+        post = Post.objects.get(pk=self.old_post.pk)
+        post.author = other
+        with self.run_jobs():
+            post.save()
+        self.assertEqual(self._feed(), [])
+        self.assertEqual(
+            list(TimelineEntry.objects.values_list('user_id', 'post_id')),
+            [(other.pk, post.pk)],
+        )
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=0)
+    def test_celebrity_posts_read_on_demand(self):
+        """Посты "звезд" не раскладываются, но видны в ленте."""
+        with self.run_jobs():
+            Follow.objects.create(user=self.user, author=self.author)
+            new_post = Post.objects.create(
+                author=self.author, text='Новый пост'
+            )
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(self._feed(), [new_post, self.old_post])
+
+    @override_settings(TIMELINE_CELEBRITY_FOLLOWERS=1)
+    def test_former_celebrity_backfilled(self):
+        """Когда подписчиков снова не больше порога, посты автора
+        и подписки, сделанные за это время, раскладываются в ленты."""
+        other = User.objects.create_user(username='other')
+        with self.run_jobs():
+            Follow.objects.create(user=other, author=self.author)
+            Follow.objects.create(user=self.user, author=self.author)
+            new_post = Post.objects.create(
+                author=self.author, text='Новый пост'
+            )
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=self.user).exists()
+        )
+        with self.run_jobs():
+            Follow.objects.get(user=other).delete()
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(user=self.user).values_list(
+                'post_id', flat=True
+            )),
+            {new_post.pk, self.old_post.pk},
+        )
+        self.assertEqual(self._feed(), [new_post, self.old_post])
+
+    def test_ordering_does_not_join_posts(self):
+        """Лента сортируется по своим колонкам (post_id, а не post),
+        без JOIN с постами."""
+        sql = str(TimelineEntry.objects.filter(user=self.user).query)
+        self.assertNotIn('posts_post', sql)
+
+    def test_rebuild_command(self):
+        """Команда rebuild_timelines восстанавливает ленты."""
+        Follow.objects.create(user=self.user, author=self.author)
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(self._feed(), [self.old_post])
@@ -0,0 +1,139 @@
+# posts/tests/test_transfer.py
+import csv
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from .. import counters, search, transfer
+from ..models import Follow, Group, Post, TimelineEntry
+from .utils import QueryCountMixin
+
+User = get_user_model()
+
+
+class TransferTests(QueryCountMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='writer')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание',
+        )
+        now = timezone.now()
+        for number in range(5):
+            post = Post.objects.create(
+                author=cls.author,
+                group=cls.group if number % 2 else None,
+                text=f'Перенос пост {number}',
+            )
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - timedelta(days=number)
+            )
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _snapshot(self):
+        return list(Post.objects.order_by('text').values_list(
+            'author__username', 'group__slug', 'text', 'pub_date',
+        ))
+
+    def _reimport(self, path, *args, **options):
+        Post.objects.all().delete()
+        call_command('import_posts', path, *args, stdout=StringIO(),
+                     **options)
+
+    def test_round_trip(self):
+        """Выгрузка и загрузка сохраняют посты; счетчики, ленты
+        и поисковый индекс обновлены."""
+        before = self._snapshot()
+        for name in ('posts.jsonl', 'posts.csv'):
+            with self.subTest(name=name):
+                path = self._path(name)
+                call_command('export_posts', path, stderr=StringIO())
+                self._reimport(path)
+                self.assertEqual(self._snapshot(), before)
+                self.assertEqual(counters.reconcile(), [])
+                self.assertEqual(
+                    TimelineEntry.objects.filter(user=self.reader).count(), 5
+                )
+                self.assertEqual(len(search.search('перенос')), 5)
+
+    def test_csv_columns(self):
+        path = self._path('posts.csv')
+        call_command('export_posts', path, stderr=StringIO())
+        with open(path, encoding='utf-8', newline='') as file:
+            rows = list(csv.DictReader(file))
+        self.assertEqual(tuple(rows[0]), transfer.FIELDS)
+        self.assertEqual(len(rows), 5)
+
+    def test_export_resumes_from_checkpoint(self):
+        """С контрольной точкой выгрузка дописывает файл с места
+        остановки, а в конце удаляет точку."""
+        path = self._path('posts.jsonl')
+        checkpoint = self._path('export.json')
+        first = Post.objects.order_by('pk').first()
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(json.dumps({'id': first.pk}) + '\n')
+        transfer.Checkpoint(checkpoint).save(last_pk=first.pk, rows=1)
+        call_command(
+            'export_posts', path, checkpoint=checkpoint, chunk_size=2,
+            stderr=StringIO(),
+        )
+        with open(path, encoding='utf-8') as file:
+            ids = [json.loads(line)['id'] for line in file]
+        self.assertEqual(
+            ids, list(Post.objects.order_by('pk').values_list('pk', flat=True))
+        )
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_import_resumes_from_checkpoint(self):
+        """Уже загруженные строки при повторном запуске пропускаются."""
+        path = self._path('posts.jsonl')
+        checkpoint = self._path('import.json')
+        call_command('export_posts', path, stderr=StringIO())
+        transfer.Checkpoint(checkpoint).save(position=3)
+        self._reimport(path, checkpoint=checkpoint, chunk_size=1)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_unknown_authors_and_groups(self):
+        """Неизвестные авторы и группы создаются только по флагу."""
+        path = self._path('posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as file:
+            for group in ('', 'new-group'):
+                file.write(json.dumps({
+                    'author': 'newcomer', 'group': group, 'text': 'Текст',
+                }) + '\n')
+        self._reimport(path)
+        self.assertFalse(Post.objects.exists())
+        self._reimport(path, create_missing=True)
+        newcomer = User.objects.get(username='newcomer')
+        self.assertFalse(newcomer.has_usable_password())
+        self.assertEqual(newcomer.posts.count(), 2)
+        self.assertEqual(Group.objects.get(slug='new-group').posts_count, 1)
+
+    def test_import_queries_do_not_grow_with_rows(self):
+        """Число запросов на пачку не зависит от числа строк в ней."""
+        rows = [
+            {'author': 'writer', 'group': 'group', 'text': f'Пост {number}'}
+            for number in range(200)
+        ]
+        importer = transfer.Importer(batch_size=1000, chunk_size=1000)
+        with self.assertMaxQueries(15):
+            importer.run(rows)
+        self.assertEqual(importer.created, 200)
@@ -0,0 +1,137 @@
+# posts/tests/test_uploads.py
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image, ImageFile
+
+from ..forms import PostForm
+from ..models import Post
+from ..uploads import StreamingUploadHandler
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def image_file(size, fmt='PNG', name='image.png'):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, (10, 120, 200)).save(buffer, fmt)
+    return SimpleUploadedFile(name, buffer.getvalue())
+
+
+@override_settings(
+    MEDIA_ROOT=TEMP_MEDIA_ROOT,
+    POST_IMAGE_MAX_SIZE=64 * 1024,
+    POST_IMAGE_MAX_PIXELS=1000 * 1000,
+)
+class UploadLimitTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='uploader')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def form_errors(self, upload):
+        form = PostForm({'text': 'Текст'}, {'image': upload})
+        return form.errors.as_data().get('image', [])
+
+    def test_valid_image_not_decoded(self):
+        """Подходящая картинка проходит без декодирования пикселей."""
+        with mock.patch.object(ImageFile.ImageFile, 'load') as load:
+            form = PostForm(
+                {'text': 'Текст'}, {'image': image_file((800, 600))}
+            )
+            self.assertTrue(form.is_valid(), form.errors)
+        load.assert_not_called()
+        self.assertEqual(form.cleaned_data['image'].content_type, 'image/png')
+
+    def test_limits(self):
+        """Слишком большой файл, картинка и чужой формат отклоняются."""
+        noise = SimpleUploadedFile('noise.png', b'\x89PNG' + b'0' * 70000)
+        cases = {
+            'too_large': noise,
+            'too_many_pixels': image_file((1001, 1000)),
+            'format': image_file((10, 10), 'BMP', 'image.bmp'),
+            'invalid_image': SimpleUploadedFile('text.png', b'not image'),
+        }
+        for code, upload in cases.items():
+            with self.subTest(code=code):
+                errors = self.form_errors(upload)
+                self.assertEqual([error.code for error in errors], [code])
+
+    def post_with_csrf(self, data):
+        """POST формы поста с настоящей проверкой CSRF: токен читается
+        из request.POST уже после установки обработчика загрузок."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        url = reverse('posts:post_create')
+        client.get(url)
+        return client.post(url, {
+            'csrfmiddlewaretoken': client.cookies['csrftoken'].value,
+            **data,
+        })
+
+    def test_upload_streamed_to_temporary_file(self):
+        """Форма поста пишет даже маленькую загрузку во временный файл."""
+        received = []
+        original = StreamingUploadHandler.file_complete
+
+        def file_complete(handler, file_size):
+            uploaded = original(handler, file_size)
+            received.append(uploaded.temporary_file_path())
+            return uploaded
+
+        with mock.patch.object(
+            StreamingUploadHandler, 'file_complete', file_complete
+        ):
+            response = self.post_with_csrf({
+                'text': 'Пост с картинкой', 'image': image_file((80, 60)),
+            })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(received), 1)
+        self.assertTrue(Post.objects.get(text='Пост с картинкой').image)
+
+    def test_oversized_upload_stopped(self):
+        """Загрузка сверх лимита обрывается, а форма показывает
+        ошибку размера, а не битой картинки."""
+        received = []
+        original = StreamingUploadHandler.receive_data_chunk
+
+        def receive_data_chunk(handler, raw_data, start):
+            original(handler, raw_data, start)
+            received.append(len(raw_data))
+
+        big = SimpleUploadedFile('big.png', b'\x89PNG' + b'0' * 200000)
+        with mock.patch.object(
+            StreamingUploadHandler, 'receive_data_chunk', receive_data_chunk
+        ):
+            response = self.post_with_csrf(
+                {'text': 'Большой файл', 'image': big}
+            )
+        self.assertLessEqual(sum(received), settings.POST_IMAGE_MAX_SIZE)
+        self.assertFormError(
+            response, 'form', 'image', 'Файл больше 64,0\xa0КБ.'
+        )
+        self.assertFalse(Post.objects.filter(text='Большой файл').exists())
+
+    def test_other_uploads_use_default_handlers(self):
+        """Лимит картинок постов не действует на остальные загрузки."""
+        self.assertNotIn(
+            'posts.uploads.StreamingUploadHandler',
+            settings.FILE_UPLOAD_HANDLERS,
+        )
@@ -1,5 +1,6 @@
 # posts/tests/tests_url.py
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from http import HTTPStatus
@@ -32,6 +33,8 @@ class PostsUrlTests(TestCase):
         )
 
     def setUp(self):
+        # Страницы из кэша отдаются без рендеринга шаблонов
+        cache.clear()
         # Создаем неавторизованный клиент
         self.guest_client = Client()
         # Создаем авторизованый клиент
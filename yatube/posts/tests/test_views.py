@@ -10,7 +10,9 @@ from django.test import TestCase, Client, override_settings
 from django.urls import reverse
 from django import forms
 
+from .. import counters
 from ..models import Follow, Group, Post
+from .utils import JobsMixin
 
 User = get_user_model()
 page_len = settings.ITEMS_ON_PAGE
@@ -23,7 +25,7 @@ TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 # Для сохранения media-файлов в тестах будет использоваться
 # временная папка TEMP_MEDIA_ROOT, а потом мы ее удалим
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
-class PostsUrlTests(TestCase):
+class PostsUrlTests(JobsMixin, TestCase):
     @classmethod
     def setUpClass(cls):
         super().setUpClass()
@@ -72,6 +74,8 @@ class PostsUrlTests(TestCase):
             image=uploaded,
         ) for i in range(31, 36)]
         Post.objects.bulk_create(lst_1 + lst_2)
+        # bulk_create не вызывает сигналы - пересчитываем счетчики
+        counters.reconcile(fix=True)
 
     @classmethod
     def tearDownClass(cls):
@@ -83,16 +87,20 @@ class PostsUrlTests(TestCase):
         shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
 
     def setUp(self):
+        # Откат транзакций теста не сбрасывает кеш фрагментов
+        cache.clear()
         # Создаем авторизованый клиент
         self.authorized_client = Client()
         self.authorized_client.force_login(self.user)
 
     # Проверка контекста в отдельной процедуре
     def _check_context(self, response, last_post):
-        if 'post' in response.context:
-            first_object = response.context['post']
-        else:
+        # В ленте 'post' тоже есть в контексте - это переменная цикла
+        # шаблона, поэтому сначала смотрим page_obj
+        if 'page_obj' in response.context:
             first_object = response.context['page_obj'][0]
+        else:
+            first_object = response.context['post']
         post_author = first_object.author
         post_group = first_object.group
         post_text = first_object.text
@@ -157,6 +165,34 @@ class PostsUrlTests(TestCase):
         )
         self.assertEqual(len(response.context['page_obj']), last_block_len)
 
+    def test_index_cursor_pagination(self):
+        """Курсор ведет на следующую и обратно на предыдущую страницу."""
+        first_page = self.authorized_client.get(
+            reverse('posts:index')
+        ).context['page_obj']
+        self.assertIsNone(first_page.previous_cursor)
+        second_page = self.authorized_client.get(
+            reverse('posts:index') + f'?cursor={first_page.next_cursor}'
+        ).context['page_obj']
+        self.assertEqual(second_page.number, 2)
+        self.assertEqual(
+            list(second_page), list(Post.objects.all()[page_len:])
+        )
+        self.assertIsNone(second_page.next_cursor)
+        back_page = self.authorized_client.get(
+            reverse('posts:index') + f'?cursor={second_page.previous_cursor}'
+        ).context['page_obj']
+        self.assertEqual(list(back_page), list(first_page))
+        self.assertEqual(back_page.number, 1)
+
+    def test_index_broken_cursor_returns_first_page(self):
+        """Испорченный курсор отдает первую страницу."""
+        response = self.authorized_client.get(
+            reverse('posts:index') + '?cursor=broken'
+        )
+        self.assertEqual(response.context['page_obj'].number, 1)
+        self.assertEqual(len(response.context['page_obj']), page_len)
+
     # Проверяем, что словарь context страницы /group/<slug>/
     # в первом элементе списка page_obj содержит ожидаемые значения
     def test_group_list_page_show_correct_context(self):
@@ -307,26 +343,27 @@ class PostsUrlTests(TestCase):
 
     # Проверяем кеширование
     def test_index_cache(self):
-        """Главная страница кешируется"""
+        """Главная страница кешируется и сбрасывается при записи"""
         # Смотрим на страницу
         response = self.authorized_client.get(reverse('posts:index'))
         content_1 = response.content
-        # Создаем пост
+        # Меняем пост в обход сигналов - страница берется из кеша
+        Post.objects.filter(pk=self.user_post.pk).update(
+            text='Изменено в обход сигналов...'
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        content_2 = response.content
+        self.assertEqual(content_1, content_2)
+        # Создаем пост - кеш ленты сбрасывается сразу
         self.post_for_cach = Post.objects.create(
             author=self.user,
             group=self.group_1,
             text='Пост для проверки кеша...',
         )
-        # Смотрим на страницу, там не должно ничего измениться
-        response = self.authorized_client.get(reverse('posts:index'))
-        content_2 = response.content
-        self.assertEqual(content_1, content_2)
-        # Чистим кеш
-        cache.clear()
-        # Смотрим на страницу, она должна измениться
         response = self.authorized_client.get(reverse('posts:index'))
         content_3 = response.content
         self.assertNotEqual(content_1, content_3)
+        self.assertContains(response, 'Пост для проверки кеша...')
         # Убираем за собой
         self.post_for_cach.delete()
 
@@ -374,14 +411,14 @@ class PostsUrlTests(TestCase):
         # Создаем свежего юзера
         fresh_user = User.objects.create_user(username='IamFresh')
         fresh_author = User.objects.create_user(username='IamFreshAuthor')
-        # Создаем подписку
-        Follow.objects.create(user=fresh_user, author=fresh_author)
-        # Создаем пост
-        new_post = Post.objects.create(
-            author=fresh_author,
-            group=self.group_1,
-            text='Подписки проверки пост...',
-        )
+        # Создаем подписку и пост; ленту заполняют фоновые задачи
+        with self.run_jobs():
+            Follow.objects.create(user=fresh_user, author=fresh_author)
+            new_post = Post.objects.create(
+                author=fresh_author,
+                group=self.group_1,
+                text='Подписки проверки пост...',
+            )
         # Запрашиваем ленту
         self.authorized_fresh = Client()
         self.authorized_fresh.force_login(fresh_user)
@@ -0,0 +1,58 @@
+# posts/tests/utils.py
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from jobs import queue
+from jobs.models import Job
+
+
+class QueryCountMixin:
+    """Проверка верхней границы числа SQL-запросов."""
+
+    @contextmanager
+    def assertMaxQueries(self, limit, using=None):
+        with CaptureQueriesContext(using or connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        self.assertLessEqual(
+            executed, limit,
+            f'Выполнено запросов: {executed}, допустимо не более {limit}:\n'
+            + '\n'.join(query['sql'] for query in context.captured_queries)
+        )
+
+
+class JobsMixin:
+    """Фоновые задачи в тестах - тем же путем, что и в работе.
+
+    В TestCase транзакция теста не коммитится, и колбэки on_commit
+    сами не выполняются. Задачи из блока with run_jobs ставятся
+    в очередь (даже при JOBS_INLINE), run_jobs выполняет накопленные
+    колбэки, а затем очередь - как воркер, через queue.run_next.
+    Упавшая задача роняет тест.
+    """
+
+    @classmethod
+    @contextmanager
+    def run_jobs(cls, using=DEFAULT_DB_ALIAS):
+        connection = connections[using]
+        start = len(connection.run_on_commit)
+        with override_settings(JOBS_INLINE=False):
+            yield
+        while True:
+            # Колбэки могут ставить новые колбэки
+            callbacks = connection.run_on_commit[start:]
+            start += len(callbacks)
+            for _, callback in callbacks:
+                callback()
+            executed = False
+            while queue.run_next():
+                executed = True
+            if not callbacks and not executed:
+                break
+        failed = Job.objects.exclude(last_error='').first()
+        if failed is not None:
+            raise AssertionError(
+                f'Задача {failed} упала:\n{failed.last_error}'
+            )
@@ -0,0 +1,42 @@
+# posts/thumbnails.py
+"""Фоновая подготовка миниатюр картинок постов.
+
+Шаблоны не создают миниатюры сами, а только берут готовые
+(ReadyThumbnailBackend); создают их фоновые задачи (posts.tasks)
+после коммита.
+"""
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+
+class ReadyThumbnailBackend(ThumbnailBackend):
+    def get_ready_thumbnail(self, file_, geometry_string, **options):
+        """Готовая миниатюра из хранилища sorl или None.
+
+        Имя файла считается так же, как в ThumbnailBackend.get_thumbnail,
+        но картинка не открывается и не пересчитывается.
+        """
+        source = ImageFile(file_)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        name = self._get_thumbnail_filename(source, geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = ReadyThumbnailBackend()
+
+
+def generate(name):
+    """Создает миниатюры всех размеров, которые используют шаблоны."""
+    for geometry, options in settings.POST_THUMBNAIL_SIZES:
+        backend.get_thumbnail(name, geometry, **options)
@@ -0,0 +1,179 @@
+# posts/timelines.py
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+
+from .models import FEED_FIELDS, Follow, Post, TimelineEntry, UserStats
+
+
+def _bulk_insert(entries):
+    """Вставляет записи ленты пачками, дубликаты пропускаются."""
+    batch_size = settings.TIMELINE_BATCH_SIZE
+    entries = iter(entries)
+    inserted = 0
+    while True:
+        batch = list(islice(entries, batch_size))
+        if not batch:
+            return inserted
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        inserted += len(batch)
+
+
+def followers_count(author):
+    return UserStats.objects.filter(user=author).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+
+
+def is_celebrity(author):
+    """У "звезд" слишком много подписчиков для раскладки при записи,
+    их посты подмешиваются в ленту при чтении."""
+    return followers_count(author) > settings.TIMELINE_CELEBRITY_FOLLOWERS
+
+
+def stopped_being_celebrity(author):
+    """Отписка только что опустила число подписчиков до порога:
+    посты автора больше не подмешиваются при чтении, и их нужно
+    разложить (backfill_author)."""
+    return followers_count(author) == settings.TIMELINE_CELEBRITY_FOLLOWERS
+
+
+def celebrity_authors(user):
+    """Подзапрос с id "звезд", на которых подписан пользователь."""
+    return UserStats.objects.filter(
+        user__in=Follow.objects.filter(user=user).values('author'),
+        followers_count__gt=settings.TIMELINE_CELEBRITY_FOLLOWERS,
+    ).values('user')
+
+
+def fan_out_post(post):
+    """Раскладывает новый пост по лентам подписчиков автора."""
+    if is_celebrity(post.author):
+        return 0
+    followers = Follow.objects.filter(
+        author=post.author
+    ).values_list('user_id', flat=True)
+    return _bulk_insert(
+        TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+        for user_id in followers.iterator()
+    )
+
+
+def add_author(user, author):
+    """Добавляет посты автора в ленту нового подписчика."""
+    if is_celebrity(author):
+        return 0
+    posts = author.posts.values_list('pk', 'pub_date')
+    return _bulk_insert(
+        TimelineEntry(user=user, post_id=post_id, pub_date=pub_date)
+        for post_id, pub_date in posts.iterator()
+    )
+
+
+def remove_author(user, author):
+    """Убирает посты автора из ленты отписавшегося."""
+    TimelineEntry.objects.filter(user=user, post__author=author).delete()
+
+
+def remove_post(post_id):
+    """Убирает пост из всех лент (пост передан другому автору)."""
+    TimelineEntry.objects.filter(post_id=post_id).delete()
+
+
+def follows_celebrities(user):
+    return celebrity_authors(user).exists()
+
+
+def timeline_entries(user):
+    """Записи ленты с постами для шаблонов (как Post.for_feed()).
+
+    Читаются по индексу timeline_user_date без сортировки; подходит,
+    только если среди авторов нет "звезд" - их посты в ленту не
+    раскладываются.
+    """
+    return TimelineEntry.objects.filter(user=user).select_related(
+        'post__author', 'post__group'
+    ).prefetch_related('post__image_variants').only(
+        'id', 'user_id', 'pub_date', 'post_id',
+        *(f'post__{field}' for field in FEED_FIELDS),
+    )
+
+
+def timeline_posts(user):
+    """Лента подписок: разложенные посты плюс посты "звезд"."""
+    in_timeline = Q(
+        pk__in=TimelineEntry.objects.filter(user=user).values('post')
+    )
+    return Post.objects.filter(
+        in_timeline | Q(author__in=celebrity_authors(user))
+    )
+
+
+def rebuild(users):
+    """Пересобирает ленты указанных пользователей с нуля."""
+    inserted = 0
+    for user in users:
+        with transaction.atomic():
+            TimelineEntry.objects.filter(user=user).delete()
+            for follow in user.follower.select_related('author'):
+                inserted += add_author(user, follow.author)
+    return inserted
+
+
+def _fan_out_sql(where='', ignore_conflicts=False):
+    ops = connection.ops
+    quote = ops.quote_name
+    entry, follow, post, stats = (
+        quote(model._meta.db_table)
+        for model in (TimelineEntry, Follow, Post, UserStats)
+    )
+    return (
+        f'{ops.insert_statement(ignore_conflicts=ignore_conflicts)} '
+        f'{entry} (user_id, post_id, pub_date) '
+        f'SELECT f.user_id, p.id, p.pub_date '
+        f'FROM {follow} f JOIN {post} p ON p.author_id = f.author_id '
+        f'LEFT JOIN {stats} s ON s.user_id = f.author_id '
+        f'WHERE COALESCE(s.followers_count, 0) <= %s{where} '
+        f'{ops.ignore_conflicts_suffix_sql(ignore_conflicts=ignore_conflicts)}'
+    )
+
+
+def rebuild_all():
+    """Пересобирает все ленты одним INSERT ... SELECT.
+
+    Для больших баз (например, после seed_bench) это на порядки
+    быстрее, чем rebuild() по пользователям.
+    """
+    with transaction.atomic():
+        TimelineEntry.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                _fan_out_sql(), [settings.TIMELINE_CELEBRITY_FOLLOWERS]
+            )
+            return cursor.rowcount
+
+
+def fan_out_range(first_pk, last_pk):
+    """Раскладывает посты с pk в (first_pk, last_pk] одним INSERT ... SELECT
+    (пачки постов, созданные bulk_create без сигналов)."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _fan_out_sql(' AND p.id > %s AND p.id <= %s'),
+            [settings.TIMELINE_CELEBRITY_FOLLOWERS, first_pk, last_pk],
+        )
+        return cursor.rowcount
+
+
+def backfill_author(author_id):
+    """Раскладывает все посты автора по лентам всех его подписчиков
+    одним INSERT ... SELECT. Нужно, когда автор перестал быть "звездой":
+    пока он им был, ни его посты, ни новые подписки не раскладывались.
+    Уже разложенные записи пропускаются."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _fan_out_sql(' AND f.author_id = %s', ignore_conflicts=True),
+            [settings.TIMELINE_CELEBRITY_FOLLOWERS, author_id],
+        )
+        return cursor.rowcount
@@ -0,0 +1,125 @@
+# posts/uploads.py
+"""Загрузка картинок постов без чтения файла целиком в память.
+
+Формы постов (декоратор streaming_uploads) пишут загрузку во временный
+файл по частям и обрывают ее, как только она превысит
+POST_IMAGE_MAX_SIZE. header_to_python проверяет размер, формат и число
+пикселей по заголовку картинки - сама картинка декодируется только
+при подготовке миниатюр. Остальные загрузки (админка) идут обычными
+обработчиками Django.
+"""
+from functools import wraps
+
+from django import forms
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopFutureHandlers, StopUpload, TemporaryFileUploadHandler
+)
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+
+class StreamingUploadHandler(TemporaryFileUploadHandler):
+    """Всегда пишет во временный файл, но не больше лимита.
+
+    Файл сверх POST_IMAGE_MAX_SIZE прерывает загрузку (остаток тела
+    запроса не читается), а имя его поля попадает
+    в request.too_large_uploads - форма покажет ошибку размера
+    (reject_too_large).
+    """
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        # Файл целиком наш: обработчики Django его не получат
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > settings.POST_IMAGE_MAX_SIZE:
+            self.request.too_large_uploads.append(self.field_name)
+            raise StopUpload(connection_reset=True)
+        self.file.write(raw_data)
+
+
+def streaming_uploads(view):
+    """Декоратор view с формой поста: загрузки идут через
+    StreamingUploadHandler.
+
+    Обработчик ставится до проверки CSRF: CsrfViewMiddleware читает
+    request.POST до view, и после этого заменить обработчики нельзя.
+    """
+    protected = csrf_protect(view)
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.too_large_uploads = []
+        request.upload_handlers.insert(0, StreamingUploadHandler(request))
+        return protected(request, *args, **kwargs)
+
+    return csrf_exempt(wrapper)
+
+
+ERROR_MESSAGES = {
+    'too_large': 'Файл больше %(limit)s.',
+    'too_many_pixels': 'Картинка больше %(limit)s мегапикселей.',
+    'format': 'Поддерживаются только %(formats)s.',
+}
+
+
+def _too_large():
+    return forms.ValidationError(
+        ERROR_MESSAGES['too_large'], code='too_large',
+        params={'limit': filesizeformat(settings.POST_IMAGE_MAX_SIZE)},
+    )
+
+
+def reject_too_large(request, form):
+    """Ошибки размера для файлов, загрузку которых оборвал
+    StreamingUploadHandler: в request.FILES их нет."""
+    for field in getattr(request, 'too_large_uploads', ()):
+        form.add_error(field, _too_large())
+
+
+def _too_many_pixels():
+    return forms.ValidationError(
+        ERROR_MESSAGES['too_many_pixels'], code='too_many_pixels',
+        params={'limit': settings.POST_IMAGE_MAX_PIXELS // 10 ** 6},
+    )
+
+
+def header_to_python(field, data):
+    """Замена ImageField.to_python, которая проверяет картинку по заголовку.
+
+    ImageField.to_python вызывает verify() и копирует файл из памяти
+    в BytesIO; здесь файл читается только до конца заголовка.
+    """
+    f = forms.FileField.to_python(field, data)
+    if f is None:
+        return None
+    if f.size > settings.POST_IMAGE_MAX_SIZE:
+        raise _too_large()
+    source = (
+        f.temporary_file_path() if hasattr(f, 'temporary_file_path') else f
+    )
+    try:
+        # Image.open читает только заголовок, пиксели не декодируются
+        with Image.open(source) as image:
+            image_format = image.format
+            width, height = image.size
+    except Image.DecompressionBombError:
+        raise _too_many_pixels()
+    except Exception as exc:
+        raise forms.ValidationError(
+            field.error_messages['invalid_image'], code='invalid_image',
+        ) from exc
+    if width * height > settings.POST_IMAGE_MAX_PIXELS:
+        raise _too_many_pixels()
+    if image_format not in settings.POST_IMAGE_UPLOAD_FORMATS:
+        raise forms.ValidationError(
+            ERROR_MESSAGES['format'], code='format',
+            params={'formats': ', '.join(settings.POST_IMAGE_UPLOAD_FORMATS)},
+        )
+    f.content_type = Image.MIME.get(image_format)
+    if hasattr(f, 'seek') and callable(f.seek):
+        f.seek(0)
+    return f
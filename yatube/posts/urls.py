@@ -13,20 +13,48 @@ urlpatterns = [
     path('profile/<str:username>/', views.profile, name='profile'),
     # Просмотр записи
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    # Каталог групп
+    path('groups/', views.group_index, name='group_index'),
     # Просмотр группы
     path('group/<slug:slug>/', views.group_posts, name='group_posts'),
+    # Поиск по постам
+    path('search/', views.search_posts, name='search'),
     # Создание поста
     path('create/', views.post_create, name='post_create'),
     # Редактирование поста
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    # Следующая порция комментариев (HTML-фрагмент)
+    path(
+        'posts/<int:post_id>/comments/',
+        views.post_comments,
+        name='post_comments'
+    ),
     # Комментирование поста
     path(
         'posts/<int:post_id>/comment/',
         views.add_comment,
         name='add_comment'
     ),
+    # Ленты RSS, Atom и JSON Feed: fmt - rss, atom или json
+    path('feeds/<str:fmt>/', views.index_feed, name='index_feed'),
+    path(
+        'feeds/<str:fmt>/group/<slug:slug>/',
+        views.group_feed,
+        name='group_feed'
+    ),
+    path(
+        'feeds/<str:fmt>/profile/<str:username>/',
+        views.profile_feed,
+        name='profile_feed'
+    ),
     # Лента авторов, на которые подписан пользователь
     path('follow/', views.follow_index, name='follow_index'),
+    # Уведомления о новых постах авторов из подписок
+    path(
+        'notifications/',
+        views.notifications_index,
+        name='notifications'
+    ),
     # Подписка на автора
     path(
         'profile/<str:username>/follow/',
@@ -1,51 +1,143 @@
 # posts/views.py
+import json
+
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.http import Http404, StreamingHttpResponse
 # from django.views.decorators.cache import cache_page
 from django.shortcuts import redirect, render, get_object_or_404
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
 
+from core import fragment_cache
 from core.diffs import page_cuter
+from core.paginator import KeysetPaginator
+from . import feeds, notifications, search, timelines, uploads
+from .conditional import CachedPage
 from .forms import PostForm, CommentForm
-from .models import Post, Group, User, Follow
+from .models import Post, Group, User, Follow, UserStats
 
 
 # @cache_page(20)
 def index(request):
-    post_list = Post.objects.all()
+    page = CachedPage(request, 'feed')
+    cached = page.response()
+    if cached:
+        return cached
+    post_list = Post.objects.for_feed()
     context = {
-        'page_obj': page_cuter(request, post_list),
+        'page_obj': page_cuter(request, post_list, lazy=True),
     }
-    return render(request, 'posts/index.html', context)
+    return page.apply(render(request, 'posts/index.html', context))
 
 
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
+    cache_scope = fragment_cache.scope('group', group.pk)
+    page = CachedPage(request, cache_scope)
+    cached = page.response()
+    if cached:
+        return cached
+    post_list = group.posts.for_feed()
     context = {
         'group': group,
-        'page_obj': page_cuter(request, post_list),
+        'page_obj': page_cuter(
+            request, post_list, group.posts_count, lazy=True
+        ),
+        'cache_scope': cache_scope,
     }
-    return render(request, 'posts/group_list.html', context)
+    return page.apply(
+        render(request, 'posts/group_list.html', context)
+    )
+
+
+def _with_top_authors(page_obj):
+    # Самые активные авторы всех групп страницы - одним запросом
+    groups = list(page_obj)
+    tops = {group.pk: json.loads(group.top_authors) for group in groups}
+    authors = User.objects.only('username').in_bulk({
+        author_id for top in tops.values() for author_id, _ in top
+    })
+    for group in groups:
+        group.top_author_list = [
+            (authors[author_id], posts_count)
+            for author_id, posts_count in tops[group.pk]
+            if author_id in authors
+        ]
+    page_obj.object_list = groups
+    return page_obj
+
+
+def group_index(request):
+    # Счетчики, дата последнего поста и авторы уже посчитаны сигналами
+    page = CachedPage(request, 'groups')
+    cached = page.response()
+    if cached:
+        return cached
+    group_list = Group.objects.order_by('-posts_count', '-pk')
+    context = {
+        'page_obj': SimpleLazyObject(
+            lambda: _with_top_authors(page_cuter(request, group_list))
+        ),
+    }
+    return page.apply(render(request, 'posts/groups.html', context))
 
 
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    user = request.user
-    following = False
-    if user.is_authenticated:
-        following = Follow.objects.filter(user=user, author=author).exists()
-    post_list = author.posts.all()
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    cache_scope = fragment_cache.scope('author', author.pk)
+    page = CachedPage(request, cache_scope)
+    cached = page.response()
+    if cached:
+        return cached
+    post_list = author.posts.for_feed()
+    posts_count = UserStats.of(author).posts_count
     context = {
-        'page_obj': page_cuter(request, post_list),
-        'page_count': post_list.count(),
+        'page_obj': page_cuter(request, post_list, posts_count, lazy=True),
+        'page_count': posts_count,
+        'cache_scope': cache_scope,
         'author': author,
-        'following': following,
     }
-    return render(request, 'posts/profile.html', context)
+    return page.apply(render(request, 'posts/profile.html', context))
+
+
+def comments_page(request, post):
+    """Комментарии поста по курсору ?cursor=..., старые сначала.
+
+    Авторы подтягиваются тем же запросом, COUNT(*) не нужен -
+    число комментариев есть в post.comments_count.
+    """
+    comment_list = post.comments.select_related('author').only(
+        'id', 'text', 'created', 'post_id', 'author_id', 'author__username'
+    ).order_by('created', 'pk')
+    paginator = KeysetPaginator(
+        comment_list, settings.COMMENTS_PER_PAGE, count=post.comments_count
+    )
+    cursor = request.GET.get('cursor')
+    if cursor:
+        return paginator.cursor_page(cursor)
+    return paginator.first_page()
 
 
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, id=post_id)
-    comment_list = post.comments.all()
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), id=post_id
+    )
+    cache_scope = fragment_cache.scope('post', post.pk)
+    # Число постов автора - из области автора, название и ссылка
+    # группы - из области группы
+    scopes = [cache_scope, fragment_cache.scope('author', post.author_id)]
+    if post.group_id:
+        scopes.append(fragment_cache.scope('group', post.group_id))
+    page = CachedPage(request, *scopes)
+    cached = page.response()
+    if cached:
+        return cached
+    # Из кэша фрагментов комментарии отдаются без запроса
+    comment_list = SimpleLazyObject(lambda: comments_page(request, post))
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
@@ -54,16 +146,53 @@ def post_detail(request, post_id):
         return redirect('posts:add_comment', post_id)
     context = {
         'post': post,
-        'post_count': post.author.posts.count(),
+        'post_count': UserStats.of(post.author).posts_count,
         'comments': comment_list,
         'form': form,
+        'cache_scope': cache_scope,
+    }
+    return page.apply(
+        render(request, 'posts/post_detail.html', context)
+    )
+
+
+def post_comments(request, post_id):
+    """HTML-фрагмент со следующей порцией комментариев."""
+    post = get_object_or_404(
+        Post.objects.only('id', 'comments_count'), id=post_id
+    )
+    context = {
+        'post': post,
+        'comments': SimpleLazyObject(lambda: comments_page(request, post)),
+        'cache_scope': fragment_cache.scope('post', post.pk),
     }
-    return render(request, 'posts/post_detail.html', context)
+    return render(request, 'posts/includes/comments_list.html', context)
 
 
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    post_ids = search.search(query) if query else []
+    # Найденные id уже в памяти - COUNT(*) не нужен
+    page_obj = Paginator(post_ids, settings.ITEMS_ON_PAGE).get_page(
+        request.GET.get('page')
+    )
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    page_obj.object_list = [
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ]
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@uploads.streaming_uploads
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None)
+    uploads.reject_too_large(request, form)
     if form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
@@ -72,6 +201,7 @@ def post_create(request):
     return render(request, 'posts/create_post.html', {'form': form})
 
 
+@uploads.streaming_uploads
 @login_required
 def post_edit(request, post_id):
     post = get_object_or_404(Post, id=post_id)
@@ -82,8 +212,10 @@ def post_edit(request, post_id):
         files=request.FILES or None,
         instance=post
     )
+    uploads.reject_too_large(request, form)
     if form.is_valid():
-        form.save()
+        # Сохраняем только поля формы, чтобы не затереть счетчики
+        form.save(commit=False).save(update_fields=form.Meta.fields)
         return redirect('posts:post_detail', post_id)
     context = {
         'form': form,
@@ -106,14 +238,35 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    follow_list = request.user.follower.all()
-    post_list = Post.objects.filter(author__in=follow_list.values('author'))
+    user = request.user
+    if timelines.follows_celebrities(user):
+        # Посты "звезд" подмешиваются при чтении
+        post_list = timelines.timeline_posts(user).for_feed()
+        page_obj = page_cuter(request, post_list)
+    else:
+        # Лента читается по индексу записей, в шаблон идут их посты
+        page_obj = page_cuter(request, timelines.timeline_entries(user))
+        page_obj.object_list = [entry.post for entry in page_obj]
     context = {
-        'page_obj': page_cuter(request, post_list),
+        'page_obj': page_obj,
     }
     return render(request, 'posts/follow.html', context)
 
 
+@login_required
+def notifications_index(request):
+    # Открытая страница отмечает все уведомления прочитанными
+    seen_id = notifications.mark_read(request.user)
+    notification_list = request.user.notifications.select_related(
+        'post__author'
+    )
+    context = {
+        'page_obj': page_cuter(request, notification_list),
+        'seen_id': seen_id,
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
 @login_required
 def profile_follow(request, username):
     # Подписаться на автора
@@ -135,3 +288,49 @@ def profile_unfollow(request, username):
     to_delete = get_object_or_404(Follow, user=follower, author=following)
     to_delete.delete()
     return redirect('posts:profile', username=following)
+
+
+def _feed(request, fmt, scope, queryset, title, link, description):
+    if fmt not in feeds.FORMATS:
+        raise Http404('Неизвестный формат ленты')
+    page = CachedPage(request, scope, per_user=False)
+    cached = page.response()
+    if cached:
+        return cached
+    chunks, content_type = feeds.stream(
+        request, fmt, queryset, title, link, description,
+        updated=page.last_modified,
+    )
+    return page.apply(StreamingHttpResponse(chunks, content_type=content_type))
+
+
+def index_feed(request, fmt):
+    return _feed(
+        request, fmt, 'feed', Post.objects.all(),
+        'Yatube: последние записи', reverse('posts:index'),
+        'Новые посты всех авторов',
+    )
+
+
+def group_feed(request, fmt, slug):
+    group = get_object_or_404(Group, slug=slug)
+    return _feed(
+        request, fmt, fragment_cache.scope('group', group.pk),
+        group.posts.all(), f'Yatube: {group.title}',
+        reverse('posts:group_posts', kwargs={'slug': slug}),
+        group.description,
+    )
+
+
+def profile_feed(request, fmt, username):
+    author = get_object_or_404(
+        User.objects.only('id', 'username', 'first_name', 'last_name'),
+        username=username,
+    )
+    return _feed(
+        request, fmt, fragment_cache.scope('author', author.pk),
+        author.posts.all(),
+        f'Yatube: {author.get_full_name() or author.username}',
+        reverse('posts:profile', kwargs={'username': username}),
+        f'Посты пользователя {author.username}',
+    )
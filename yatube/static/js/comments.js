@@ -0,0 +1,20 @@
+// static/js/comments.js
+// "Показать еще": следующая порция комментариев подгружается
+// фрагментом и встает на место кнопки
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('[data-fragment]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.fragment)
+    .then(function (response) {
+      return response.ok ? response.text() : Promise.reject(response);
+    })
+    .then(function (html) {
+      link.parentNode.outerHTML = html;
+    })
+    .catch(function () {
+      window.location = link.href;
+    });
+});
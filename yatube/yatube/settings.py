@@ -42,6 +42,8 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',  # добавил
     'core.apps.CoreConfig',  # добавил
     'about.apps.AboutConfig',  # добавил
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -52,11 +54,18 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Первым - чтобы замерять и остальные middleware
+    'core.middleware.InstrumentationMiddleware',
+    # До всех, кто читает базу (сессии, пользователь)
+    'core.middleware.ReplicaStickinessMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # После сессий и пользователя: метки кэша страниц заполняются
+    # до того, как они допишут Vary и cookies
+    'core.middleware.PageHolesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -65,7 +74,8 @@ ROOT_URLCONF = 'yatube.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Стандартный бэкенд с замером времени рендеринга
+        'BACKEND': 'core.instrumentation.DjangoTemplates',
         'DIRS': [os.path.join(BASE_DIR, 'templates')],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -75,7 +85,9 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 # Добавлен конеткст-процессор
-                'core.context_processors.year.year'
+                'core.context_processors.year.year',
+                # Подписки пользователя для отметок в лентах
+                'posts.context_processors.following_ids',
             ],
         },
     },
@@ -87,13 +99,43 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
+# core.backends.sqlite3 - стандартный бэкенд плюс PRAGMA на каждом
+# соединении (описание опций - в модуле); соединения живут CONN_MAX_AGE
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'core.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
-    }
+        'CONN_MAX_AGE': 60,
+        'OPTIONS': {
+            'timeout': 5,
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'mmap_size': 256 * 1024 * 1024,
+            'cache_size': -64000,
+            'busy_timeout': 5000,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+# Локальная реплика для чтения: копия db.sqlite3, которую обновляет
+# manage.py replicate. Чтобы читать с нее, добавьте 'replica'
+# в REPLICA_DATABASES
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': os.path.join(BASE_DIR, 'db_replica.sqlite3'),
 }
 
+# Запросы на чтение моделей из REPLICA_APPS идут на реплики
+# (core.routers), запись и все остальное - в default
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+REPLICA_DATABASES = []
+REPLICA_APPS = ['posts']
+# Сколько секунд после записи пользователь читает с default; должно
+# быть больше отставания реплик. Столько же после сброса фрагменты,
+# прочитанные с реплики, не попадают в кэш
+REPLICA_STICKY_SECONDS = 5
+REPLICA_PIN_COOKIE = 'replica_pin'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
@@ -155,12 +197,142 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 
 # Подключаю кэширование
+# LocMemCache у каждого процесса свой, и сброс версий фрагментов
+# виден только в нем. Для нескольких воркеров gunicorn нужен общий
+# бэкенд, например
+# 'django.core.cache.backends.filebased.FileBasedCache'
+# с LOCATION = os.path.join(BASE_DIR, 'cache')
+# или 'django.core.cache.backends.db.DatabaseCache'
+# (после manage.py createcachetable)
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
+# Кэш фрагментов с версиями (core.fragment_cache): фрагменты сбрасываются
+# сигналами при записи, поэтому могут жить часами
+FRAGMENT_CACHE = 'default'
+FRAGMENT_CACHE_TIMEOUT = 60 * 60 * 6
+# Как часто процесс сбрасывает счетчики попаданий и промахов
+# в общий кэш, секунд
+FRAGMENT_CACHE_STATS_INTERVAL = 10
+
+
+# Кэш страниц целиком (core.page_cache) и условные GET лент и страниц
+# постов (posts.conditional). Ленты кэшируются по версиям фрагментов,
+# страницы без данных (about) - на PAGE_CACHE_TIMEOUT. Увеличьте
+# PAGE_CACHE_VERSION, если изменилась разметка страниц, - иначе
+# останутся старые страницы в кэше и у браузеров
+PAGE_CACHE_VERSION = 2
+PAGE_CACHE_TIMEOUT = 60 * 60
+
 
 # Постов на страницу
 ITEMS_ON_PAGE = 10
+# Комментариев в одной порции на странице поста
+COMMENTS_PER_PAGE = 20
+# Самых активных авторов в каталоге групп
+GROUP_TOP_AUTHORS = 3
+# Постов в лентах RSS, Atom и JSON Feed
+FEED_ITEMS = 50
+# JSON API (api): объектов на странице по умолчанию и не больше чем
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Админка: до скольких строк считать точное число объектов в списке
+# (дальше - оценка, core.paginator.EstimatedCountPaginator) и сколько
+# постов брать из поискового индекса при поиске
+ADMIN_EXACT_COUNT_LIMIT = 10000
+ADMIN_SEARCH_LIMIT = 1000
+
+
+# Ленты подписок: авторы с большим числом подписчиков
+# не раскладываются по лентам при записи, а подмешиваются при чтении
+TIMELINE_CELEBRITY_FOLLOWERS = 1000
+TIMELINE_BATCH_SIZE = 1000
+
+# Сколько хранить в кэше множество подписок пользователя;
+# при подписке и отписке оно сбрасывается сразу
+FOLLOWING_CACHE_TIMEOUT = 60 * 60 * 6
+
+# Полнотекстовый поиск (posts.search): 'auto' - FTS5, если есть,
+# иначе обратный индекс в таблице SearchTerm; можно задать
+# 'fts5' или 'python' явно
+SEARCH_BACKEND = 'auto'
+SEARCH_RESULTS_LIMIT = 200
+
+# Миниатюры картинок постов создаются в фоне (posts.thumbnails);
+# здесь все размеры, которые используют шаблоны
+POST_THUMBNAIL_SIZES = [
+    ('960x339', {'crop': 'center', 'upscale': True}),
+]
+# Очередь фоновых задач (jobs): картинки, ленты подписок, поиск.
+# JOBS_INLINE: True - выполнять задачи без очереди, после коммита
+# в том же процессе (разработка без воркеров); в работе - False
+# и воркеры run_workers
+JOBS_INLINE = True
+# Воркеры run_workers по умолчанию: процессов и потоков в каждом
+JOBS_PROCESSES = 1
+JOBS_THREADS = 2
+# Пауза воркера при пустой очереди, секунд
+JOBS_POLL_INTERVAL = 1.0
+# Повторы упавших задач: попыток, первая задержка и предел, секунд
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+JOBS_RETRY_MAX_DELAY = 60 * 60
+# Сколько задача может выполняться, прежде чем ее отдадут другому
+# воркеру (воркер, скорее всего, упал)
+JOBS_LEASE_SECONDS = 5 * 60
+
+# Варианты картинок для <picture>/srcset (posts.images): ширины,
+# пропорции кадра и форматы в порядке предпочтения. Формат, который
+# не поддерживает установленный Pillow (например, AVIF), пропускается;
+# последний формат - запасной для <img>
+POST_IMAGE_WIDTHS = [480, 960, 1440]
+POST_IMAGE_ASPECT = (960, 339)
+POST_IMAGE_FORMATS = ['AVIF', 'WEBP', 'JPEG']
+
+# Загрузка картинок в формах постов (posts.uploads): файлы пишутся
+# во временный файл по частям, лимиты проверяются по заголовку картинки
+POST_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+POST_IMAGE_MAX_PIXELS = 40 * 10 ** 6
+POST_IMAGE_UPLOAD_FORMATS = ['JPEG', 'PNG', 'GIF', 'WEBP']
+
+# Метрики запросов (core.middleware.InstrumentationMiddleware):
+# запросы не быстрее INSTRUMENTATION_SLOW_MS попадают в кольцевой
+# буфер на INSTRUMENTATION_BUFFER_SIZE записей (страница /debug/requests/)
+INSTRUMENTATION_SLOW_MS = 200
+INSTRUMENTATION_BUFFER_SIZE = 100
+
+# Строки с метриками запросов пишутся в консоль только при DEBUG
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'require_debug_true': {
+            '()': 'django.utils.log.RequireDebugTrue',
+        },
+    },
+    'handlers': {
+        'console': {
+            'level': 'INFO',
+            'filters': ['require_debug_true'],
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.requests': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
+
+# Уведомления о новых постах: подписчиков в одной пачке рассылки
+# (одна задача и один INSERT), постов в письме ежедневного дайджеста
+NOTIFICATION_BATCH_SIZE = 1000
+NOTIFICATION_DIGEST_POSTS = 10
+# Сколько шапка может показывать устаревшее число непрочитанных, секунд
+NOTIFICATION_CACHE_TIMEOUT = 60
+# Адрес сайта для ссылок в письмах
+SITE_URL = 'http://127.0.0.1:8000'
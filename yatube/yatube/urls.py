@@ -9,6 +9,8 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('debug/', include('core.urls', namespace='core')),
+    path('api/', include('api.urls', namespace='api')),
     path('', include('posts.urls'))
 ]
 handler404 = 'core.views.page_not_found'